@@ -2,9 +2,9 @@
 
 import os
 import sys
+import time
 from pathlib import Path
 import streamlit as st
-import pandas as pd
 
 # --- THIS IS THE FIX ---
 current_dir = Path(__file__).resolve().parent
@@ -12,7 +12,8 @@ sys.path.append(str(current_dir))
 # --- END OF FIX ---
 
 from src.pipeline.predict_pipeline import CustomData, PredictPipeline
-from src.logger import logging
+from src.pipeline.prediction_cache import prediction_cache
+from src.logger import logging, predict_logger
 
 # --- 1. SET UP THE PAGE CONFIGURATION ---
 st.set_page_config(
@@ -21,6 +22,31 @@ st.set_page_config(
     layout="wide"
 )
 
+# --- LOAD THE PIPELINE ONCE PER PROCESS ---
+# st.cache_resource keeps ONE PredictPipeline for the whole Streamlit server,
+# shared by every session and every rerun, so the artifacts are not unpickled
+# on every click of "Predict Genre".
+@st.cache_resource(show_spinner="Loading the model...")
+def load_predict_pipeline():
+    """
+    Loads the shared PredictPipeline. Streamlit has no server-start hook and
+    only runs this script when a session connects, so the FIRST visitor after
+    a (re)start still waits for the full artifact load; every later session
+    and rerun gets the warm pipeline.
+    """
+    start = time.perf_counter()
+    pipeline = PredictPipeline(prediction_cache=prediction_cache)
+    pipeline.load_artifacts()
+    pipeline.get_fast_preprocessor()
+    load_seconds = time.perf_counter() - start
+    logging.info(f"Streamlit pipeline loaded in {load_seconds:.3f}s")
+    return {"pipeline": pipeline, "load_seconds": load_seconds, "loaded_at": time.time()}
+
+# Load it (or pick up the warm one) before the form is drawn
+rerun_start = time.perf_counter()
+pipeline_resource = load_predict_pipeline()
+pipeline_wait_seconds = time.perf_counter() - rerun_start
+
 # --- 2. HEADER ---
 logo_svg = """
 <div style="display: flex; align-items: center; justify-content: center; gap: 15px; margin-bottom: 10px;">
@@ -75,7 +101,7 @@ with st.form("prediction_form"):
 # --- 4. HANDLE THE PREDICTION ---
 if submitted:
     try:
-        logging.info("Live prediction started.")
+        predict_logger.debug("Live prediction started.")
         data = CustomData(
             danceability=danceability, energy=energy, loudness=loudness,
             speechiness=speechiness, acousticness=acousticness, instrumentalness=instrumentalness,
@@ -83,15 +109,14 @@ if submitted:
             key=key, mode=mode, time_signature=time_signature
         )
         
-        features_df = data.get_data_as_dataframe()
-        logging.info("Live prediction data converted to DataFrame.")
+        # The shared pipeline from st.cache_resource (already warm)
+        predict_pipeline = pipeline_resource["pipeline"]
 
-        predict_pipeline = PredictPipeline()
-        
-        # This will now work, as it returns single values
-        result, confidence = predict_pipeline.predict(features_df)
+        inference_start = time.perf_counter()
+        result, confidence = predict_pipeline.predict_record(data.get_data_as_dict())
+        inference_seconds = time.perf_counter() - inference_start
         
-        logging.info(f"Live prediction successful. Result: {result}")
+        predict_logger.info("Live prediction successful. Result: %s", result)
         
         st.subheader("Predicted Genre:")
         col1, col2 = st.columns(2)
@@ -103,6 +128,17 @@ if submitted:
             """, unsafe_allow_html=True)
         with col2:
             st.metric(label="**Confidence**", value=f"{confidence:.2f} %")
+
+        # --- 5. LATENCY READOUT: model load (cold, once) vs inference (warm) ---
+        # This rerun was "cold" if it had to wait for the model to load.
+        was_cold = pipeline_wait_seconds >= pipeline_resource["load_seconds"]
+        cache_stats = prediction_cache.stats()
+        st.caption(
+            f"Model load: {pipeline_resource['load_seconds'] * 1000:.0f} ms "
+            f"({'this run' if was_cold else 'once, by the first session'}) · "
+            f"Inference: {inference_seconds * 1000:.2f} ms · "
+            f"Prediction cache hit rate: {cache_stats['hit_rate']:.0%} ({cache_stats['size']} entries)"
+        )
         
     except Exception as e:
         logging.error(f"An error occurred during live prediction: {e}")
@@ -0,0 +1,257 @@
+# app_asgi.py
+#
+# asyncio (ASGI) server with the same /v1/predict contract as app_flask.py.
+#
+# The event loop only parses HTTP and waits; JSON decoding, validation and
+# scoring run in a bounded ScoringPool (threads or forked processes). When
+# the pool is full new requests get 429 at once, and a request that is not
+# answered within its deadline gets 504.
+#
+# Run from the project root:
+#   python app_asgi.py --port 8089 --pool thread --workers 4
+#   uvicorn app_asgi:app --port 8089        (settings from the ASGI_* variables)
+#
+# Settings (environment variables, or the matching command-line flags):
+#   ASGI_POOL (thread | process), ASGI_POOL_WORKERS (CPU count),
+#   ASGI_QUEUE_SIZE (64), ASGI_DEADLINE_MS (2000)
+# A client can ask for a shorter deadline with the X-Request-Deadline-Ms header.
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from urllib.parse import parse_qs
+
+# --- THIS IS THE FIX ---
+current_dir = Path(__file__).resolve().parent
+sys.path.append(str(current_dir))
+# --- END OF FIX ---
+
+from src.pipeline.predict_pipeline import PredictPipeline, validate_feature_records, predictions_to_records, parse_top_k
+from src.pipeline.scoring_pool import ScoringPool, PoolFullError
+from src.pipeline.metrics import prediction_metrics, render_histogram, render_gauges
+from src.logger import logging, predict_logger
+
+# Same limit as app_flask.py
+MAX_RECORDS_PER_REQUEST = 10000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+settings = {
+    "pool": os.environ.get("ASGI_POOL", "thread"),
+    "workers": int(os.environ.get("ASGI_POOL_WORKERS", str(os.cpu_count() or 1))),
+    "queue_size": int(os.environ.get("ASGI_QUEUE_SIZE", "64")),
+    "deadline_ms": float(os.environ.get("ASGI_DEADLINE_MS", "2000")),
+}
+
+predict_pipeline = PredictPipeline()
+model_state = {"loaded": False, "error": None}
+scoring_pool = None
+
+
+def load_models():
+    """
+    Loads the artifacts, then starts the scoring pool (after the load, so
+    forked pool processes inherit the model instead of loading their own).
+    """
+    global scoring_pool
+    try:
+        logging.info("Loading model artifacts at startup...")
+        predict_pipeline.load_artifacts()
+        predict_pipeline.get_fast_preprocessor()
+        scoring_pool = ScoringPool(settings["pool"], settings["workers"], settings["queue_size"])
+        model_state["loaded"] = True
+        model_state["error"] = None
+        logging.info("Model artifacts loaded. Ready to serve.")
+    except Exception as e:
+        model_state["error"] = str(e)
+        logging.error(f"Failed to load model artifacts at startup: {e}")
+
+
+def score_request(body, top_k):
+    """
+    The whole CPU-bound part of /v1/predict, run inside the scoring pool.
+    Returns (status, response dict), like the Flask route.
+    """
+    try:
+        records = json.loads(body)
+    except ValueError:
+        records = None
+    if not isinstance(records, list):
+        return 400, {"error": "Request body must be a JSON array of feature records."}
+    if len(records) > MAX_RECORDS_PER_REQUEST:
+        return 413, {"error": f"At most {MAX_RECORDS_PER_REQUEST} records are allowed per request."}
+
+    features_df, errors = validate_feature_records(records)
+    if errors:
+        return 422, {"error": "Invalid feature records.", "details": errors}
+    if features_df.empty:
+        return 200, {"predictions": []}
+
+    predictions = predict_pipeline.predict_batch(features_df, top_k=top_k)
+    results = predictions_to_records(predictions, top_k)
+    predict_logger.info("/v1/predict scored %d records.", len(results))
+    return 200, {"predictions": results}
+
+
+class ClientDisconnected(Exception):
+    """
+    The client closed the connection before its request body arrived.
+    """
+
+
+async def read_body(receive):
+    """
+    The whole request body, or None when it is bigger than MAX_BODY_BYTES.
+    Raises ClientDisconnected if the client goes away first.
+    """
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnected()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def send_response(send, status, body, content_type="application/json", headers=()):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode()),
+                    *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def predict_json(scope, receive):
+    if not model_state["loaded"]:
+        return 503, {"error": "Model is still loading."}, ()
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    top_k = parse_top_k(query.get("top_k", [None])[0])
+
+    deadline_ms = settings["deadline_ms"]
+    requested = dict(scope["headers"]).get(b"x-request-deadline-ms")
+    if requested:
+        try:
+            requested_ms = float(requested)
+        except ValueError:
+            requested_ms = float("nan")
+        # "not >" also catches NaN
+        if not requested_ms > 0:
+            return 400, {"error": "X-Request-Deadline-Ms must be a positive number."}, ()
+        deadline_ms = min(deadline_ms, requested_ms)
+
+    body = await read_body(receive)
+    if body is None:
+        return 413, {"error": f"Request body is larger than {MAX_BODY_BYTES} bytes."}, ()
+
+    try:
+        status, payload = await scoring_pool.run(score_request, body, top_k, deadline_seconds=deadline_ms / 1000)
+        return status, payload, ()
+    except PoolFullError:
+        return 429, {"error": "Too many requests in flight. Retry shortly."}, [(b"retry-after", b"1")]
+    except TimeoutError:
+        return 504, {"error": f"Prediction did not finish within {deadline_ms:g} ms."}, ()
+    except Exception as e:
+        logging.error(f"An error occurred in the /v1/predict route: {e}")
+        return 500, {"error": "Prediction failed."}, ()
+
+
+def healthz():
+    status = {"model_loaded": model_state["loaded"], "error": model_state["error"]}
+    if scoring_pool is not None:
+        status["scoring_pool"] = scoring_pool.stats()
+    return (200 if model_state["loaded"] else 503), status, ()
+
+
+def metrics():
+    if not prediction_metrics.enabled:
+        return 404, {"error": "Metrics are disabled (PREDICTION_METRICS=0)."}, ()
+
+    # With --pool process the stage timings are recorded in the pool
+    # processes, so only the route latencies and pool numbers show up here
+    lines = [prediction_metrics.render_prometheus().rstrip("\n")]
+    lines.append("# HELP spotify_model_loaded 1 once the model artifacts are in memory.")
+    lines.append("# TYPE spotify_model_loaded gauge")
+    lines.append(f"spotify_model_loaded {int(model_state['loaded'])}")
+    if scoring_pool is not None:
+        render_gauges(lines, "spotify_scoring_pool", "Scoring pool", scoring_pool.stats())
+        lines.append("# TYPE spotify_scoring_pool_pending_jobs histogram")
+        render_histogram(lines, "spotify_scoring_pool_pending_jobs", None, None, scoring_pool.pending_histogram)
+        lines.append("# TYPE spotify_scoring_pool_job_seconds histogram")
+        render_histogram(lines, "spotify_scoring_pool_job_seconds", None, None, scoring_pool.job_seconds)
+    return 200, ("\n".join(lines) + "\n").encode(), ()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Load in a thread, so /healthz answers (503) while it runs
+            asyncio.get_running_loop().run_in_executor(None, load_models)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if scoring_pool is not None:
+                scoring_pool.shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    start = time.perf_counter()
+    route, method = scope["path"], scope["method"]
+    content_type = "application/json"
+    if route == "/v1/predict" and method == "POST":
+        try:
+            status, body, headers = await predict_json(scope, receive)
+        except ClientDisconnected:
+            # Nobody is left to answer; not a server error
+            predict_logger.debug("Client disconnected before sending its whole request body.")
+            return
+    elif route == "/healthz" and method == "GET":
+        status, body, headers = healthz()
+    elif route == "/metrics" and method == "GET":
+        status, body, headers = metrics()
+        if status == 200:
+            content_type = "text/plain; version=0.0.4"
+    else:
+        route = "unmatched"
+        status, body, headers = 404, {"error": "Not found."}, ()
+    await send_response(send, status, body, content_type, headers)
+    prediction_metrics.observe_request(route, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="asyncio server for the Spotify genre predictor.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--pool", choices=["thread", "process"], default=settings["pool"])
+    parser.add_argument("--workers", type=int, default=settings["workers"], help="Scoring pool size.")
+    parser.add_argument("--queue-size", type=int, default=settings["queue_size"],
+                        help="Jobs allowed to wait for a worker before 429.")
+    parser.add_argument("--deadline-ms", type=float, default=settings["deadline_ms"],
+                        help="Per-request deadline; 504 after it.")
+    args = parser.parse_args()
+    settings.update(pool=args.pool, workers=args.workers, queue_size=args.queue_size, deadline_ms=args.deadline_ms)
+
+    logging.info(f"Starting ASGI application with {settings}...")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -11,14 +11,96 @@ current_dir = Path(__file__).resolve().parent
 sys.path.append(str(current_dir))
 # --- END OF FIX ---
 
-from flask import Flask, request, render_template
-from src.pipeline.predict_pipeline import CustomData, PredictPipeline
-from src.logger import logging
+import time
+import threading
+from flask import Flask, request, render_template, jsonify, g, Response
+from src.pipeline.predict_pipeline import CustomData, PredictPipeline, validate_feature_records, predictions_to_records, parse_top_k
+from src.pipeline.request_coalescer import PredictionCoalescer
+from src.pipeline.prediction_cache import PredictionCache
+from src.pipeline.metrics import prediction_metrics, render_histogram, render_gauges
+from src.logger import logging, predict_logger
 from src.exception import CustomException
 
+# Maximum number of records accepted in one /v1/predict call
+MAX_RECORDS_PER_REQUEST = 10000
+
 # Initialize the Flask app
 app = Flask(__name__)
 
+# Cache of single-song answers for the form. PREDICTION_CACHE_SIZE=0 turns it off.
+prediction_cache = None
+if int(os.environ.get("PREDICTION_CACHE_SIZE", "4096")) > 0:
+    ttl_seconds = os.environ.get("PREDICTION_CACHE_TTL_SECONDS")
+    prediction_cache = PredictionCache(
+        max_entries=int(os.environ.get("PREDICTION_CACHE_SIZE", "4096")),
+        ttl_seconds=float(ttl_seconds) if ttl_seconds else None,
+    )
+
+# One pipeline for the whole app. Its artifacts are loaded at startup (below),
+# not inside each request.
+predict_pipeline = PredictPipeline(prediction_cache=prediction_cache)
+model_state = {"loaded": False, "error": None}
+
+# Optional micro-batching: set PREDICTION_COALESCING=1 to merge concurrent
+# requests into one predict_batch call.
+coalescer = None
+
+def start_coalescer():
+    """
+    Creates the coalescer (and its background thread) when it is enabled.
+    Forked workers call this again, because threads do not survive a fork.
+    """
+    global coalescer
+    if os.environ.get("PREDICTION_COALESCING", "0") == "1":
+        coalescer = PredictionCoalescer(
+            predict_pipeline,
+            max_wait_ms=float(os.environ.get("COALESCER_MAX_WAIT_MS", "5")),
+            max_batch_size=int(os.environ.get("COALESCER_MAX_BATCH_SIZE", "64")),
+        )
+    return coalescer
+
+start_coalescer()
+
+def score_with_coalescer(record):
+    """
+    Scores one form record as part of the coalescer's next batch.
+    """
+    prediction = coalescer.submit([record]).iloc[0]
+    return prediction["predicted_genre"], prediction["confidence"]
+
+def load_models():
+    """
+    Loads the model, preprocessor and label encoder into memory.
+    /healthz reports 503 until this has finished.
+    """
+    try:
+        logging.info("Loading model artifacts at startup...")
+        predict_pipeline.load_artifacts()
+        predict_pipeline.get_fast_preprocessor()
+        model_state["loaded"] = True
+        model_state["error"] = None
+        logging.info("Model artifacts loaded. Ready to serve.")
+    except Exception as e:
+        model_state["error"] = str(e)
+        logging.error(f"Failed to load model artifacts at startup: {e}")
+
+# Warm up in the background so the server can answer /healthz right away
+warmup_thread = threading.Thread(target=load_models, name="model-warmup", daemon=True)
+warmup_thread.start()
+
+# Request latency per route (skipped entirely when PREDICTION_METRICS=0)
+@app.before_request
+def start_request_timer():
+    if prediction_metrics.enabled:
+        g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    if prediction_metrics.enabled and "request_start" in g:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        prediction_metrics.observe_request(route, time.perf_counter() - g.request_start)
+    return response
+
 # Route for the home page
 @app.route('/')
 def home_page():
@@ -29,7 +111,7 @@ def home_page():
 def predict_datapoint():
     try:
         if request.method == 'POST':
-            logging.info("Prediction request received.")
+            predict_logger.debug("Prediction request received.")
 
             # 1. Get all the data from the HTML form
             data = CustomData(
@@ -47,22 +129,85 @@ def predict_datapoint():
                 time_signature=int(request.form.get('time_signature'))
             )
             
-            # 2. Convert the data into a DataFrame
-            features_df = data.get_data_as_dataframe()
-
-            # 3. Call the prediction pipeline
-            predict_pipeline = PredictPipeline()
-            result = predict_pipeline.predict(features_df)
+            # 2. Call the prediction pipeline. The prediction cache answers first;
+            #    misses go through the coalescer when it is enabled.
+            result, confidence = predict_pipeline.predict_record(
+                data.get_data_as_dict(),
+                scorer=score_with_coalescer if coalescer is not None else None,
+            )
             
-            logging.info(f"Prediction complete. Result: {result}")
+            predict_logger.info("Prediction complete. Result: %s", result)
 
-            # 4. Send the result back to the home.html page
-            return render_template('home.html', prediction_result=f"Predicted Genre: {result}")
+            # 3. Send the result back to the home.html page
+            return render_template('home.html', prediction_result=f"Predicted Genre: {result} ({confidence:.2f}% confidence)")
 
     except Exception as e:
         logging.error(f"An error occurred in the /predict route: {e}")
         raise CustomException(e, sys)
 
+# Machine endpoint: score a JSON array of feature records in one pass
+@app.route('/v1/predict', methods=['POST'])
+def predict_json():
+    if not model_state["loaded"]:
+        return jsonify({"error": "Model is still loading."}), 503
+
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        return jsonify({"error": "Request body must be a JSON array of feature records."}), 400
+    if len(records) > MAX_RECORDS_PER_REQUEST:
+        return jsonify({"error": f"At most {MAX_RECORDS_PER_REQUEST} records are allowed per request."}), 413
+
+    try:
+        features_df, errors = validate_feature_records(records)
+        if errors:
+            return jsonify({"error": "Invalid feature records.", "details": errors}), 422
+        if features_df.empty:
+            return jsonify({"predictions": []})
+
+        top_k = parse_top_k(request.args.get('top_k'))
+        if coalescer is not None and top_k == 3:
+            predictions = coalescer.submit(features_df)
+        else:
+            predictions = predict_pipeline.predict_batch(features_df, top_k=top_k)
+
+        results = predictions_to_records(predictions, top_k)
+        predict_logger.info("/v1/predict scored %d records.", len(results))
+        return jsonify({"predictions": results})
+
+    except Exception as e:
+        logging.error(f"An error occurred in the /v1/predict route: {e}")
+        return jsonify({"error": "Prediction failed."}), 500
+
+# Health check for the load balancer: 200 only once the models are in memory
+@app.route('/healthz')
+def healthz():
+    status = {"model_loaded": model_state["loaded"], "error": model_state["error"]}
+    if coalescer is not None:
+        status["coalescer"] = coalescer.stats()
+    if prediction_cache is not None:
+        status["prediction_cache"] = prediction_cache.stats()
+    return jsonify(status), (200 if model_state["loaded"] else 503)
+
+# Prometheus scrape endpoint (text exposition format). Numbers are per
+# process: with serve_flask.py each worker keeps its own.
+@app.route('/metrics')
+def metrics():
+    if not prediction_metrics.enabled:
+        return jsonify({"error": "Metrics are disabled (PREDICTION_METRICS=0)."}), 404
+
+    lines = [prediction_metrics.render_prometheus().rstrip("\n")]
+    lines.append("# HELP spotify_model_loaded 1 once the model artifacts are in memory.")
+    lines.append("# TYPE spotify_model_loaded gauge")
+    lines.append(f"spotify_model_loaded {int(model_state['loaded'])}")
+    if prediction_cache is not None:
+        render_gauges(lines, "spotify_prediction_cache", "Prediction cache", prediction_cache.stats())
+    if coalescer is not None:
+        lines.append("# TYPE spotify_coalescer_batch_rows histogram")
+        render_histogram(lines, "spotify_coalescer_batch_rows", None, None, coalescer.batch_size_histogram)
+        lines.append("# TYPE spotify_coalescer_queue_depth histogram")
+        render_histogram(lines, "spotify_coalescer_queue_depth", None, None, coalescer.queue_depth_histogram)
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
 # This block allows you to run the app from the terminal
 if __name__ == "__main__":
     logging.info("Starting Flask application...")
@@ -0,0 +1,65 @@
+# benchmarks/columnar_handoff_benchmark.py
+#
+# How long does DataTransformation take to read its input from train.csv
+# versus the columnar .npy folder written by DataIngestion?
+#
+# Run from the project root:
+#   python benchmarks/columnar_handoff_benchmark.py --scale 10
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+current_dir = Path(__file__).resolve().parent
+root_dir = current_dir.parent
+sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import pandas as pd
+
+from src.utils import save_columnar
+from src.components.data_ingestion import RAW_DATA_DTYPES
+from src.components.data_transformation import DataTransformation
+
+
+def best_of(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs columnar handoff read time.")
+    parser.add_argument("--data", default="artifacts/train.csv")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the rows this many times.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    df = pd.concat([pd.read_csv(args.data)] * args.scale, ignore_index=True)
+    work_dir = tempfile.mkdtemp(prefix="handoff_bench_")
+    try:
+        csv_path = os.path.join(work_dir, "train.csv")
+        columnar_path = os.path.join(work_dir, "train_columns")
+        df.to_csv(csv_path, index=False)
+        save_columnar(columnar_path, df, RAW_DATA_DTYPES)
+
+        csv_seconds = best_of(lambda: DataTransformation.read_split(csv_path), args.repeats)
+        columnar_seconds = best_of(lambda: DataTransformation.read_split(columnar_path), args.repeats)
+
+        print(f"rows: {len(df)}")
+        print(f"csv read:      {csv_seconds * 1000:9.1f} ms")
+        print(f"columnar read: {columnar_seconds * 1000:9.1f} ms  ({csv_seconds / columnar_seconds:.0f}x faster)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
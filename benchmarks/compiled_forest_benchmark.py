@@ -0,0 +1,65 @@
+# benchmarks/compiled_forest_benchmark.py
+#
+# Compares sklearn's RandomForestClassifier.predict_proba with the NumPy-only
+# CompiledForest on rows from artifacts/test.csv.
+#
+# Run from the project root:
+#   python benchmarks/compiled_forest_benchmark.py
+
+import sys
+import time
+import pickle
+import argparse
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+current_dir = Path(__file__).resolve().parent
+root_dir = current_dir.parent
+sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+import pandas as pd
+
+from src.components.forest_compiler import compile_forest
+
+
+def time_call(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sklearn vs CompiledForest latency.")
+    parser.add_argument("--model", default="artifacts/spotify_genre_model.pkl")
+    parser.add_argument("--preprocessor", default="artifacts/preprocessor.pkl")
+    parser.add_argument("--data", default="artifacts/test.csv")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as file_obj:
+        model = pickle.load(file_obj)
+    with open(args.preprocessor, "rb") as file_obj:
+        preprocessor = pickle.load(file_obj)
+
+    X = preprocessor.transform(pd.read_csv(args.data))
+    compiled = compile_forest(model)
+
+    max_difference = np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max()
+    print(f"Max |probability difference| over {X.shape[0]} rows: {max_difference:.2e}")
+    assert max_difference < 1e-6, "CompiledForest does not match sklearn!"
+
+    print(f"{'rows':>6} {'sklearn ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for n_rows in (1, 8, 32, 128, 1024):
+        batch = X[:n_rows]
+        sklearn_ms = time_call(lambda: model.predict_proba(batch), args.repeats)
+        compiled_ms = time_call(lambda: compiled.predict_proba(batch), args.repeats)
+        print(f"{n_rows:>6} {sklearn_ms:>12.3f} {compiled_ms:>12.3f} {sklearn_ms / compiled_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# benchmarks/load_test.py
+#
+# Throughput and tail latency of POST /v1/predict on the two servers:
+#   - flask: serve_flask.py (pre-fork, threaded Werkzeug workers)
+#   - asgi:  app_asgi.py (uvicorn event loop + bounded scoring pool)
+#
+# Each server is started in a subprocess on its own port and driven by a
+# closed-loop asyncio client: `concurrency` connections, each sending its next
+# request as soon as the previous answer arrives, for `duration` seconds.
+# 429 / 504 answers are counted separately; latency percentiles cover 200s.
+#
+# Run from the project root:
+#   python benchmarks/load_test.py --concurrency 32 --duration 15 --records 10 --output load.json
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+current_dir = Path(__file__).resolve().parent
+root_dir = current_dir.parent
+sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+
+RECORD = {
+    "danceability": 0.5, "energy": 0.6, "loudness": -6.0, "speechiness": 0.05,
+    "acousticness": 0.1, "instrumentalness": 0.0, "liveness": 0.1, "valence": 0.5,
+    "tempo": 120.0, "key": 5, "mode": 1, "time_signature": 4,
+}
+
+
+def server_command(name, port, args):
+    if name == "flask":
+        return [sys.executable, "serve_flask.py", "--port", str(port),
+                "--workers", str(args.flask_workers), "--report-interval", "0"]
+    return [sys.executable, "app_asgi.py", "--port", str(port), "--pool", args.asgi_pool,
+            "--workers", str(args.asgi_workers), "--queue-size", str(args.asgi_queue_size),
+            "--deadline-ms", str(args.asgi_deadline_ms)]
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_until_healthy(port, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before becoming healthy.")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} was not healthy after {timeout} s.")
+
+
+async def read_response(reader):
+    """
+    Reads one HTTP/1.x response. Returns (status, keep_alive).
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    version, status = lines[0].split(" ")[:2]
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    else:
+        await reader.read()  # body runs until the server closes the connection
+        keep_alive = False
+    return int(status), keep_alive
+
+
+async def client(port, request, stop_at, latencies, statuses):
+    reader = writer = None
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2 ** 22)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError):
+            statuses["connection_error"] = statuses.get("connection_error", 0) + 1
+            keep_alive = False
+        else:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def drive(port, concurrency, duration, records):
+    body = json.dumps([RECORD] * records).encode()
+    request = (
+        f"POST /v1/predict HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    stop_at = start + duration
+    await asyncio.gather(*(client(port, request, stop_at, latencies, statuses) for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def summarize(latencies, statuses, elapsed, records):
+    result = {
+        "ok_requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "records_per_second": round(len(latencies) * records / elapsed, 1),
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+    if latencies:
+        milliseconds = np.array(latencies) * 1000
+        for percentile in (50, 95, 99):
+            result[f"p{percentile}_ms"] = round(float(np.percentile(milliseconds, percentile)), 2)
+        result["max_ms"] = round(float(milliseconds.max()), 2)
+    return result
+
+
+def run_server(name, args):
+    port = free_port()
+    process = subprocess.Popen(server_command(name, port, args), cwd=root_dir,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_healthy(port, process, args.startup_timeout)
+        # Short warm-up so both servers are measured in steady state
+        asyncio.run(drive(port, args.concurrency, min(2.0, args.duration), args.records))
+        latencies, statuses, elapsed = asyncio.run(drive(port, args.concurrency, args.duration, args.records))
+        return summarize(latencies, statuses, elapsed, args.records)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask vs ASGI /v1/predict load test.")
+    parser.add_argument("--servers", nargs="+", default=["flask", "asgi"], choices=["flask", "asgi"])
+    parser.add_argument("--concurrency", type=int, default=32, help="Simultaneous client connections.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of measured load per server.")
+    parser.add_argument("--records", type=int, default=10, help="Feature records per request.")
+    parser.add_argument("--flask-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--asgi-pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--asgi-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--asgi-queue-size", type=int, default=64)
+    parser.add_argument("--asgi-deadline-ms", type=float, default=2000)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = {"settings": {key: value for key, value in vars(args).items() if key != "output"}}
+    for name in args.servers:
+        results[name] = run_server(name, args)
+        print(f"{name}: {results[name]}", flush=True)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(results, file_obj, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+# benchmarks/run_benchmarks.py
+#
+# The benchmark suite for training and inference. Works offline: it only
+# needs artifacts/train.csv + artifacts/test.csv (and the trained artifacts
+# for the inference cases).
+#
+# Synthetic datasets of 1x, 10x and 100x the rows of train+test are made by
+# resampling rows and adding a little noise to the audio features. Then every
+# case runs in its own fresh process (so the peak RSS and the load times are
+# those of that case alone):
+#
+#   ingestion        DataIngestion throughput (streaming, full dataset)
+#   transformation   DataTransformation time on the ingested splits
+#   fit              RandomForest fit time vs n_estimators and n_jobs (cores)
+#   artifact_load    cold load time of each artifact and of PredictPipeline
+#   single_row       predict_record latency distribution (p50/p90/p99/max)
+#   batch            predict_batch throughput for growing batch sizes
+#
+# Results (plus Python/library versions, CPU count and git commit) are
+# written as JSON. Run from the project root:
+#   python benchmarks/run_benchmarks.py --scales 1 10 100 --output bench.json
+#   python benchmarks/run_benchmarks.py --compare old.json new.json
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# --- THIS IS THE FIX ---
+current_dir = Path(__file__).resolve().parent
+root_dir = current_dir.parent
+sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_NOISE_COLUMNS = [
+    'danceability', 'energy', 'speechiness', 'acousticness',
+    'instrumentalness', 'liveness', 'valence',
+]
+
+
+# --- 1. Synthetic data ---
+
+def make_synthetic_dataset(source_paths, scale, output_path, seed=42):
+    """
+    Writes a raw dataset with `scale` times the rows of the source CSVs.
+    Rows are drawn with replacement, the 0..1 audio features get a little
+    Gaussian noise, loudness/tempo a little more, and every row gets a new
+    track_id so the hash-based train/test split stays balanced.
+    """
+    source = pd.concat([pd.read_csv(path) for path in source_paths], ignore_index=True)
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(source), size=len(source) * scale) if scale > 1 else np.arange(len(source))
+    df = source.iloc[rows].reset_index(drop=True)
+    if scale > 1:
+        for column in NUMERIC_NOISE_COLUMNS:
+            df[column] = (df[column] + rng.normal(0, 0.01, len(df))).clip(0.0, 1.0)
+        df['loudness'] = (df['loudness'] + rng.normal(0, 0.2, len(df))).clip(upper=0.0)
+        df['tempo'] = (df['tempo'] + rng.normal(0, 0.5, len(df))).clip(lower=0.0)
+        df['track_id'] = [f"synthetic{position:012d}" for position in range(len(df))]
+    df.to_csv(output_path, index=False)
+    return len(df)
+
+
+# --- 2. The benchmark cases (each runs inside a fresh process) ---
+
+def _ingest(work_dir, scale, streaming=True):
+    from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+
+    scale_dir = os.path.join(work_dir, f"scale_{scale}")
+    config = DataIngestionConfig(
+        raw_data_path=os.path.join(work_dir, f"dataset_{scale}x.csv"),
+        train_data_path=os.path.join(scale_dir, "train.csv"),
+        test_data_path=os.path.join(scale_dir, "test.csv"),
+        train_columnar_path=os.path.join(scale_dir, "train_columns"),
+        test_columnar_path=os.path.join(scale_dir, "test_columns"),
+        export_csv=False,
+        streaming=streaming,
+        sample_size=None,
+    )
+    return DataIngestion(config).initiate_data_ingestion()
+
+
+def _transform(work_dir, scale):
+    from src.components.data_transformation import DataTransformation, DataTransformationConfig
+
+    scale_dir = os.path.join(work_dir, f"scale_{scale}")
+    transformation = DataTransformation()
+    transformation.transformation_config = DataTransformationConfig(
+        preprocessor_obj_file_path=os.path.join(scale_dir, "preprocessor.pkl"),
+        label_encoder_obj_file_path=os.path.join(scale_dir, "label_encoder.pkl"),
+    )
+    return transformation.initiate_data_transformation(
+        os.path.join(scale_dir, "train_columns"), os.path.join(scale_dir, "test_columns")
+    )
+
+
+def case_ingestion(work_dir, scale):
+    start = time.perf_counter()
+    _ingest(work_dir, scale)
+    seconds = time.perf_counter() - start
+    rows = sum(1 for _ in open(os.path.join(work_dir, f"dataset_{scale}x.csv"))) - 1
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds}
+
+
+def case_transformation(work_dir, scale):
+    start = time.perf_counter()
+    X_train, _, X_test, _, _ = _transform(work_dir, scale)
+    seconds = time.perf_counter() - start
+    # Rows left after the 'Other' genre is dropped, i.e. rows actually transformed
+    rows = X_train.shape[0] + X_test.shape[0]
+    return {"processed_rows": rows, "seconds": seconds, "rows_per_second": rows / seconds}
+
+
+def case_fit(work_dir, scale, n_estimators, n_jobs):
+    from sklearn.ensemble import RandomForestClassifier
+
+    X_train, y_train, _, _, _ = _transform(work_dir, scale)
+    model = RandomForestClassifier(
+        n_estimators=n_estimators, class_weight='balanced', random_state=42, n_jobs=n_jobs
+    )
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+    return {"rows": int(X_train.shape[0]), "seconds": seconds, "trees_per_second": n_estimators / seconds}
+
+
+def case_artifact_load():
+    from src.utils import load_object
+    from src.pipeline.predict_pipeline import PredictPipeline
+
+    pipeline = PredictPipeline()
+    result = {}
+    for name, path in [("model", pipeline.model_path), ("preprocessor", pipeline.preprocessor_path),
+                       ("label_encoder", pipeline.label_encoder_path), ("compiled_model", pipeline.compiled_model_path)]:
+        if os.path.exists(path):
+            start = time.perf_counter()
+            load_object(path)
+            result[f"{name}_seconds"] = time.perf_counter() - start
+            result[f"{name}_bytes"] = os.path.getsize(path)
+
+    # The whole serving warm-up, as app_flask.load_models() does it
+    start = time.perf_counter()
+    pipeline.load_artifacts()
+    pipeline.get_fast_preprocessor()
+    result["pipeline_warmup_seconds"] = time.perf_counter() - start
+    return result
+
+
+def case_single_row(n_requests):
+    from src.pipeline.predict_pipeline import PredictPipeline, FEATURE_COLUMNS
+
+    pipeline = PredictPipeline()
+    pipeline.load_artifacts()
+    records = pd.read_csv(os.path.join("artifacts", "test.csv"))[FEATURE_COLUMNS].to_dict("records")
+    pipeline.predict_record(records[0])  # warm-up
+
+    timings = []
+    for position in range(n_requests):
+        record = records[position % len(records)]
+        start = time.perf_counter()
+        pipeline.predict_record(record)
+        timings.append(time.perf_counter() - start)
+    timings_ms = np.array(timings) * 1000
+    return {
+        "requests": n_requests,
+        "mean_ms": float(timings_ms.mean()),
+        "p50_ms": float(np.percentile(timings_ms, 50)),
+        "p90_ms": float(np.percentile(timings_ms, 90)),
+        "p99_ms": float(np.percentile(timings_ms, 99)),
+        "max_ms": float(timings_ms.max()),
+    }
+
+
+def case_batch(batch_rows, repeats):
+    from src.pipeline.predict_pipeline import PredictPipeline, FEATURE_COLUMNS
+
+    pipeline = PredictPipeline()
+    pipeline.load_artifacts()
+    test_df = pd.read_csv(os.path.join("artifacts", "test.csv"))[FEATURE_COLUMNS]
+    batch = test_df.sample(n=batch_rows, replace=batch_rows > len(test_df), random_state=42).reset_index(drop=True)
+    pipeline.predict_batch(batch.head(10))  # warm-up
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pipeline.predict_batch(batch)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {"rows": batch_rows, "seconds": best, "rows_per_second": batch_rows / best}
+
+
+CASES = {
+    "ingestion": case_ingestion,
+    "transformation": case_transformation,
+    "fit": case_fit,
+    "artifact_load": case_artifact_load,
+    "single_row": case_single_row,
+    "batch": case_batch,
+}
+
+
+def run_case_in_child(case, params):
+    """
+    Runs inside the fresh process. ru_maxrss is the peak resident memory
+    of this process only (in kB on Linux).
+    """
+    result = CASES[case](**params)
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def run_case(case, params):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        start = time.perf_counter()
+        try:
+            result = pool.submit(run_case_in_child, case, params).result()
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        result["wall_seconds"] = time.perf_counter() - start
+
+    shown_params = {key: value for key, value in params.items() if key != "work_dir"}
+    print(f"{case:<15} {json.dumps(shown_params):<40} "
+          f"{json.dumps({key: round(value, 4) if isinstance(value, float) else value for key, value in result.items()})}",
+          flush=True)
+    return {"case": case, "params": shown_params, "metrics": result}
+
+
+# --- 3. Metadata, comparison and the main entry point ---
+
+def environment_info():
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root_dir, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(old_path, new_path):
+    """
+    Prints the % change of every metric that appears in both result files.
+    """
+    with open(old_path) as file_obj:
+        old = {(item["case"], json.dumps(item["params"], sort_keys=True)): item["metrics"]
+               for item in json.load(file_obj)["results"]}
+    with open(new_path) as file_obj:
+        new = json.load(file_obj)["results"]
+
+    print(f"{'case':<15} {'params':<40} {'metric':<26} {'old':>12} {'new':>12} {'change':>8}")
+    for item in new:
+        previous = old.get((item["case"], json.dumps(item["params"], sort_keys=True)))
+        if previous is None:
+            continue
+        for metric, value in item["metrics"].items():
+            old_value = previous.get(metric)
+            if isinstance(value, (int, float)) and isinstance(old_value, (int, float)) and old_value:
+                change = (value - old_value) / old_value * 100
+                print(f"{item['case']:<15} {json.dumps(item['params']):<40} {metric:<26} "
+                      f"{old_value:>12.4g} {value:>12.4g} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training and inference benchmark suite.")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100],
+                        help="Dataset sizes as multiples of train.csv + test.csv.")
+    parser.add_argument("--n-estimators", nargs="+", type=int, default=[25, 50, 100])
+    parser.add_argument("--n-jobs", nargs="+", type=int, default=None,
+                        help="Core counts for the fit case (default: 1 and all cores).")
+    parser.add_argument("--single-row-requests", type=int, default=2000)
+    parser.add_argument("--batch-rows", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--work-dir", help="Where the synthetic data goes (default: a temp folder, removed after).")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD_JSON", "NEW_JSON"),
+                        help="Only compare two earlier result files.")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    os.chdir(root_dir)  # the artifacts/ paths are relative to the project root
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="spotify_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    # Keep the benchmark's own log lines out of the project's logs/ folder
+    os.environ.setdefault("LOG_DIR", os.path.join(work_dir, "logs"))
+
+    results = []
+    try:
+        training_cases = [case for case in ("ingestion", "transformation", "fit") if case in args.cases]
+        if training_cases:
+            sources = [os.path.join("artifacts", "train.csv"), os.path.join("artifacts", "test.csv")]
+            for scale in sorted(set(args.scales) | ({1} if "fit" in args.cases else set())):
+                path = os.path.join(work_dir, f"dataset_{scale}x.csv")
+                if not os.path.exists(path):
+                    rows = make_synthetic_dataset(sources, scale, path)
+                    print(f"Synthetic dataset {scale}x: {rows} rows -> {path}", flush=True)
+                # Later cases read the ingested splits, so ingest even if only fit was asked for
+                if "ingestion" in args.cases and scale in args.scales:
+                    results.append(run_case("ingestion", {"work_dir": work_dir, "scale": scale}))
+                else:
+                    _ingest(work_dir, scale)
+                if "transformation" in args.cases and scale in args.scales:
+                    results.append(run_case("transformation", {"work_dir": work_dir, "scale": scale}))
+
+            if "fit" in args.cases:
+                n_jobs_values = args.n_jobs or sorted({1, os.cpu_count() or 1})
+                for n_jobs in n_jobs_values:
+                    for n_estimators in args.n_estimators:
+                        results.append(run_case("fit", {"work_dir": work_dir, "scale": 1,
+                                                        "n_estimators": n_estimators, "n_jobs": n_jobs}))
+
+        inference_cases = [case for case in ("artifact_load", "single_row", "batch") if case in args.cases]
+        if inference_cases and not os.path.exists(os.path.join("artifacts", "spotify_genre_model.pkl")):
+            print("No trained model in artifacts/, skipping the inference cases.", flush=True)
+            inference_cases = []
+        if "artifact_load" in inference_cases:
+            results.append(run_case("artifact_load", {}))
+        if "single_row" in inference_cases:
+            results.append(run_case("single_row", {"n_requests": args.single_row_requests}))
+        if "batch" in inference_cases:
+            for batch_rows in args.batch_rows:
+                results.append(run_case("batch", {"batch_rows": batch_rows, "repeats": args.repeats}))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {"environment": environment_info(), "arguments": vars(args), "results": results}
+    with open(args.output, "w") as file_obj:
+        json.dump(report, file_obj, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# benchmarks/startup_benchmark.py
+#
+# Cold-start cost of the two prediction entry points, measured in fresh
+# Python processes (python -X importtime):
+#   - import time of app_flask.py / app.py, and the slowest imports
+#   - time until the model is warm
+#   - latency of the first and second prediction
+#
+# Run from the project root:
+#   python benchmarks/startup_benchmark.py --repeats 3 --output startup.json
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import importlib.util
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+current_dir = Path(__file__).resolve().parent
+root_dir = current_dir.parent
+sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+RECORD = {
+    "danceability": 0.5, "energy": 0.6, "loudness": -6.0, "speechiness": 0.05,
+    "acousticness": 0.1, "instrumentalness": 0.0, "liveness": 0.1, "valence": 0.5,
+    "tempo": 120.0, "key": 5, "mode": 1, "time_signature": 4,
+}
+
+# Each snippet runs in a fresh interpreter and prints one JSON line of timings.
+FLASK_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import app_flask
+imported = time.perf_counter()
+app_flask.warmup_thread.join()
+warm = time.perf_counter()
+client = app_flask.app.test_client()
+client.post("/v1/predict", json=[RECORD])
+first = time.perf_counter()
+client.post("/v1/predict", json=[RECORD])
+second = time.perf_counter()
+print("TIMINGS " + json.dumps({
+    "import_seconds": imported - start,
+    "warm_seconds": warm - imported,
+    "first_prediction_seconds": first - warm,
+    "second_prediction_seconds": second - first,
+}))
+"""
+
+# app.py is a Streamlit script. Outside "streamlit run" it executes in bare
+# mode, where the widgets return their defaults and the form is not submitted.
+STREAMLIT_SNIPPET = """
+import json, time, runpy
+start = time.perf_counter()
+import streamlit
+imported = time.perf_counter()
+app_globals = runpy.run_path("app.py")
+warm = time.perf_counter()
+pipeline = app_globals["pipeline_resource"]["pipeline"]
+pipeline.predict_record(RECORD)
+first = time.perf_counter()
+pipeline.predict_record(RECORD)
+second = time.perf_counter()
+print("TIMINGS " + json.dumps({
+    "import_seconds": imported - start,
+    "warm_seconds": warm - imported,
+    "first_prediction_seconds": first - warm,
+    "second_prediction_seconds": second - first,
+}))
+"""
+
+ENTRY_POINTS = {
+    "app_flask": (FLASK_SNIPPET, "flask"),
+    "app": (STREAMLIT_SNIPPET, "streamlit"),
+}
+
+
+def parse_importtime(stderr, top):
+    """
+    Returns the `top` slowest top-level imports from -X importtime output,
+    as (module, cumulative_ms) pairs, plus their total in ms.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):  # nested import, already counted by its parent
+            continue
+        imports.append((name.strip(), int(cumulative) / 1000))
+    total_ms = sum(ms for _, ms in imports)
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return imports[:top], total_ms
+
+
+def run_once(snippet):
+    code = f"RECORD = {RECORD!r}\n{snippet}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=root_dir, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": str(root_dir)},
+    )
+    timings = None
+    for line in completed.stdout.splitlines():
+        if line.startswith("TIMINGS "):
+            timings = json.loads(line[len("TIMINGS "):])
+    if completed.returncode != 0 or timings is None:
+        raise RuntimeError(completed.stderr[-2000:])
+    return timings, completed.stderr
+
+
+def benchmark_entry_point(name, repeats, top):
+    snippet, framework = ENTRY_POINTS[name]
+    if importlib.util.find_spec(framework) is None:
+        return {"skipped": f"{framework} is not installed"}
+
+    runs = []
+    slowest_imports, import_total_ms = [], 0.0
+    for _ in range(repeats):
+        timings, stderr = run_once(snippet)
+        runs.append(timings)
+        slowest_imports, import_total_ms = parse_importtime(stderr, top)
+
+    # Best of the repeats: the least noisy estimate of each phase
+    result = {key: round(min(run[key] for run in runs) * 1000, 2) for key in runs[0]}
+    result = {key.replace("_seconds", "_ms"): value for key, value in result.items()}
+    result["importtime_total_ms"] = round(import_total_ms, 1)
+    result["slowest_imports_ms"] = {module: round(ms, 1) for module, ms in slowest_imports}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and first-prediction latency of the app entry points.")
+    parser.add_argument("--entry-points", nargs="+", default=list(ENTRY_POINTS), choices=list(ENTRY_POINTS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = {name: benchmark_entry_point(name, args.repeats, args.top) for name in args.entry_points}
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(results, file_obj, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# serve_flask.py
+#
+# Production launcher for app_flask.py (Linux only).
+#
+# The master process loads the model, preprocessor and label encoder once,
+# freezes them with gc.freeze() and then forks the workers. The workers share
+# the model's memory pages with the master (copy-on-write) instead of each
+# holding its own copy of the forest.
+#
+# Run from the project root:
+#   python serve_flask.py --workers 4 --port 8088
+
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+import argparse
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+current_dir = Path(__file__).resolve().parent
+sys.path.append(str(current_dir))
+# --- END OF FIX ---
+
+from werkzeug.serving import make_server
+
+import app_flask
+from src.logger import logging, stop_logging, start_worker_logging
+
+# Fields of /proc/<pid>/smaps_rollup we report, in kB
+MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_memory(pid):
+    """
+    Memory of one process from /proc/<pid>/smaps_rollup, in MB.
+    Pss splits shared pages between the processes that share them, so the
+    sum of Pss over all workers is what the whole server really uses.
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file_obj:
+            for line in file_obj:
+                name, _, rest = line.partition(":")
+                if name in MEMORY_FIELDS:
+                    memory[name] = round(int(rest.split()[0]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    if memory:
+        memory["Shared"] = round(memory.get("Shared_Clean", 0) + memory.get("Shared_Dirty", 0), 1)
+        memory["Private"] = round(memory.get("Private_Clean", 0) + memory.get("Private_Dirty", 0), 1)
+    return memory
+
+
+def report_memory(workers):
+    lines = []
+    total_pss = 0.0
+    for pid in [os.getpid()] + sorted(workers):
+        memory = read_memory(pid)
+        if not memory:
+            continue
+        role = "master" if pid == os.getpid() else "worker"
+        total_pss += memory.get("Pss", 0)
+        lines.append(f"{role} {pid}: RSS {memory.get('Rss', 0)} MB, PSS {memory.get('Pss', 0)} MB, "
+                     f"shared {memory['Shared']} MB, private {memory['Private']} MB")
+    lines.append(f"total PSS: {total_pss:.1f} MB")
+    for line in lines:
+        logging.info(line)
+        print(line, flush=True)
+
+
+def load_in_master():
+    """
+    Waits for the model warm-up, then moves every object that exists now
+    into the permanent GC generation. The collector never touches those
+    objects again, so the workers do not dirty (and copy) their pages.
+    """
+    app_flask.warmup_thread.join()
+    if not app_flask.model_state["loaded"]:
+        raise RuntimeError(f"Model artifacts failed to load: {app_flask.model_state['error']}")
+    gc.collect()
+    gc.freeze()
+    logging.info(f"gc.freeze(): {gc.get_freeze_count()} objects moved to the permanent generation.")
+
+
+def run_worker(listen_socket, host, port):
+    """
+    Body of one forked worker: restart the log writer and coalescer threads
+    (threads do not survive a fork) and serve requests on the socket shared
+    with the master.
+    """
+    # SIGTERM from the master ends serve_forever() through SystemExit, so the
+    # finally block in spawn_worker still gets to flush the logs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Queued logging with this worker's own writer thread; spawn_worker
+    # flushes it with stop_logging() on the way out
+    start_worker_logging()
+    app_flask.start_coalescer()
+    server = make_server(host, port, app_flask.app, threaded=True, fd=listen_socket.fileno())
+    logging.info(f"Worker {os.getpid()} serving on {host}:{port}")
+    server.serve_forever()
+
+
+def spawn_worker(listen_socket, host, port):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(listen_socket, host, port)
+        finally:
+            stop_logging()  # os._exit skips atexit, so flush the log queue here
+            os._exit(0)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork launcher for the Spotify genre predictor.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--report-interval", type=float, default=60.0,
+                        help="Seconds between per-worker memory reports (0 = only at start).")
+    args = parser.parse_args()
+
+    # --- 1. Load the model once, in the master ---
+    load_in_master()
+
+    # --- 2. Open the listening socket once; every worker accepts on it ---
+    listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listen_socket.bind((args.host, args.port))
+    listen_socket.listen(128)
+    listen_socket.set_inheritable(True)
+
+    # --- 3. Fork the workers ---
+    workers = set()
+    for _ in range(args.workers):
+        workers.add(spawn_worker(listen_socket, args.host, args.port))
+    logging.info(f"Master {os.getpid()} started {len(workers)} workers on {args.host}:{args.port}")
+    print(f"Serving on http://{args.host}:{args.port} with {len(workers)} workers", flush=True)
+
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # --- 4. Watch the workers: restart crashed ones, report memory ---
+    time.sleep(1.0)
+    report_memory(workers)
+    next_report = time.monotonic() + args.report_interval
+    while not stopping:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid, status = 0, 0
+        if pid in workers:
+            workers.discard(pid)
+            logging.warning(f"Worker {pid} exited with status {status}; starting a new one.")
+            workers.add(spawn_worker(listen_socket, args.host, args.port))
+            continue
+        if args.report_interval > 0 and time.monotonic() >= next_report:
+            report_memory(workers)
+            next_report = time.monotonic() + args.report_interval
+        time.sleep(0.5)
+
+    # --- 5. Shut down ---
+    logging.info("Stopping workers...")
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in workers:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    listen_socket.close()
+
+
+if __name__ == "__main__":
+    main()
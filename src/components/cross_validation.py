@@ -0,0 +1,241 @@
+# src/components/cross_validation.py
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import LabelEncoder
+from threadpoolctl import threadpool_limits
+
+from src.logger import logging
+from src.exception import CustomException
+from src.components import data_transformation
+from src.components.data_transformation import DataTransformation, consolidate_genre_series
+from src.components.model_selection import build_estimator
+from src.pipeline.stage_cache import StageCache, fingerprint
+
+@dataclass
+class CrossValidationConfig:
+    report_file_path: str = os.path.join("artifacts", "cross_validation_report.json")
+    n_splits: int = 5
+    # (family, params) pairs from model_selection.CANDIDATE_FAMILIES.
+    # The first one is what ModelTrainer trains by default.
+    candidates: tuple = (
+        ("random_forest", {"n_estimators": 100, "class_weight": "balanced"}),
+        ("extra_trees", {"n_estimators": 100, "class_weight": "balanced"}),
+        ("logistic_regression", {"C": 1.0, "max_iter": 1000, "class_weight": "balanced"}),
+    )
+    # Confidence level of the precision / recall / accuracy intervals
+    confidence: float = 0.95
+    # Each (fold, candidate) fit gets this many threads; the pool gets
+    # cpu_count // threads_per_fit workers unless n_workers is set
+    threads_per_fit: int = 1
+    n_workers: Optional[int] = None
+    random_state: int = 42
+
+
+def wilson_interval(successes, trials, confidence):
+    """
+    Wilson score interval for a proportion (e.g. precision = TP / predicted).
+    Unlike the normal approximation it stays inside [0, 1] and works for
+    small counts. Returns [low, high], or [0, 1] when there are no trials.
+    """
+    if trials == 0:
+        return [0.0, 1.0]
+    z = norm.ppf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    center = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return [round(float(center - half_width), 4), round(float(center + half_width), 4)]
+
+
+def run_fold(task):
+    """
+    Fits one candidate on one fold's cached, already-transformed arrays and
+    predicts its validation rows. Runs inside a worker process.
+    """
+    with threadpool_limits(limits=task["threads"]):
+        fold = np.load(task["fold_path"])
+        model = build_estimator(task["family"], task["params"], task["threads"], task["random_state"])
+        start = time.perf_counter()
+        model.fit(fold["X_train"], fold["y_train"])
+        fit_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        y_pred = model.predict(fold["X_val"])
+        predict_seconds = time.perf_counter() - start
+        return {
+            "candidate": task["candidate"],
+            "fold": task["fold"],
+            "y_pred": y_pred,
+            "fit_seconds": round(fit_seconds, 3),
+            "predict_seconds": round(predict_seconds, 4),
+        }
+
+
+class CrossValidator:
+    """
+    Stratified k-fold evaluation (on consolidated_genre) of one or more
+    candidate models:
+
+    1. Each fold's preprocessor is fitted on that fold's training rows, and
+       the transformed arrays are cached in artifacts/cache/cv_folds/<key>/.
+       Every candidate reuses them, and so does the next run on the same data.
+    2. Every (fold, candidate) fit runs in a process pool.
+    3. The out-of-fold predictions give per-class precision / recall with
+       Wilson confidence intervals, plus accuracy per fold.
+    4. Everything, including per-fold fit/predict seconds, goes to a JSON report.
+    """
+    def __init__(self, cv_config: Optional[CrossValidationConfig] = None):
+        self.cv_config = cv_config or CrossValidationConfig()
+        self.stage_cache = StageCache()
+        logging.info("CrossValidator initialized.")
+
+    def prepare_folds(self, data_paths):
+        """
+        Returns (fold paths, validation row indices per fold, y, label encoder,
+        per-fold transform report).
+        """
+        config = self.cv_config
+        df = pd.concat([DataTransformation.read_split(path) for path in data_paths], ignore_index=True)
+        df['consolidated_genre'] = consolidate_genre_series(df['track_genre'])
+        df = df[df['consolidated_genre'] != 'Other'].reset_index(drop=True)
+        le = LabelEncoder()
+        y = le.fit_transform(df['consolidated_genre'])
+        X = df.drop(columns=['consolidated_genre', 'track_genre'])
+
+        # Only what changes the folds goes into the key: adding or removing a
+        # candidate (or a different confidence level) reuses the cached folds
+        key = fingerprint(
+            files=list(data_paths),
+            code_files=[data_transformation.__file__],
+            upstream=[f"n_splits={config.n_splits}", f"random_state={config.random_state}"],
+        )
+        splitter = StratifiedKFold(n_splits=config.n_splits, shuffle=True, random_state=config.random_state)
+        fold_paths, val_indices, transforms = [], [], []
+        for fold, (train_index, val_index) in enumerate(splitter.split(X, y)):
+            start = time.perf_counter()
+            fold_path = self.stage_cache.entry_path("cv_folds", key, f"fold_{fold}.npz")
+            cached = os.path.exists(fold_path)
+            if not cached:
+                preprocessor = DataTransformation().get_data_transformer_object()
+                X_train = preprocessor.fit_transform(X.iloc[train_index])
+                X_val = preprocessor.transform(X.iloc[val_index])
+                np.savez(f"{fold_path}.tmp.npz", X_train=X_train, y_train=y[train_index],
+                         X_val=X_val, y_val=y[val_index])
+                os.replace(f"{fold_path}.tmp.npz", fold_path)
+            fold_paths.append(fold_path)
+            val_indices.append(val_index)
+            transforms.append({"fold": fold, "cache": "hit" if cached else "miss",
+                               "train_rows": len(train_index), "val_rows": len(val_index),
+                               "seconds": round(time.perf_counter() - start, 3)})
+        logging.info(f"{config.n_splits} fold transforms ready under cache key {key}.")
+        return fold_paths, val_indices, y, le, transforms
+
+    def summarize(self, y, y_pred, le):
+        """
+        Per-class precision / recall (with intervals) from the pooled
+        out-of-fold predictions.
+        """
+        confidence = self.cv_config.confidence
+        per_class = {}
+        for code, genre in enumerate(le.classes_):
+            true_positive = int(np.sum((y == code) & (y_pred == code)))
+            support = int(np.sum(y == code))
+            predicted = int(np.sum(y_pred == code))
+            per_class[genre] = {
+                "precision": round(true_positive / predicted, 4) if predicted else 0.0,
+                "precision_ci": wilson_interval(true_positive, predicted, confidence),
+                "recall": round(true_positive / support, 4) if support else 0.0,
+                "recall_ci": wilson_interval(true_positive, support, confidence),
+                "support": support,
+                "predicted": predicted,
+            }
+        return per_class
+
+    def evaluate(self, data_paths):
+        logging.info("--- Starting Cross-Validation ---")
+        try:
+            config = self.cv_config
+            fold_paths, val_indices, y, le, transforms = self.prepare_folds(data_paths)
+
+            threads = max(1, config.threads_per_fit)
+            n_workers = config.n_workers or max(1, (os.cpu_count() or 1) // threads)
+            tasks = [{
+                "candidate": candidate, "family": family, "params": params, "fold": fold,
+                "fold_path": fold_path, "threads": threads, "random_state": config.random_state,
+            } for candidate, (family, params) in enumerate(config.candidates)
+              for fold, fold_path in enumerate(fold_paths)]
+            logging.info(f"Cross-validation: {len(tasks)} fits on {n_workers} workers x {threads} threads.")
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(pool.map(run_fold, tasks))
+
+            candidates = []
+            for candidate, (family, params) in enumerate(config.candidates):
+                y_pred = np.empty_like(y)
+                folds = []
+                for result in (item for item in results if item["candidate"] == candidate):
+                    val_index = val_indices[result["fold"]]
+                    y_pred[val_index] = result["y_pred"]
+                    folds.append({
+                        "fold": result["fold"],
+                        "accuracy": round(float(np.mean(result["y_pred"] == y[val_index])), 4),
+                        "fit_seconds": result["fit_seconds"],
+                        "predict_seconds": result["predict_seconds"],
+                    })
+                fold_accuracies = [fold["accuracy"] for fold in folds]
+                correct = int(np.sum(y_pred == y))
+                candidates.append({
+                    "family": family,
+                    "params": params,
+                    "accuracy": round(correct / len(y), 4),
+                    "accuracy_ci": wilson_interval(correct, len(y), config.confidence),
+                    "fold_accuracy_mean": round(float(np.mean(fold_accuracies)), 4),
+                    "fold_accuracy_std": round(float(np.std(fold_accuracies, ddof=1)), 4) if len(folds) > 1 else 0.0,
+                    "per_class": self.summarize(y, y_pred, le),
+                    "folds": folds,
+                })
+                logging.info(f"{family}: accuracy {correct / len(y):.2%} "
+                             f"(fold std {candidates[-1]['fold_accuracy_std']:.4f}).")
+
+            report = {
+                "config": asdict(config),
+                "rows": int(len(y)),
+                "fold_transforms": transforms,
+                "candidates": candidates,
+            }
+            os.makedirs(os.path.dirname(config.report_file_path), exist_ok=True)
+            with open(config.report_file_path, "w") as file_obj:
+                json.dump(report, file_obj, indent=2, default=str)
+            logging.info(f"Cross-validation report saved to {config.report_file_path}")
+            return report
+
+        except Exception as e:
+            logging.error(f"An error occurred during cross-validation: {e}")
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    from src.components.data_ingestion import DataIngestion
+    logging.info("Running Cross-Validation as a standalone script...")
+    report = CrossValidator().evaluate(DataIngestion()._handoff_paths())
+    for candidate in report["candidates"]:
+        print(f"{candidate['family']:<22} accuracy {candidate['accuracy']:.4f} {candidate['accuracy_ci']}")
@@ -3,18 +3,34 @@
 import os
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from dataclasses import dataclass
+from typing import Optional
 
 # --- THIS IS THE FIX ---
-current_dir = Path(__file__).resolve().parent
-root_dir = current_dir.parent.parent
-sys.path.append(str(root_dir))
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
 # --- END OF FIX ---
 
 from src.logger import logging # <-- Import the logger
 from src.exception import CustomException # <-- Import the custom exception
+from src.utils import ColumnarWriter, save_columnar
+
+# Narrow dtypes for the raw Spotify columns we actually use.
+# Everything else (track_id, artists, ...) is read with pandas defaults.
+RAW_DATA_DTYPES = {
+    'danceability': 'float32', 'energy': 'float32', 'loudness': 'float32',
+    'speechiness': 'float32', 'acousticness': 'float32', 'instrumentalness': 'float32',
+    'liveness': 'float32', 'valence': 'float32', 'tempo': 'float32',
+    'key': 'int8', 'mode': 'int8', 'time_signature': 'int8',
+    'track_genre': 'category',
+}
 
 @dataclass
 class DataIngestionConfig:
@@ -22,12 +38,44 @@ class DataIngestionConfig:
     test_data_path: str = os.path.join('artifacts', 'test.csv')
     raw_data_path: str = os.path.join('data', 'dataset.csv')
 
+    # --- Handoff to DataTransformation ---
+    # "columnar" = typed .npy folders with only the RAW_DATA_DTYPES columns,
+    # "csv" = the full train.csv / test.csv files
+    handoff_format: str = "columnar"
+    train_columnar_path: str = os.path.join('artifacts', 'train_columns')
+    test_columnar_path: str = os.path.join('artifacts', 'test_columns')
+    # Also write train.csv / test.csv when the handoff is columnar
+    export_csv: bool = True
+
+    # --- Streaming mode (reads the raw file in chunks) ---
+    streaming: bool = False
+    chunk_size: int = 100000
+    # Rows to keep in total. None = keep the full dataset.
+    sample_size: Optional[int] = 20000
+    # "reservoir" = uniform sample of sample_size rows,
+    # "stratified" = up to sample_size_per_genre rows of every track_genre
+    sampling: str = "reservoir"
+    sample_size_per_genre: int = 200
+    test_size: float = 0.2
+    random_state: int = 42
+
+def hash_split_is_test(track_ids, test_size):
+    """
+    Deterministic train/test assignment: the same track_id always lands in
+    the same split, whatever the chunking or the order of the file.
+    """
+    hashes = pd.util.hash_pandas_object(track_ids.astype(str), index=False).to_numpy()
+    return (hashes % np.uint64(10000)) < np.uint64(int(test_size * 10000))
+
 class DataIngestion:
-    def __init__(self):
-        self.ingestion_config = DataIngestionConfig()
+    def __init__(self, ingestion_config: Optional[DataIngestionConfig] = None):
+        self.ingestion_config = ingestion_config or DataIngestionConfig()
         logging.info("DataIngestion component initialized.") # <-- Use logger
 
     def initiate_data_ingestion(self):
+        if self.ingestion_config.streaming:
+            return self.initiate_streaming_data_ingestion()
+
         logging.info("--- Starting Data Ingestion ---") # <-- Use logger
         try:
             df = pd.read_csv(self.ingestion_config.raw_data_path)
@@ -40,20 +88,132 @@ class DataIngestion:
             logging.info("Splitting data into train and test sets...")
             train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
 
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
+            self._save_splits(train_set, test_set)
+            logging.info(f"Data ingestion completed. Train and Test sets saved.")
 
-            logging.info(f"Data ingestion completed. Train and Test CSVs saved.")
-
-            return (
-                self.ingestion_config.train_data_path,
-                self.ingestion_config.test_data_path
-            )
+            return self._handoff_paths()
 
         except Exception as e:
             logging.error(f"An error occurred during data ingestion: {e}")
             raise CustomException(e, sys) # <-- Use custom exception
 
+    def _handoff_paths(self):
+        config = self.ingestion_config
+        if config.handoff_format == "columnar":
+            return config.train_columnar_path, config.test_columnar_path
+        return config.train_data_path, config.test_data_path
+
+    def output_paths(self):
+        """
+        {name: path} of every file/folder this stage writes, for the stage cache.
+        """
+        config = self.ingestion_config
+        outputs = {}
+        if config.handoff_format == "csv" or config.export_csv:
+            outputs["train.csv"] = config.train_data_path
+            outputs["test.csv"] = config.test_data_path
+        if config.handoff_format == "columnar":
+            outputs["train_columns"] = config.train_columnar_path
+            outputs["test_columns"] = config.test_columnar_path
+        return outputs
+
+    def _save_splits(self, train_set, test_set):
+        config = self.ingestion_config
+        if config.handoff_format == "csv" or config.export_csv:
+            train_set.to_csv(config.train_data_path, index=False, header=True)
+            test_set.to_csv(config.test_data_path, index=False, header=True)
+        if config.handoff_format == "columnar":
+            save_columnar(config.train_columnar_path, train_set, RAW_DATA_DTYPES)
+            save_columnar(config.test_columnar_path, test_set, RAW_DATA_DTYPES)
+
+    def _read_raw_chunks(self):
+        return pd.read_csv(
+            self.ingestion_config.raw_data_path,
+            dtype=RAW_DATA_DTYPES,
+            chunksize=self.ingestion_config.chunk_size,
+        )
+
+    def _keep_smallest_keys(self, kept, chunk, keys, limit, group_column=None):
+        # Bottom-k sampling: every row gets a random key and we keep the rows
+        # with the smallest keys. That is a uniform sample (like a reservoir)
+        # and only ever holds limit + chunk_size rows in memory.
+        chunk = chunk.assign(_sample_key=keys)
+        combined = chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+        if group_column is None:
+            return combined.nsmallest(limit, '_sample_key')
+        combined = combined.sort_values('_sample_key', kind='stable')
+        return combined.groupby(group_column, observed=True, sort=False).head(limit)
+
+    def initiate_streaming_data_ingestion(self):
+        """
+        Reads the raw CSV chunk by chunk with narrow dtypes, so peak memory
+        depends on chunk_size (and sample_size), not on the file size.
+        Rows are split into train/test by hashing track_id.
+        """
+        logging.info("--- Starting Streaming Data Ingestion ---")
+        try:
+            config = self.ingestion_config
+            os.makedirs(os.path.dirname(config.train_data_path), exist_ok=True)
+            rng = np.random.default_rng(config.random_state)
+            rows_read = 0
+
+            if config.sample_size is None:
+                # Full dataset: write each chunk straight to train/test as we go
+                write_csv = config.handoff_format == "csv" or config.export_csv
+                writers = None
+                if config.handoff_format == "columnar":
+                    writers = (
+                        ColumnarWriter(config.train_columnar_path, RAW_DATA_DTYPES),
+                        ColumnarWriter(config.test_columnar_path, RAW_DATA_DTYPES),
+                    )
+                wrote_header = False
+                for chunk in self._read_raw_chunks():
+                    rows_read += len(chunk)
+                    is_test = hash_split_is_test(chunk['track_id'], config.test_size)
+                    if write_csv:
+                        mode = 'a' if wrote_header else 'w'
+                        chunk[~is_test].to_csv(config.train_data_path, mode=mode, index=False, header=not wrote_header)
+                        chunk[is_test].to_csv(config.test_data_path, mode=mode, index=False, header=not wrote_header)
+                        wrote_header = True
+                    if writers is not None:
+                        writers[0].append(chunk[~is_test])
+                        writers[1].append(chunk[is_test])
+                    logging.info(f"Streamed {rows_read} rows so far.")
+                if writers is not None:
+                    for writer in writers:
+                        writer.close()
+            else:
+                kept = None
+                for chunk in self._read_raw_chunks():
+                    rows_read += len(chunk)
+                    keys = rng.random(len(chunk))
+                    if config.sampling == "stratified":
+                        kept = self._keep_smallest_keys(kept, chunk, keys, config.sample_size_per_genre, 'track_genre')
+                    elif config.sampling == "reservoir":
+                        kept = self._keep_smallest_keys(kept, chunk, keys, config.sample_size)
+                    else:
+                        raise ValueError(f"Unknown sampling mode: {config.sampling}")
+                    logging.info(f"Read {rows_read} rows, {len(kept)} kept in the sample.")
+
+                if config.sampling == "stratified" and len(kept) > config.sample_size:
+                    # Equal rows per genre can overshoot the total. Trim it round-robin:
+                    # every genre's n-th row (by sample key) is kept before any genre's
+                    # (n+1)-th, so genres stay balanced and the remainder falls on
+                    # random genres. Genres with fewer rows simply run out first.
+                    rank_in_genre = kept.groupby('track_genre')['_sample_key'].rank(method='first')
+                    order = np.lexsort((kept['_sample_key'].to_numpy(), rank_in_genre.to_numpy()))
+                    kept = kept.iloc[np.sort(order[:config.sample_size])]
+                sample = kept.drop(columns=['_sample_key'])
+                is_test = hash_split_is_test(sample['track_id'], config.test_size)
+                self._save_splits(sample[~is_test], sample[is_test])
+
+            logging.info(f"Streaming ingestion completed after reading {rows_read} rows. Train and Test sets saved.")
+            return self._handoff_paths()
+
+        except Exception as e:
+            logging.error(f"An error occurred during streaming data ingestion: {e}")
+            raise CustomException(e, sys)
+
 if __name__ == "__main__":
     logging.info("Running Data Ingestion component as a script...")
     ingestor = DataIngestion()
@@ -5,11 +5,15 @@ import sys
 from pathlib import Path
 
 # --- THIS IS THE FIX ---
-current_dir = Path(__file__).resolve().parent
-root_dir = current_dir.parent.parent
-sys.path.append(str(root_dir))
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
 # --- END OF FIX ---
 
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 from sklearn.preprocessing import StandardScaler, OneHotEncoder, LabelEncoder
@@ -20,7 +24,7 @@ from sklearn.pipeline import Pipeline
 # --- Import our new tools ---
 from src.logger import logging
 from src.exception import CustomException
-from src.utils import save_object
+from src.utils import save_object, is_columnar, load_columnar
 from src.components.data_ingestion import DataIngestionConfig, DataIngestion
 # --- End of new imports ---
 
@@ -46,6 +50,16 @@ def consolidate_genre_improved(genre):
        'j-pop' in genre or 'k-pop' in genre or 'turkish' in genre: return 'World Music'
     return 'Other'
 
+def consolidate_genre_series(genres):
+    """
+    Vectorized version of consolidate_genre_improved for a whole column.
+    The substring rules run ONCE per distinct track_genre (~114 values)
+    and the result is spread back to every row through the factorize codes.
+    """
+    codes, unique_genres = pd.factorize(genres, use_na_sentinel=False)
+    lookup = np.array([consolidate_genre_improved(genre) for genre in unique_genres], dtype=object)
+    return pd.Series(lookup[codes], index=genres.index, name=genres.name)
+
 # (The DataTransformationConfig class is unchanged)
 @dataclass
 class DataTransformationConfig:
@@ -82,24 +96,34 @@ class DataTransformation:
         except Exception as e:
             raise CustomException(e, sys)
 
+    @staticmethod
+    def read_split(path):
+        """
+        Reads a train/test split written by DataIngestion: a columnar
+        folder (fast, memory-mapped) or a CSV file.
+        """
+        if is_columnar(path):
+            return load_columnar(path)
+        return pd.read_csv(path)
+
     # --- THIS FUNCTION IS NOW MODIFIED ---
     def initiate_data_transformation(self, train_path, test_path):
         logging.info("--- Starting Data Transformation ---")
         try:
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
-            logging.info("train.csv and test.csv read successfully.")
+            train_df = self.read_split(train_path)
+            test_df = self.read_split(test_path)
+            logging.info(f"Train and test data read from {train_path} and {test_path}.")
 
-            train_df['consolidated_genre'] = train_df['track_genre'].apply(consolidate_genre_improved)
-            test_df['consolidated_genre'] = test_df['track_genre'].apply(consolidate_genre_improved)
+            train_df['consolidated_genre'] = consolidate_genre_series(train_df['track_genre'])
+            test_df['consolidated_genre'] = consolidate_genre_series(test_df['track_genre'])
             train_df = train_df[train_df['consolidated_genre'] != 'Other']
             test_df = test_df[test_df['consolidated_genre'] != 'Other']
             logging.info("Genre consolidated and 'Other' category removed.")
 
             target_column_name = 'consolidated_genre'
-            X_train = train_df.drop(columns=[target_column_name, 'track_genre'], axis=1)
+            X_train = train_df.drop(columns=[target_column_name, 'track_genre'])
             y_train = train_df[target_column_name]
-            X_test = test_df.drop(columns=[target_column_name, 'track_genre'], axis=1)
+            X_test = test_df.drop(columns=[target_column_name, 'track_genre'])
             y_test = test_df[target_column_name]
             logging.info("X and y separated for train and test sets.")
 
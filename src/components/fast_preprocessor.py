@@ -0,0 +1,164 @@
+# src/components/fast_preprocessor.py
+
+import sys
+import threading
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+
+from src.logger import logging
+from src.exception import CustomException
+
+
+class FastPreprocessor:
+    """
+    The fitted ColumnTransformer from DataTransformation, reduced to plain
+    NumPy arrays: scaler means/scales for the numeric columns and the list
+    of known categories for each one-hot column.
+
+    It maps raw values (a dict, a 2D float array in input_columns order, or
+    a DataFrame) straight to the model's feature vector, without pandas
+    column lookups or sklearn dispatch. Output matches preprocessor.transform.
+    """
+    def __init__(self, numeric_columns, means, scales, categorical_columns, categories):
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.input_columns = self.numeric_columns + self.categorical_columns
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.categories = [np.asarray(values) for values in categories]
+
+        # Where each categorical column's one-hot block starts in the output
+        self.category_offsets = []
+        offset = len(self.numeric_columns)
+        for values in self.categories:
+            self.category_offsets.append(offset)
+            offset += len(values)
+        self.n_output_features = offset
+
+        # value -> output column, for the single-record path
+        self.category_lookup = [
+            {value.item(): start + position for position, value in enumerate(values)}
+            for start, values in zip(self.category_offsets, self.categories)
+        ]
+        self._buffers = threading.local()
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor):
+        """
+        Builds a FastPreprocessor from the fitted ColumnTransformer
+        (num_pipeline -> StandardScaler, cat_pipeline -> OneHotEncoder).
+        """
+        try:
+            transformers = {name: (step, columns) for name, step, columns in preprocessor.transformers_}
+            num_pipeline, numeric_columns = transformers["num_pipeline"]
+            cat_pipeline, categorical_columns = transformers["cat_pipeline"]
+            scaler = num_pipeline.named_steps["scaler"]
+            one_hot_encoder = cat_pipeline.named_steps["one_hot_encoder"]
+
+            if one_hot_encoder.drop is not None or one_hot_encoder.handle_unknown != "ignore":
+                raise ValueError("FastPreprocessor only supports OneHotEncoder(handle_unknown='ignore') without drop.")
+
+            n_numeric = len(numeric_columns)
+            means = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_numeric)
+            scales = scaler.scale_ if scaler.scale_ is not None else np.ones(n_numeric)
+
+            fast_preprocessor = cls(numeric_columns, means, scales, categorical_columns, one_hot_encoder.categories_)
+            logging.info(f"FastPreprocessor built with {fast_preprocessor.n_output_features} output features.")
+            return fast_preprocessor
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def transform_array(self, raw):
+        """
+        raw: 2D array, one row per song, columns in input_columns order.
+        Returns a new (n_rows, n_output_features) float64 array.
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+        n_numeric = len(self.numeric_columns)
+        output = np.zeros((raw.shape[0], self.n_output_features), dtype=np.float64)
+        np.subtract(raw[:, :n_numeric], self.means, out=output[:, :n_numeric])
+        output[:, :n_numeric] /= self.scales
+
+        rows = np.arange(raw.shape[0])
+        for position, (values, start) in enumerate(zip(self.categories, self.category_offsets)):
+            column = raw[:, n_numeric + position]
+            index = np.searchsorted(values, column).clip(0, len(values) - 1)
+            known = values[index] == column  # unknown categories stay all-zero
+            output[rows[known], start + index[known]] = 1.0
+        return output
+
+    def transform_frame(self, features_df):
+        return self.transform_array(features_df[self.input_columns].to_numpy(dtype=np.float64))
+
+    def transform_record(self, record):
+        """
+        One song as a dict -> a (1, n_output_features) row. The row is a
+        per-thread buffer that is reused on the next call, so copy it if
+        you need to keep it.
+        """
+        buffer = getattr(self._buffers, "row", None)
+        if buffer is None:
+            buffer = np.zeros((1, self.n_output_features), dtype=np.float64)
+            self._buffers.row = buffer
+        else:
+            buffer.fill(0.0)
+
+        row = buffer[0]
+        for position, column in enumerate(self.numeric_columns):
+            row[position] = (float(record[column]) - self.means[position]) / self.scales[position]
+        for column, lookup in zip(self.categorical_columns, self.category_lookup):
+            output_column = lookup.get(record[column])
+            if output_column is not None:
+                row[output_column] = 1.0
+        return buffer
+
+    def transform(self, X):
+        """
+        Same call style as preprocessor.transform: accepts a DataFrame or a 2D array.
+        """
+        if hasattr(X, "columns"):
+            return self.transform_frame(X)
+        return self.transform_array(X)
+
+
+def check_parity(preprocessor, features_df, tolerance=1e-9):
+    """
+    Compares FastPreprocessor with preprocessor.transform on features_df,
+    both the array path and the per-record path. Returns the max difference.
+    """
+    expected = preprocessor.transform(features_df)
+    if hasattr(expected, "toarray"):
+        expected = expected.toarray()
+
+    fast_preprocessor = FastPreprocessor.from_column_transformer(preprocessor)
+    max_difference = np.abs(fast_preprocessor.transform_frame(features_df) - expected).max()
+
+    for position, record in enumerate(features_df[fast_preprocessor.input_columns].to_dict("records")):
+        row_difference = np.abs(fast_preprocessor.transform_record(record)[0] - expected[position]).max()
+        max_difference = max(max_difference, row_difference)
+
+    if max_difference > tolerance:
+        raise AssertionError(f"FastPreprocessor differs from preprocessor.transform by {max_difference:.2e}")
+    return max_difference
+
+
+if __name__ == "__main__":
+    # Parity check against the saved preprocessor on artifacts/test.csv
+    import pandas as pd
+    from src.utils import load_object
+
+    saved_preprocessor = load_object("artifacts/preprocessor.pkl")
+    test_df = pd.read_csv("artifacts/test.csv")
+    difference = check_parity(saved_preprocessor, test_df)
+    print(f"FastPreprocessor matches preprocessor.transform on {len(test_df)} rows (max difference {difference:.2e}).")
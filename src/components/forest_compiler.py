@@ -0,0 +1,198 @@
+# src/components/forest_compiler.py
+
+import os
+import sys
+from pathlib import Path
+from dataclasses import dataclass
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+
+from src.logger import logging
+from src.exception import CustomException
+from src.utils import save_object, load_object
+
+
+@dataclass
+class ForestCompilerConfig:
+    trained_model_file_path: str = os.path.join("artifacts", "spotify_genre_model.pkl")
+    compiled_model_file_path: str = os.path.join("artifacts", "compiled_model.pkl")
+
+
+class CompiledForest:
+    """
+    A trained RandomForestClassifier flattened into a few contiguous NumPy
+    arrays, so predict_proba needs no sklearn estimator objects or joblib.
+
+    All trees share one node table:
+    - feature[i], threshold[i]: the split of node i
+    - left[i], right[i]: GLOBAL child indices (leaves point to themselves)
+    - is_leaf[i]: derived from left, not stored separately
+    - value[i]: class probabilities of node i (only used at leaves)
+    - roots[t]: index of the root node of tree t
+
+    Compact forests keep value rows for leaves only; leaf_index[i] then
+    gives the row of value that belongs to leaf node i.
+    """
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth, leaf_index=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.leaf_index = leaf_index
+        self.is_leaf = left == np.arange(len(left))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def compact(self):
+        """
+        Whether this forest was compiled with compact=True (see compile_forest),
+        e.g. because ModelBudget needed the smaller artifact.
+        """
+        return self.leaf_index is not None
+
+    def _predict_block(self, X):
+        # One entry per (sample, tree) pair. Every step moves all pairs that
+        # have not reached a leaf yet one level down, then drops the ones
+        # that just landed on a leaf, so short paths stop costing work early.
+        n_samples, n_features = X.shape
+        X_flat = X.ravel()
+        node = np.tile(self.roots, n_samples)
+        row_offset = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, self.n_trees)
+        active = np.flatnonzero(~self.is_leaf[node])
+        while active.size:
+            current = node[active]
+            go_left = X_flat[row_offset[active] + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[~self.is_leaf[current]]
+        if self.leaf_index is not None:
+            node = self.leaf_index[node]
+        leaf_values = self.value[node].reshape(n_samples, self.n_trees, -1)
+        return leaf_values.mean(axis=1, dtype=np.float64)
+
+    def predict_proba(self, X, block_size: int = 2048):
+        """
+        Same output as RandomForestClassifier.predict_proba (mean of the
+        per-tree leaf distributions), evaluated with NumPy only.
+        """
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.shape[0] <= block_size:
+            return self._predict_block(X)
+        return np.vstack([
+            self._predict_block(X[start:start + block_size])
+            for start in range(0, X.shape[0], block_size)
+        ])
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def compile_forest(model, compact=False):
+    """
+    Packs the trees of a fitted RandomForestClassifier into a CompiledForest.
+
+    compact=True stores thresholds as float32, feature ids as int16 and
+    class probabilities for leaves only, which shrinks the artifact. Thresholds are rounded DOWN to the
+    nearest float32, so for float32 inputs "x <= threshold" gives exactly
+    the same answer as the float64 original.
+    """
+    try:
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n_nodes)
+
+            # Leaves point back to themselves, which is how is_leaf is derived
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            feature = np.where(is_leaf, 0, tree.feature)
+            threshold = np.where(is_leaf, np.inf, tree.threshold)
+
+            # Normalise per node, exactly like DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        index_dtype = np.int32 if offset < np.iinfo(np.int32).max else np.int64
+        threshold = np.concatenate(thresholds).astype(np.float64)
+        feature = np.concatenate(features)
+        if compact:
+            threshold32 = threshold.astype(np.float32)
+            rounded_up = threshold32.astype(np.float64) > threshold
+            threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+            threshold = threshold32
+        feature_dtype = np.int16 if compact and model.n_features_in_ < np.iinfo(np.int16).max else np.int32
+        left = np.concatenate(lefts).astype(index_dtype)
+        value = np.concatenate(values).astype(np.float32)
+        leaf_index = None
+        if compact:
+            is_leaf = left == np.arange(len(left))
+            leaf_index = np.cumsum(is_leaf, dtype=index_dtype) - 1
+            value = value[is_leaf]
+        compiled = CompiledForest(
+            feature=feature.astype(feature_dtype),
+            threshold=threshold,
+            left=left,
+            right=np.concatenate(rights).astype(index_dtype),
+            value=value,
+            roots=np.asarray(roots, dtype=index_dtype),
+            classes=np.asarray(model.classes_),
+            max_depth=int(max_depth),
+            leaf_index=leaf_index,
+        )
+        logging.info(f"Compiled forest: {compiled.n_trees} trees, {compiled.n_nodes} nodes, max depth {compiled.max_depth}.")
+        return compiled
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    # Compile an already-trained model without retraining it.
+    # Import through the package so the pickle refers to
+    # src.components.forest_compiler.CompiledForest, not __main__.
+    from src.components.forest_compiler import ForestCompilerConfig, compile_forest
+
+    config = ForestCompilerConfig()
+    logging.info(f"Compiling {config.trained_model_file_path}...")
+    trained_model = load_object(config.trained_model_file_path)
+    save_object(config.compiled_model_file_path, compile_forest(trained_model), file_format="mmap")
+    print(f"Compiled model saved to {config.compiled_model_file_path}")
@@ -0,0 +1,312 @@
+# src/components/incremental_trainer.py
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import warnings
+from pathlib import Path
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.metrics import accuracy_score
+
+from src.logger import logging
+from src.exception import CustomException
+from src.utils import save_objects, load_object, read_artifact_manifest
+from src.components.data_ingestion import RAW_DATA_DTYPES, hash_split_is_test
+from src.components.data_transformation import consolidate_genre_series
+from src.components.forest_compiler import compile_forest
+
+@dataclass
+class IncrementalTrainerConfig:
+    # The raw CSV that new tracks are appended to
+    raw_data_path: str = os.path.join('data', 'dataset.csv')
+    # How far into raw_data_path the current model has already seen
+    watermark_file_path: str = os.path.join('artifacts', 'training_watermark.json')
+    trained_model_file_path: str = os.path.join('artifacts', 'spotify_genre_model.pkl')
+    compiled_model_file_path: str = os.path.join('artifacts', 'compiled_model.pkl')
+    compiled_model_file_format: str = "mmap"
+    preprocessor_obj_file_path: str = os.path.join('artifacts', 'preprocessor.pkl')
+    label_encoder_obj_file_path: str = os.path.join('artifacts', 'label_encoder.pkl')
+    # Trees added per run, trained on the new rows only
+    n_new_trees: int = 20
+    # Drop the oldest trees once the forest is bigger than this. None = keep all.
+    max_estimators: Optional[int] = None
+    # Wait (do nothing) until at least this many new rows have arrived
+    min_new_rows: int = 500
+    # Share of the new rows held out (by track_id hash) to score the update
+    test_size: float = 0.2
+
+
+def complete_lines_end(file_path):
+    """
+    Byte offset just after the last full line of file_path. A row that is
+    still being appended (no trailing newline yet) is left for the next run.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as file_obj:
+        position = size
+        while position > 0:
+            block_start = max(0, position - 64 * 1024)
+            file_obj.seek(block_start)
+            block = file_obj.read(position - block_start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                return block_start + newline + 1
+            position = block_start
+    return 0
+
+
+def _header_of(file_path):
+    with open(file_path, "rb") as file_obj:
+        return file_obj.readline()
+
+
+def write_watermark(watermark_file_path, raw_data_path, byte_offset, extra=None):
+    """
+    Records that everything in raw_data_path before byte_offset is already
+    in the model. Written through a temp file, like every other artifact.
+    """
+    watermark = {
+        "raw_data_path": raw_data_path,
+        "byte_offset": int(byte_offset),
+        "header_sha256": hashlib.sha256(_header_of(raw_data_path)).hexdigest(),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        **(extra or {}),
+    }
+    os.makedirs(os.path.dirname(watermark_file_path) or ".", exist_ok=True)
+    with open(f"{watermark_file_path}.tmp", "w") as file_obj:
+        json.dump(watermark, file_obj, indent=2)
+    os.replace(f"{watermark_file_path}.tmp", watermark_file_path)
+    logging.info(f"Training watermark set to byte {byte_offset} of {raw_data_path}")
+    return watermark
+
+
+def read_rows_between(raw_data_path, start_offset, end_offset):
+    """
+    Parses only the rows stored between two byte offsets of the raw CSV,
+    using the column names from its header line.
+    """
+    columns = pd.read_csv(io.BytesIO(_header_of(raw_data_path))).columns
+    with open(raw_data_path, "rb") as file_obj:
+        file_obj.seek(start_offset)
+        data = file_obj.read(end_offset - start_offset)
+    if not data.strip():
+        return pd.DataFrame(columns=columns)
+    return pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=RAW_DATA_DTYPES)
+
+
+def remap_forest_thresholds(model, feature_indices, old_means, old_scales, new_means, new_scales):
+    """
+    The existing trees split on standardized values (x - old_mean) / old_scale.
+    After the scaler moves, the same split on the raw value x is
+    (old_mean + old_scale * t - new_mean) / new_scale in the new scale,
+    so the old trees keep making the same decisions (up to float32 rounding
+    of values that sit right on a threshold).
+    """
+    # Per-feature lookup tables, so each tree is remapped in one NumPy step.
+    # Features that are not remapped keep mean 0 / scale 1 (unchanged).
+    n_features = model.n_features_in_
+    old_mean_of, old_scale_of = np.zeros(n_features), np.ones(n_features)
+    new_mean_of, new_scale_of = np.zeros(n_features), np.ones(n_features)
+    old_mean_of[feature_indices], old_scale_of[feature_indices] = old_means, old_scales
+    new_mean_of[feature_indices], new_scale_of[feature_indices] = new_means, new_scales
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        thresholds = tree.threshold  # a writable view into the tree's nodes
+        splits = np.isin(tree.feature, feature_indices)  # leaves have feature -2
+        features = tree.feature[splits]
+        raw_values = old_mean_of[features] + old_scale_of[features] * thresholds[splits]
+        thresholds[splits] = (raw_values - new_mean_of[features]) / new_scale_of[features]
+
+
+def pad_missing_classes(X, y, classes):
+    """
+    A forest fitted on part of the data only knows the classes it saw.
+    Every class of classes missing from y gets one zero-weight copy of the
+    first row, so classes_ (and predict_proba's columns) stay complete.
+    Returns X, y and the matching sample_weight.
+    """
+    sample_weight = np.ones(len(y))
+    missing_classes = np.setdiff1d(classes, y)
+    if len(missing_classes):
+        X = np.vstack([X, np.repeat(X[:1], len(missing_classes), axis=0)])
+        y = np.concatenate([y, missing_classes])
+        sample_weight = np.concatenate([sample_weight, np.zeros(len(missing_classes))])
+    return X, y, sample_weight
+
+
+class IncrementalTrainer:
+    """
+    Updates the trained forest with only the rows appended to the raw CSV
+    since the last run, instead of retraining on the whole corpus:
+
+    1. Read the rows after the watermark.
+    2. Update the StandardScaler with running moments (partial_fit), and
+       re-express the existing trees' thresholds in the new scale.
+    3. Grow the forest with warm_start: n_new_trees trees fitted on the new
+       rows, optionally dropping the oldest trees.
+    4. Publish the model, compiled model, preprocessor and label encoder as
+       one new artifact version (utils.save_objects), then move the watermark.
+
+    The one-hot categories and the label encoder are kept as they are:
+    unseen key/mode/time_signature values encode as all-zero (as in
+    serving), and rows of genres the label encoder does not know are skipped.
+    """
+    def __init__(self, incremental_config: Optional[IncrementalTrainerConfig] = None):
+        self.incremental_config = incremental_config or IncrementalTrainerConfig()
+        logging.info("IncrementalTrainer component initialized.")
+
+    def read_watermark(self):
+        path = self.incremental_config.watermark_file_path
+        if not os.path.exists(path):
+            return None
+        with open(path) as file_obj:
+            return json.load(file_obj)
+
+    def initiate_incremental_training(self):
+        """
+        Returns a report dict. "status" is one of: initialized (no watermark
+        yet, so the current end of the file becomes the starting point),
+        waiting (fewer than min_new_rows new rows) or updated.
+        """
+        logging.info("--- Starting Incremental Training ---")
+        try:
+            config = self.incremental_config
+            start = time.perf_counter()
+            end_offset = complete_lines_end(config.raw_data_path)
+
+            # --- 1. Find the new rows ---
+            watermark = self.read_watermark()
+            if watermark is None:
+                write_watermark(config.watermark_file_path, config.raw_data_path, end_offset)
+                logging.info("No watermark yet: the current model is taken as trained up to the end of the file.")
+                return {"status": "initialized", "byte_offset": end_offset}
+
+            start_offset = watermark["byte_offset"]
+            if end_offset < start_offset or \
+                    watermark["header_sha256"] != hashlib.sha256(_header_of(config.raw_data_path)).hexdigest():
+                raise ValueError(f"{config.raw_data_path} was rewritten, not appended to. Run the full TrainPipeline.")
+
+            new_df = read_rows_between(config.raw_data_path, start_offset, end_offset)
+            logging.info(f"{len(new_df)} new rows after byte {start_offset}.")
+            if len(new_df) < config.min_new_rows:
+                return {"status": "waiting", "new_rows": len(new_df), "min_new_rows": config.min_new_rows}
+
+            # --- 2. Load the current artifacts ---
+            model = load_object(config.trained_model_file_path)
+            preprocessor = load_object(config.preprocessor_obj_file_path)
+            label_encoder = load_object(config.label_encoder_obj_file_path)
+            if not isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+                raise ValueError(f"Incremental training needs a forest, not {type(model).__name__}. "
+                                 "Run the full TrainPipeline.")
+
+            # --- 3. Labels: same consolidation as DataTransformation ---
+            new_df['consolidated_genre'] = consolidate_genre_series(new_df['track_genre'])
+            known = new_df['consolidated_genre'].isin(label_encoder.classes_)
+            skipped_rows = int((~known & (new_df['consolidated_genre'] != 'Other')).sum())
+            new_rows = len(new_df)
+            new_df = new_df[known]
+            is_test = hash_split_is_test(new_df['track_id'], config.test_size)
+            train_df, holdout_df = new_df[~is_test], new_df[is_test]
+
+            # --- 4. Running-moment scaler update + threshold remap ---
+            transformers = {name: (step, columns) for name, step, columns in preprocessor.transformers_}
+            num_pipeline, numeric_columns = transformers["num_pipeline"]
+            scaler = num_pipeline.named_steps["scaler"]
+            old_means, old_scales = scaler.mean_.copy(), scaler.scale_.copy()
+            scaler.partial_fit(train_df[numeric_columns])
+            # The numeric block comes first in the preprocessor output
+            remap_forest_thresholds(model, np.arange(len(numeric_columns)),
+                                    old_means, old_scales, scaler.mean_, scaler.scale_)
+
+            X_train = preprocessor.transform(train_df)
+            X_train = X_train.toarray() if hasattr(X_train, "toarray") else X_train
+            y_train = label_encoder.transform(train_df['consolidated_genre'])
+            # warm_start refits classes_ from y, so every known class must appear
+            X_train, y_train, sample_weight = pad_missing_classes(X_train, y_train, model.classes_)
+
+            # --- 5. Grow the forest ---
+            old_tree_count = len(model.estimators_)
+            model.set_params(warm_start=True, n_estimators=old_tree_count + config.n_new_trees)
+            with warnings.catch_warnings():
+                # 'balanced' class weights computed on the new rows only is what we want here
+                warnings.filterwarnings("ignore", message=".*class_weight presets.*")
+                model.fit(X_train, y_train, sample_weight=sample_weight)
+            model.set_params(warm_start=False)
+
+            dropped_trees = 0
+            if config.max_estimators is not None and len(model.estimators_) > config.max_estimators:
+                dropped_trees = len(model.estimators_) - config.max_estimators
+                model.estimators_ = model.estimators_[dropped_trees:]
+                model.set_params(n_estimators=len(model.estimators_))
+                logging.info(f"Dropped the {dropped_trees} oldest trees.")
+
+            holdout_accuracy = None
+            if len(holdout_df):
+                y_holdout = label_encoder.transform(holdout_df['consolidated_genre'])
+                holdout_accuracy = float(accuracy_score(y_holdout, model.predict(preprocessor.transform(holdout_df))))
+                logging.info(f"Accuracy on {len(holdout_df)} held-out new rows: {holdout_accuracy:.2%}")
+
+            # Compile the way the current compiled model was compiled: a
+            # ModelBudget may have picked compact (float32) to meet its limits.
+            # The manifest records it, so the compiled forest is not loaded here.
+            manifest = read_artifact_manifest(os.path.dirname(config.compiled_model_file_path)) or {}
+            compact = bool(manifest.get("metadata", {}).get("compact_compiled_model", False))
+
+            # --- 6. Publish the artifacts as one version, then move the watermark ---
+            # The thresholds now only fit the updated scaler, so the four
+            # files must reach serving together (the label encoder is unchanged,
+            # but belongs to the set)
+            artifact_version = save_objects([
+                (config.trained_model_file_path, model, "pickle"),
+                (config.compiled_model_file_path, compile_forest(model, compact=compact), config.compiled_model_file_format),
+                (config.preprocessor_obj_file_path, preprocessor, "pickle"),
+                (config.label_encoder_obj_file_path, label_encoder, "pickle"),
+            ], metadata={"compact_compiled_model": compact})
+            rows_total = watermark.get("incremental_rows", 0) + len(train_df)
+            write_watermark(config.watermark_file_path, config.raw_data_path, end_offset,
+                            extra={"incremental_rows": rows_total})
+
+            report = {
+                "status": "updated",
+                "new_rows": new_rows,
+                "trained_rows": int(len(train_df)),
+                "holdout_rows": int(len(holdout_df)),
+                "skipped_unknown_genre_rows": skipped_rows,
+                "trees_added": config.n_new_trees,
+                "trees_dropped": dropped_trees,
+                "n_estimators": len(model.estimators_),
+                "compact_compiled_model": compact,
+                "holdout_accuracy": holdout_accuracy,
+                "artifact_version": artifact_version,
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+            logging.info(f"--- Incremental Training Complete: {report} ---")
+            return report
+
+        except Exception as e:
+            logging.error(f"An error occurred during incremental training: {e}")
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    logging.info("Running Incremental Trainer as a standalone script...")
+    print(json.dumps(IncrementalTrainer().initiate_incremental_training(), indent=2))
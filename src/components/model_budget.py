@@ -0,0 +1,196 @@
+# src/components/model_budget.py
+
+import sys
+import time
+import pickle
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Optional
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from src.logger import logging
+from src.exception import CustomException
+from src.components.forest_compiler import compile_forest
+from src.components.model_selection import measure_serving_cost, FOREST_FAMILIES
+
+# How we shrink a forest, one step at a time. Each step keeps the changes
+# of the steps before it and is clamped against the model's own settings
+# (see tighten_params), so the model only ever gets smaller.
+SHRINK_STEPS = [
+    ("float32 thresholds", {}, True),
+    ("n_estimators=50", {"n_estimators": 50}, True),
+    ("max_depth=20", {"max_depth": 20}, True),
+    ("min_samples_leaf=2", {"min_samples_leaf": 2}, True),
+    ("n_estimators=25", {"n_estimators": 25}, True),
+    ("max_depth=15", {"max_depth": 15}, True),
+    ("min_samples_leaf=4", {"min_samples_leaf": 4}, True),
+    ("prune ccp_alpha=1e-4", {"ccp_alpha": 1e-4}, True),
+    ("max_depth=10", {"max_depth": 10}, True),
+]
+
+# Settings that make a forest smaller when lowered (None = unbounded) / raised
+SHRINK_BY_LOWERING = ("n_estimators", "max_depth")
+SHRINK_BY_RAISING = ("min_samples_leaf", "ccp_alpha")
+
+
+def tighten_params(current_params, step_params):
+    """
+    The part of step_params that actually shrinks a model with
+    current_params: n_estimators / max_depth can only go down and
+    min_samples_leaf / ccp_alpha only up. Settings the model already
+    meets are left out, so an empty dict means the step changes nothing.
+    """
+    changes = {}
+    for name, value in step_params.items():
+        current = current_params.get(name)
+        if current is None:
+            tightened = value
+        elif name in SHRINK_BY_LOWERING:
+            tightened = min(current, value)
+        else:
+            tightened = max(current, value)
+        if tightened != current:
+            changes[name] = tightened
+    return changes
+
+@dataclass
+class ModelBudget:
+    # Pickled bytes of everything PredictPipeline loads for the model
+    # (sklearn model + compiled forest). None = no limit.
+    max_artifact_bytes: Optional[int] = None
+    # p99 single-row predict_proba latency on the serving path, in ms
+    max_p99_latency_ms: Optional[float] = None
+    # Minimum rows/second when scoring a batch of batch_rows rows
+    min_batch_rows_per_second: Optional[float] = None
+    batch_rows: int = 1000
+    latency_repeats: int = 200
+    # Share of the training data held out to score the shrink steps, so the
+    # test set is only used for the final, reported accuracy
+    validation_size: float = 0.2
+    random_state: int = 42
+
+    def is_active(self):
+        return any(limit is not None for limit in (
+            self.max_artifact_bytes, self.max_p99_latency_ms, self.min_batch_rows_per_second
+        ))
+
+
+class BudgetEnforcer:
+    """
+    Measures a fitted model against a ModelBudget and, for forests, walks
+    down SHRINK_STEPS (refitting as needed) until the budget is met.
+    The accuracy cost of every step is measured on a validation slice of the
+    training data, logged and returned in the report.
+    """
+    def __init__(self, budget: ModelBudget):
+        self.budget = budget
+
+    def measure(self, family, model, X_sample, compact):
+        _, p99, model_bytes = measure_serving_cost(family, model, X_sample, self.budget.latency_repeats, compact=compact)
+        artifact_bytes = model_bytes
+        if family in FOREST_FAMILIES:
+            artifact_bytes += len(pickle.dumps(compile_forest(model, compact=compact), protocol=pickle.HIGHEST_PROTOCOL))
+
+        batch = X_sample[:self.budget.batch_rows]
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        rows_per_second = len(batch) / max(time.perf_counter() - start, 1e-9)
+        return {"artifact_bytes": artifact_bytes, "p99_latency_ms": round(p99, 4), "batch_rows_per_second": round(rows_per_second, 1)}
+
+    def violations(self, measurement):
+        budget = self.budget
+        problems = []
+        if budget.max_artifact_bytes is not None and measurement["artifact_bytes"] > budget.max_artifact_bytes:
+            problems.append(f"artifact {measurement['artifact_bytes']} bytes > {budget.max_artifact_bytes}")
+        if budget.max_p99_latency_ms is not None and measurement["p99_latency_ms"] > budget.max_p99_latency_ms:
+            problems.append(f"p99 {measurement['p99_latency_ms']}ms > {budget.max_p99_latency_ms}ms")
+        if budget.min_batch_rows_per_second is not None and \
+                measurement["batch_rows_per_second"] < budget.min_batch_rows_per_second:
+            problems.append(f"throughput {measurement['batch_rows_per_second']} rows/s < {budget.min_batch_rows_per_second}")
+        return problems
+
+    def enforce(self, family, model, X_train, y_train):
+        """
+        Returns (model, compact, report). compact tells the trainer to save
+        the compiled forest with float32 thresholds.
+        Every step is scored by a copy fitted on part of X_train and checked
+        on the held-out rest. Only when that copy meets the budget is the
+        step refitted on all of X_train (and measured again); the returned
+        model is always fitted on all of X_train.
+        Raises if no step of the ladder meets the budget.
+        """
+        try:
+            # --- 1. Hold out a validation slice of the training data ---
+            X_fit, X_val, y_fit, y_val = train_test_split(
+                X_train, y_train, test_size=self.budget.validation_size,
+                stratify=y_train, random_state=self.budget.random_state
+            )
+
+            steps = [("baseline", {}, False)]
+            if family in FOREST_FAMILIES:
+                steps += SHRINK_STEPS
+
+            # --- 2. Walk down the ladder until a step meets the budget ---
+            report = []
+            overrides = {}
+            baseline_accuracy = None
+            scorer = None
+            for step_name, step_params, compact in steps:
+                changes = tighten_params({**model.get_params(), **overrides}, step_params)
+                if step_params and not changes:
+                    logging.info(f"Budget step '{step_name}' skipped: the model is already that small.")
+                    continue
+                overrides.update(changes)
+
+                # Validation accuracy, from a copy fitted on X_fit only
+                if scorer is None or changes:
+                    scorer = clone(model).set_params(**overrides)
+                    scorer.fit(X_fit, y_fit)
+                    accuracy = accuracy_score(y_val, scorer.predict(X_val))
+                if baseline_accuracy is None:
+                    baseline_accuracy = accuracy
+
+                # The model passed in is already fitted on all of X_train.
+                # A shrunk one is only refitted there once its X_fit copy passes.
+                candidate = model if not overrides else None
+                if candidate is None:
+                    measurement = self.measure(family, scorer, X_val, compact)
+                    if not self.violations(measurement):
+                        candidate = clone(model).set_params(**overrides)
+                        candidate.fit(X_train, y_train)
+                if candidate is not None:
+                    measurement = self.measure(family, candidate, X_val, compact)
+                problems = self.violations(measurement)
+
+                report.append({
+                    "step": step_name,
+                    "params": dict(overrides),
+                    "validation_accuracy": round(float(accuracy), 5),
+                    "accuracy_cost": round(float(baseline_accuracy - accuracy), 5),
+                    "compact": compact,
+                    "measured_fit": "X_train" if candidate is not None else "X_fit",
+                    **measurement,
+                    "meets_budget": not problems,
+                })
+                logging.info(f"Budget step '{step_name}': validation accuracy {accuracy:.2%} "
+                             f"(cost {baseline_accuracy - accuracy:+.2%}), {measurement}, "
+                             f"{'OK' if not problems else '; '.join(problems)}")
+                if candidate is not None and not problems:
+                    return candidate, compact, report
+
+            raise ValueError(f"No model candidate meets the budget {self.budget}. Last step: {report[-1]}")
+
+        except Exception as e:
+            raise CustomException(e, sys)
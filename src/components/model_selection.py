@@ -0,0 +1,245 @@
+# src/components/model_selection.py
+
+import os
+import sys
+import json
+import time
+import pickle
+import random
+import itertools
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+
+from src.logger import logging
+from src.exception import CustomException
+from src.components.forest_compiler import compile_forest
+
+# Candidate model families and the hyperparameters we sample from.
+CANDIDATE_FAMILIES = {
+    "random_forest": (RandomForestClassifier, {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [None, 20, 30],
+        "min_samples_leaf": [1, 2, 4],
+        "class_weight": ["balanced"],
+    }),
+    "extra_trees": (ExtraTreesClassifier, {
+        "n_estimators": [100, 200, 300],
+        "max_depth": [None, 20, 30],
+        "min_samples_leaf": [1, 2, 4],
+        "class_weight": ["balanced"],
+    }),
+    "hist_gradient_boosting": (HistGradientBoostingClassifier, {
+        "learning_rate": [0.05, 0.1],
+        "max_iter": [100, 200],
+        "max_leaf_nodes": [31, 63],
+        "class_weight": ["balanced"],
+    }),
+    "logistic_regression": (LogisticRegression, {
+        "C": [0.1, 1.0, 10.0],
+        "max_iter": [1000],
+        "class_weight": ["balanced"],
+    }),
+}
+
+# Families whose fitted models can be turned into a CompiledForest for serving
+FOREST_FAMILIES = ("random_forest", "extra_trees")
+
+@dataclass
+class ModelSelectionConfig:
+    leaderboard_file_path: str = os.path.join("artifacts", "model_leaderboard.json")
+    families: tuple = ("random_forest", "extra_trees", "hist_gradient_boosting", "logistic_regression")
+    # Random search: how many configurations to sample per family
+    n_candidates_per_family: int = 4
+    # Successive halving: keep the best 1/halving_factor after every rung.
+    # The first rung trains on min_resource_fraction of the training rows.
+    halving_factor: int = 3
+    min_resource_fraction: float = 0.25
+    validation_size: float = 0.2
+    # Each trial gets this many threads; the pool gets cpu_count // threads_per_trial
+    # workers, so trials never oversubscribe the cores.
+    threads_per_trial: int = 2
+    n_workers: Optional[int] = None
+    # Final score = accuracy - latency_weight * p99_ms - size_weight * size_mb
+    latency_weight: float = 0.002
+    size_weight: float = 0.0005
+    latency_repeats: int = 50
+    random_state: int = 42
+
+
+def build_estimator(family, params, n_jobs, random_state):
+    estimator_class, _ = CANDIDATE_FAMILIES[family]
+    estimator = estimator_class(**params)
+    extra = {}
+    if "n_jobs" in estimator.get_params():
+        extra["n_jobs"] = n_jobs
+    if "random_state" in estimator.get_params():
+        extra["random_state"] = random_state
+    return estimator.set_params(**extra)
+
+
+def measure_serving_cost(family, model, X_sample, repeats, compact=False):
+    """
+    p50/p99 single-row latency (ms) and pickled size (bytes) of the model as
+    it would be served: forests are timed through their CompiledForest.
+    """
+    serving_model = compile_forest(model, compact=compact) if family in FOREST_FAMILIES else model
+    row = X_sample[:1]
+    serving_model.predict_proba(row)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        serving_model.predict_proba(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    size_bytes = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99)), size_bytes
+
+
+def run_trial(trial):
+    """
+    Fits one candidate on a subset of the training rows and scores it on the
+    validation set. Runs inside a worker process.
+    """
+    with threadpool_limits(limits=trial["threads"]):
+        model = build_estimator(trial["family"], trial["params"], trial["threads"], trial["random_state"])
+        start = time.perf_counter()
+        model.fit(trial["X_train"], trial["y_train"])
+        fit_seconds = time.perf_counter() - start
+        accuracy = accuracy_score(trial["y_val"], model.predict(trial["X_val"]))
+
+        result = {
+            "family": trial["family"],
+            "params": trial["params"],
+            "train_rows": len(trial["y_train"]),
+            "fit_seconds": round(fit_seconds, 3),
+            "accuracy": float(accuracy),
+        }
+        if trial["measure_serving"]:
+            # Serving is single-threaded per request, so time it that way
+            model.set_params(**({"n_jobs": 1} if "n_jobs" in model.get_params() else {}))
+            p50, p99, size_bytes = measure_serving_cost(trial["family"], model, trial["X_val"], trial["repeats"])
+            result.update({
+                "latency_p50_ms": round(p50, 4),
+                "latency_p99_ms": round(p99, 4),
+                "size_mb": round(size_bytes / (1024 * 1024), 2),
+            })
+        return result
+
+
+class ModelSelector:
+    """
+    Random search over several model families with successive halving,
+    spread over a process pool. Writes a leaderboard JSON and returns the
+    best (family, params) by accuracy, latency and size.
+    """
+    def __init__(self, selection_config: Optional[ModelSelectionConfig] = None):
+        self.selection_config = selection_config or ModelSelectionConfig()
+        logging.info("ModelSelector initialized.")
+
+    def sample_candidates(self):
+        config = self.selection_config
+        rng = random.Random(config.random_state)
+        candidates = []
+        for family in config.families:
+            _, grid = CANDIDATE_FAMILIES[family]
+            names = sorted(grid)
+            all_params = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+            rng.shuffle(all_params)
+            candidates += [(family, params) for params in all_params[:config.n_candidates_per_family]]
+        return candidates
+
+    def rung_fractions(self):
+        config = self.selection_config
+        fractions = []
+        fraction = config.min_resource_fraction
+        while fraction < 1.0:
+            fractions.append(fraction)
+            fraction *= config.halving_factor
+        return fractions + [1.0]
+
+    def score(self, result):
+        config = self.selection_config
+        return (result["accuracy"]
+                - config.latency_weight * result["latency_p99_ms"]
+                - config.size_weight * result["size_mb"])
+
+    def select(self, X_train, y_train):
+        logging.info("--- Starting Model Selection ---")
+        try:
+            config = self.selection_config
+            X_fit, X_val, y_fit, y_val = train_test_split(
+                X_train, y_train, test_size=config.validation_size,
+                stratify=y_train, random_state=config.random_state
+            )
+            # One fixed shuffle, so every rung trains on a prefix of the same order
+            order = np.random.default_rng(config.random_state).permutation(len(y_fit))
+
+            threads = max(1, config.threads_per_trial)
+            n_workers = config.n_workers or max(1, (os.cpu_count() or 1) // threads)
+            logging.info(f"Model selection: {n_workers} workers x {threads} threads per trial.")
+
+            survivors = self.sample_candidates()
+            fractions = self.rung_fractions()
+            history = []
+
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                for rung, fraction in enumerate(fractions):
+                    is_last_rung = rung == len(fractions) - 1
+                    rows = order[:max(1, int(len(order) * fraction))]
+                    trials = [{
+                        "family": family, "params": params, "threads": threads,
+                        "random_state": config.random_state, "repeats": config.latency_repeats,
+                        "X_train": X_fit[rows], "y_train": y_fit[rows], "X_val": X_val, "y_val": y_val,
+                        "measure_serving": is_last_rung,
+                    } for family, params in survivors]
+                    results = list(pool.map(run_trial, trials))
+                    for result in results:
+                        result["rung"] = rung
+                    history += results
+                    logging.info(f"Rung {rung}: {len(results)} trials on {len(rows)} rows.")
+
+                    if not is_last_rung:
+                        # Only the top 1/halving_factor (by accuracy) move on to the next rung
+                        keep = max(1, int(np.ceil(len(results) / config.halving_factor)))
+                        results.sort(key=lambda item: item["accuracy"], reverse=True)
+                        survivors = [(item["family"], item["params"]) for item in results[:keep]]
+
+            finalists = [item for item in history if item["rung"] == len(fractions) - 1]
+            for item in finalists:
+                item["score"] = round(self.score(item), 5)
+            finalists.sort(key=lambda item: item["score"], reverse=True)
+
+            leaderboard = {
+                "config": asdict(self.selection_config),
+                "leaderboard": finalists,
+                "all_trials": history,
+            }
+            os.makedirs(os.path.dirname(config.leaderboard_file_path), exist_ok=True)
+            with open(config.leaderboard_file_path, "w") as file_obj:
+                json.dump(leaderboard, file_obj, indent=2, default=str)
+
+            best = finalists[0]
+            logging.info(f"Best candidate: {best['family']} {best['params']} (score {best['score']}).")
+            logging.info(f"Leaderboard saved to {config.leaderboard_file_path}")
+            return best["family"], best["params"]
+
+        except Exception as e:
+            logging.error(f"An error occurred during model selection: {e}")
+            raise CustomException(e, sys)
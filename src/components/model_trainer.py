@@ -2,16 +2,21 @@
 
 import os
 import sys
+import json
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import pickle
 
 # --- THIS IS THE FIX ---
-current_dir = Path(__file__).resolve().parent
-root_dir = current_dir.parent.parent
-sys.path.append(str(root_dir))
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
 # --- END OF FIX ---
 
 from src.logger import logging
@@ -19,16 +24,46 @@ from src.exception import CustomException
 from src.utils import save_object
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
+from src.components.forest_compiler import compile_forest
+from src.components.model_selection import ModelSelector, ModelSelectionConfig, build_estimator, FOREST_FAMILIES
+from src.components.model_budget import ModelBudget, BudgetEnforcer
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path: str = os.path.join("artifacts", "spotify_genre_model.pkl")
+    compiled_model_file_path: str = os.path.join("artifacts", "compiled_model.pkl")
+    # "mmap" lets every serving worker share one read-only copy of the node arrays
+    compiled_model_file_format: str = "mmap"
+    # Also write a compressed copy of the model for distribution,
+    # e.g. "lzma" -> spotify_genre_model.pkl.lzma. None = don't.
+    distribution_compression: Optional[str] = None
+    # Run ModelSelector (search + bake-off) instead of the fixed RandomForest
+    model_selection: bool = False
+    # Size / latency / throughput limits. The model is shrunk until it fits,
+    # and training fails if nothing fits. Inactive when every limit is None.
+    budget: ModelBudget = field(default_factory=ModelBudget)
+    budget_report_file_path: str = os.path.join("artifacts", "model_budget_report.json")
 
 class ModelTrainer:
-    def __init__(self):
-        self.model_trainer_config = ModelTrainerConfig()
+    def __init__(self, model_trainer_config: Optional[ModelTrainerConfig] = None,
+                 selection_config: Optional[ModelSelectionConfig] = None):
+        self.model_trainer_config = model_trainer_config or ModelTrainerConfig()
+        self.selection_config = selection_config or ModelSelectionConfig()
         logging.info("ModelTrainer component initialized.")
 
+    def compiled_model_is_compact(self):
+        """
+        Whether the last training run saved the compiled forest compact
+        (float32), read from its budget report. A stage-cache hit restores
+        that report together with the model, so this works without retraining.
+        """
+        config = self.model_trainer_config
+        if not config.budget.is_active() or not os.path.exists(config.budget_report_file_path):
+            return False
+        with open(config.budget_report_file_path) as file_obj:
+            budget_report = json.load(file_obj)
+        return bool(budget_report and budget_report[-1].get("compact", False))
+
     # --- THIS FUNCTION IS NOW MODIFIED ---
     def initiate_model_training(self, X_train, y_train, X_test, y_test, le): #<-- Vars renamed
         logging.info("--- Starting Model Training ---")
@@ -36,19 +71,36 @@ class ModelTrainer:
             logging.info("Data for training has been received.")
 
             # --- 2. Initialize the model (WITH NEW SETTING) ---
-            model = RandomForestClassifier(
-                n_estimators=100,
-                random_state=42,
-                class_weight='balanced',  # <-- THIS IS THE FIX FOR THE 909MB FILE
-                n_jobs=-1
-            )
-            logging.info("RandomForestClassifier model initialized with class_weight='balanced'.")
+            if self.model_trainer_config.model_selection:
+                family, params = ModelSelector(self.selection_config).select(X_train, y_train)
+                model = build_estimator(family, params, n_jobs=-1, random_state=42)
+                logging.info(f"Model selection picked {family} with {params}.")
+            else:
+                family = "random_forest"
+                model = RandomForestClassifier(
+                    n_estimators=100,
+                    random_state=42,
+                    class_weight='balanced',  # <-- THIS IS THE FIX FOR THE 909MB FILE
+                    n_jobs=-1
+                )
+                logging.info("RandomForestClassifier model initialized with class_weight='balanced'.")
 
             # --- 3. Train the model ---
             logging.info("Training the model...")
             model.fit(X_train, y_train) #<-- Use original processed data
             logging.info("Model training complete.")
 
+            # --- 3b. Enforce the size / latency budget (if any) ---
+            compact = False
+            if self.model_trainer_config.budget.is_active():
+                logging.info(f"Checking model against budget {self.model_trainer_config.budget}...")
+                model, compact, budget_report = BudgetEnforcer(self.model_trainer_config.budget).enforce(
+                    family, model, X_train, y_train
+                )
+                with open(self.model_trainer_config.budget_report_file_path, "w") as file_obj:
+                    json.dump(budget_report, file_obj, indent=2)
+                logging.info(f"Budget met after step '{budget_report[-1]['step']}'.")
+
             # --- 4. Evaluate the model ---
             logging.info("Evaluating model on the test set...")
             y_pred = model.predict(X_test)
@@ -63,6 +115,26 @@ class ModelTrainer:
                 file_path=self.model_trainer_config.trained_model_file_path,
                 obj=model
             )
+            compression = self.model_trainer_config.distribution_compression
+            if compression:
+                save_object(
+                    file_path=f"{self.model_trainer_config.trained_model_file_path}.{compression}",
+                    obj=model,
+                    file_format=compression
+                )
+
+            # --- 6. Save the compiled (NumPy-only) version for fast serving ---
+            compiled_path = self.model_trainer_config.compiled_model_file_path
+            if family in FOREST_FAMILIES:
+                save_object(
+                    file_path=compiled_path,
+                    obj=compile_forest(model, compact=compact),
+                    file_format=self.model_trainer_config.compiled_model_file_format
+                )
+            elif os.path.exists(compiled_path):
+                # Not a forest: a leftover compiled model would no longer match
+                os.remove(compiled_path)
+                logging.info(f"Removed stale {compiled_path}.")
 
             logging.info("--- Model Training Complete. Trained model saved to 'artifacts'. ---")
 
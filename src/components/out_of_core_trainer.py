@@ -0,0 +1,370 @@
+# src/components/out_of_core_trainer.py
+
+import os
+import sys
+import json
+import math
+import time
+import pickle
+import resource
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Optional
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.metrics import accuracy_score, classification_report
+
+from src.logger import logging
+from src.exception import CustomException
+from src.utils import save_objects
+from src.components.data_ingestion import RAW_DATA_DTYPES, hash_split_is_test
+from src.components.data_transformation import DataTransformation, consolidate_genre_series
+from src.components.forest_compiler import compile_forest
+from src.components.incremental_trainer import pad_missing_classes
+
+# Rows used to measure how big one tree gets per training row
+PILOT_ROWS = 5000
+
+# Fewer rows per block than this would give poor trees: ask for more memory
+MIN_BLOCK_ROWS = 1000
+
+@dataclass
+class OutOfCoreTrainerConfig:
+    raw_data_path: str = os.path.join('data', 'dataset.csv')
+    # X_train.npy / y_train.npy / X_test.npy / y_test.npy (float32 / int32), memory-mapped
+    processed_dir: str = os.path.join('artifacts', 'out_of_core')
+    trained_model_file_path: str = os.path.join('artifacts', 'spotify_genre_model.pkl')
+    compiled_model_file_path: str = os.path.join('artifacts', 'compiled_model.pkl')
+    compiled_model_file_format: str = "mmap"
+    preprocessor_obj_file_path: str = os.path.join('artifacts', 'preprocessor.pkl')
+    label_encoder_obj_file_path: str = os.path.join('artifacts', 'label_encoder.pkl')
+    report_file_path: str = os.path.join('artifacts', 'out_of_core_report.json')
+    # Peak memory of the whole run (this process + all workers), in MB
+    memory_limit_mb: int = 2048
+    # Raw CSV rows read at a time
+    chunk_size: int = 100000
+    n_estimators: int = 100
+    # Worker processes. None = one per CPU.
+    n_workers: Optional[int] = None
+    test_size: float = 0.2
+    random_state: int = 42
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fit_forest_on_block(X_block, y_block, classes, n_trees, seed):
+    """
+    The same RandomForest settings as ModelTrainer, single-threaded
+    (the parallelism comes from the worker processes).
+    """
+    X_block, y_block, sample_weight = pad_missing_classes(X_block, y_block, classes)
+    forest = RandomForestClassifier(
+        n_estimators=n_trees,
+        random_state=seed,
+        class_weight='balanced',
+        n_jobs=1,
+    )
+    return forest.fit(X_block, y_block, sample_weight=sample_weight)
+
+
+def fit_tree_subset(X_path, y_path, block_rows, n_trees, seed, classes):
+    """
+    Runs in a worker process: draws a random block of block_rows rows from
+    the memory-mapped training matrix and fits n_trees bagged trees on it.
+    Only the block is ever loaded into memory, never the whole matrix.
+    Returns the fitted sub-forest, the seconds spent and the worker's peak RSS.
+    """
+    start = time.perf_counter()
+    X = np.load(X_path, mmap_mode='r')
+    y = np.load(y_path, mmap_mode='r')
+    rng = np.random.default_rng(seed)
+    if block_rows < len(y):
+        # Sorted, so the block is read front to back through the page cache
+        rows = np.sort(rng.choice(len(y), size=block_rows, replace=False))
+        X_block, y_block = X[rows], y[rows]
+    else:
+        X_block, y_block = np.asarray(X), np.asarray(y)
+    forest = fit_forest_on_block(X_block, y_block, classes, n_trees, seed)
+    return forest, time.perf_counter() - start, peak_rss_mb()
+
+
+def merge_forests(forests):
+    """
+    Joins sub-forests fitted on the same classes into one RandomForestClassifier.
+    """
+    merged = forests[0]
+    merged.estimators_ = [tree for forest in forests for tree in forest.estimators_]
+    merged.set_params(n_estimators=len(merged.estimators_), random_state=None, n_jobs=-1)
+    return merged
+
+
+class OutOfCoreTrainer:
+    """
+    Trains the RandomForest on a raw CSV of any size with bounded memory:
+
+    1. Stream the CSV in chunks: fit the scaler with running moments and
+       collect the one-hot categories and genre labels.
+    2. Stream it again and write the processed rows to memory-mapped float32
+       .npy matrices on disk (train and test, split by track_id hash).
+    3. Size the bootstrap blocks so the run stays under memory_limit_mb,
+       from a pilot tree's size per training row.
+    4. Fit subsets of trees on separate blocks in worker processes and merge
+       them into one forest.
+    5. Score it on the test matrix block by block and publish the model,
+       compiled model, preprocessor and label encoder as one artifact
+       version (utils.save_objects), so serving never mixes them with the
+       previous set.
+    """
+    def __init__(self, out_of_core_config: Optional[OutOfCoreTrainerConfig] = None):
+        self.out_of_core_config = out_of_core_config or OutOfCoreTrainerConfig()
+        logging.info("OutOfCoreTrainer component initialized.")
+
+    def _read_raw_chunks(self):
+        return pd.read_csv(
+            self.out_of_core_config.raw_data_path,
+            dtype=RAW_DATA_DTYPES,
+            chunksize=self.out_of_core_config.chunk_size,
+        )
+
+    def _split_chunk(self, chunk):
+        chunk = chunk.assign(consolidated_genre=consolidate_genre_series(chunk['track_genre']))
+        chunk = chunk[chunk['consolidated_genre'] != 'Other']
+        is_test = hash_split_is_test(chunk['track_id'], self.out_of_core_config.test_size)
+        return chunk[~is_test], chunk[is_test]
+
+    def fit_preprocessor(self):
+        """
+        First pass: the same ColumnTransformer DataTransformation builds, but
+        fitted chunk by chunk. Returns it, the label encoder, the row counts
+        and the largest chunk's size in bytes.
+        """
+        preprocessor = DataTransformation().get_data_transformer_object()
+        columns = {name: columns for name, _, columns in preprocessor.transformers}
+        numeric_columns, categorical_columns = columns["num_pipeline"], columns["cat_pipeline"]
+
+        scaler = StandardScaler()
+        categories = {column: set() for column in categorical_columns}
+        train_labels, test_labels = Counter(), Counter()
+        prototype = None
+        chunk_bytes = 0
+        for chunk in self._read_raw_chunks():
+            chunk_bytes = max(chunk_bytes, int(chunk.memory_usage(deep=True).sum()))
+            train_rows, test_rows = self._split_chunk(chunk)
+            test_labels.update(test_rows['consolidated_genre'].tolist())
+            if len(train_rows) == 0:
+                continue
+            scaler.partial_fit(train_rows[numeric_columns])
+            for column in categorical_columns:
+                categories[column].update(train_rows[column].unique().tolist())
+            train_labels.update(train_rows['consolidated_genre'].tolist())
+            if prototype is None:
+                prototype = train_rows.head(100)
+        if prototype is None:
+            raise ValueError(f"No training rows in {self.out_of_core_config.raw_data_path}.")
+
+        # Fit the ColumnTransformer's structure on a few rows with the full
+        # category lists, then put in the scaler fitted on every row
+        preprocessor.set_params(cat_pipeline__one_hot_encoder__categories=[
+            np.array(sorted(categories[column])) for column in categorical_columns
+        ])
+        preprocessor.fit(prototype)
+        preprocessor.named_transformers_["num_pipeline"].steps[0] = ("scaler", scaler)
+
+        le = LabelEncoder().fit(sorted(train_labels))
+        n_train = sum(train_labels.values())
+        # Test rows of a genre that never appears in train cannot be scored
+        n_test = sum(count for label, count in test_labels.items() if label in train_labels)
+        n_features = preprocessor.transform(prototype).shape[1]
+        logging.info(f"Preprocessor fitted on {n_train} train rows in chunks; "
+                     f"{n_test} test rows, {n_features} features, {len(le.classes_)} genres.")
+        return preprocessor, le, n_train, n_test, n_features, chunk_bytes
+
+    def write_processed(self, preprocessor, le, n_train, n_test, n_features):
+        """
+        Second pass: transforms each chunk and writes it straight into the
+        memory-mapped matrices. Returns their paths.
+        """
+        os.makedirs(self.out_of_core_config.processed_dir, exist_ok=True)
+        paths = {name: os.path.join(self.out_of_core_config.processed_dir, f"{name}.npy")
+                 for name in ("X_train", "y_train", "X_test", "y_test")}
+        matrices = {
+            "X_train": np.lib.format.open_memmap(paths["X_train"], mode='w+', dtype=np.float32, shape=(n_train, n_features)),
+            "y_train": np.lib.format.open_memmap(paths["y_train"], mode='w+', dtype=np.int32, shape=(n_train,)),
+            "X_test": np.lib.format.open_memmap(paths["X_test"], mode='w+', dtype=np.float32, shape=(n_test, n_features)),
+            "y_test": np.lib.format.open_memmap(paths["y_test"], mode='w+', dtype=np.int32, shape=(n_test,)),
+        }
+        written = {"train": 0, "test": 0}
+        for chunk in self._read_raw_chunks():
+            for split, rows in zip(("train", "test"), self._split_chunk(chunk)):
+                rows = rows[rows['consolidated_genre'].isin(le.classes_)]
+                if len(rows) == 0:
+                    continue
+                X_block = preprocessor.transform(rows)
+                X_block = X_block.toarray() if hasattr(X_block, "toarray") else X_block
+                position = written[split]
+                matrices[f"X_{split}"][position:position + len(rows)] = X_block
+                matrices[f"y_{split}"][position:position + len(rows)] = le.transform(rows['consolidated_genre'])
+                written[split] += len(rows)
+        for matrix in matrices.values():
+            matrix.flush()
+        del matrices
+        logging.info(f"Wrote {written['train']} train and {written['test']} test rows to "
+                     f"{self.out_of_core_config.processed_dir}.")
+        return paths
+
+    def plan_blocks(self, X_train, y_train, classes, chunk_bytes, n_workers):
+        """
+        Picks block_rows (rows per bootstrap block) and trees_per_task so that
+        this process (holding the merged forest) plus n_workers workers (each
+        holding one block and its trees) fit in memory_limit_mb.
+
+        Tree size grows about linearly with the rows it is fitted on, so one
+        pilot tree on PILOT_ROWS rows gives the bytes per row per tree.
+        """
+        config = self.out_of_core_config
+        pilot_rows = min(PILOT_ROWS, len(y_train))
+        rows = np.sort(np.random.default_rng(config.random_state).choice(len(y_train), pilot_rows, replace=False))
+        pilot = fit_forest_on_block(X_train[rows], y_train[rows], classes, 1, config.random_state)
+        tree_bytes_per_row = len(pickle.dumps(pilot.estimators_[0])) / pilot_rows
+
+        trees_per_task = max(1, math.ceil(config.n_estimators / (n_workers * 4)))
+        # X block + y + sample weights + sklearn's per-row work arrays
+        row_bytes = X_train.shape[1] * 4 + 64
+        baseline_bytes = peak_rss_mb() * 1024 * 1024
+        available = config.memory_limit_mb * 1024 * 1024 - baseline_bytes * (1 + n_workers) - chunk_bytes
+        bytes_per_block_row = (
+            config.n_estimators * tree_bytes_per_row                      # merged forest
+            + 2 * trees_per_task * tree_bytes_per_row                     # one sub-forest being unpickled
+            + n_workers * (row_bytes + trees_per_task * tree_bytes_per_row)
+        )
+        block_rows = int(min(len(y_train), available / bytes_per_block_row))
+        if block_rows < min(MIN_BLOCK_ROWS, len(y_train)):
+            raise ValueError(f"memory_limit_mb={config.memory_limit_mb} leaves room for only {block_rows} rows "
+                             f"per block. Raise the limit or use fewer workers.")
+        logging.info(f"Memory plan: {block_rows} rows per block, {trees_per_task} trees per task, "
+                     f"{tree_bytes_per_row:.0f} bytes per tree per row.")
+        return block_rows, trees_per_task, tree_bytes_per_row
+
+    def evaluate(self, model, X_test, y_test, le, block_rows):
+        if len(y_test) == 0:
+            return None
+        y_pred = np.empty(len(y_test), dtype=np.int64)
+        for start in range(0, len(y_test), block_rows):
+            y_pred[start:start + block_rows] = model.predict(np.asarray(X_test[start:start + block_rows]))
+        accuracy = accuracy_score(y_test, y_pred)
+        logging.info(f"Model Accuracy on Test Set: {accuracy:.2%}")
+        logging.info(f"Classification Report:\n"
+                     f"{classification_report(y_test, y_pred, labels=np.arange(len(le.classes_)), target_names=le.classes_, zero_division=0)}")
+        return float(accuracy)
+
+    def initiate_out_of_core_training(self):
+        logging.info("--- Starting Out-of-Core Training ---")
+        try:
+            config = self.out_of_core_config
+            start = time.perf_counter()
+            n_workers = config.n_workers or os.cpu_count() or 1
+
+            # --- 1. + 2. Two streaming passes over the raw CSV ---
+            preprocessor, le, n_train, n_test, n_features, chunk_bytes = self.fit_preprocessor()
+            paths = self.write_processed(preprocessor, le, n_train, n_test, n_features)
+            X_train = np.load(paths["X_train"], mmap_mode='r')
+            y_train = np.load(paths["y_train"], mmap_mode='r')
+            classes = np.arange(len(le.classes_))
+            prepared_seconds = time.perf_counter() - start
+
+            # --- 3. Memory plan ---
+            block_rows, trees_per_task, tree_bytes_per_row = self.plan_blocks(
+                X_train, y_train, classes, chunk_bytes, n_workers
+            )
+
+            # --- 4. Fit tree subsets in parallel and merge them ---
+            tree_counts = [trees_per_task] * (config.n_estimators // trees_per_task)
+            if config.n_estimators % trees_per_task:
+                tree_counts.append(config.n_estimators % trees_per_task)
+            forests, tasks = [], []
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = {
+                    executor.submit(fit_tree_subset, paths["X_train"], paths["y_train"], block_rows,
+                                    n_trees, config.random_state + task, classes): task
+                    for task, n_trees in enumerate(tree_counts)
+                }
+                for future in as_completed(futures):
+                    forest, seconds, worker_peak_mb = future.result()
+                    forests.append((futures[future], forest))
+                    tasks.append({"task": futures[future], "trees": len(forest.estimators_),
+                                  "seconds": round(seconds, 3), "worker_peak_rss_mb": round(worker_peak_mb, 1)})
+                    logging.info(f"Tree subset {futures[future]} done in {seconds:.2f}s "
+                                 f"(worker peak RSS {worker_peak_mb:.0f} MB).")
+            # Task order, not finish order, so the result is reproducible
+            model = merge_forests([forest for _, forest in sorted(forests, key=lambda item: item[0])])
+
+            # --- 5. Evaluate and save ---
+            X_test = np.load(paths["X_test"], mmap_mode='r')
+            y_test = np.load(paths["y_test"], mmap_mode='r')
+            accuracy = self.evaluate(model, X_test, y_test, le, block_rows)
+
+            # The preprocessor was refitted on the whole CSV, so the four
+            # files only work together: one manifest swap publishes them
+            artifact_version = save_objects([
+                (config.trained_model_file_path, model, "pickle"),
+                (config.compiled_model_file_path, compile_forest(model), config.compiled_model_file_format),
+                (config.preprocessor_obj_file_path, preprocessor, "pickle"),
+                (config.label_encoder_obj_file_path, le, "pickle"),
+            ], metadata={"compact_compiled_model": False})
+
+            master_peak_mb = peak_rss_mb()
+            worker_peak_mb = max(task["worker_peak_rss_mb"] for task in tasks)
+            # RSS counts pages shared with the parent in every worker too, so this overestimates
+            estimated_peak_mb = master_peak_mb + min(n_workers, len(tasks)) * worker_peak_mb
+            report = {
+                "train_rows": n_train,
+                "test_rows": n_test,
+                "n_features": n_features,
+                "n_estimators": len(model.estimators_),
+                "n_workers": n_workers,
+                "block_rows": block_rows,
+                "trees_per_task": trees_per_task,
+                "tree_bytes_per_row": round(tree_bytes_per_row, 1),
+                "memory_limit_mb": config.memory_limit_mb,
+                "master_peak_rss_mb": round(master_peak_mb, 1),
+                "worker_peak_rss_mb": worker_peak_mb,
+                "estimated_peak_mb": round(estimated_peak_mb, 1),
+                "test_accuracy": accuracy,
+                "artifact_version": artifact_version,
+                "prepare_seconds": round(prepared_seconds, 3),
+                "seconds": round(time.perf_counter() - start, 3),
+                "tasks": sorted(tasks, key=lambda task: task["task"]),
+            }
+            if estimated_peak_mb > config.memory_limit_mb:
+                logging.warning(f"Estimated peak {estimated_peak_mb:.0f} MB is over the "
+                                f"{config.memory_limit_mb} MB limit.")
+            with open(config.report_file_path, "w") as file_obj:
+                json.dump(report, file_obj, indent=2)
+            logging.info(f"--- Out-of-Core Training Complete in {report['seconds']}s ---")
+            return report
+
+        except Exception as e:
+            logging.error(f"An error occurred during out-of-core training: {e}")
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    logging.info("Running Out-of-Core Trainer as a standalone script...")
+    print(json.dumps(OutOfCoreTrainer().initiate_out_of_core_training(), indent=2))
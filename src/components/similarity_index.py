@@ -0,0 +1,267 @@
+# src/components/similarity_index.py
+
+import os
+import sys
+import time
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Optional
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import numpy as np
+
+from src.logger import logging
+from src.exception import CustomException
+from src.utils import save_object, load_object
+from src.components.fast_preprocessor import FastPreprocessor
+
+# Track details returned with every neighbour
+TRACK_COLUMNS = ['track_id', 'track_name', 'artists']
+
+
+@dataclass
+class SimilarityIndexConfig:
+    train_data_path: str = os.path.join('artifacts', 'train.csv')
+    preprocessor_obj_file_path: str = os.path.join('artifacts', 'preprocessor.pkl')
+    # Saved in the "mmap" format: vectors and track details are memory-mapped on load
+    index_file_path: str = os.path.join('artifacts', 'similarity_index.pkl')
+    # Up to this many tracks the index scans every vector (exact search).
+    # Bigger corpora get an inverted-file (IVF) index instead.
+    exact_max_rows: int = 100000
+    # IVF: number of k-means lists (None = 4 * sqrt(rows)) and lists scanned per query
+    n_lists: Optional[int] = None
+    n_probe: int = 16
+    kmeans_iterations: int = 20
+    kmeans_sample_size: int = 100000
+    random_state: int = 42
+
+
+def pack_strings(values):
+    """
+    A column of strings as one UTF-8 byte array plus offsets, so it can be
+    stored out-of-band and memory-mapped like any other NumPy array.
+    """
+    encoded = [str(value).encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def kmeans(X, n_clusters, iterations, rng):
+    """
+    Plain Lloyd k-means in NumPy, started from random rows. Empty clusters
+    are restarted on a random row. Returns the centroids.
+    """
+    centroids = X[rng.choice(len(X), size=n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest_centroids(X, centroids)
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.zeros_like(centroids, dtype=np.float64)
+        np.add.at(sums, labels, X)
+        empty = counts == 0
+        centroids[~empty] = (sums[~empty] / counts[~empty, None]).astype(centroids.dtype)
+        centroids[empty] = X[rng.choice(len(X), size=int(empty.sum()))]
+    return centroids
+
+
+def nearest_centroids(X, centroids, block_rows=65536):
+    labels = np.empty(len(X), dtype=np.int64)
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    for start in range(0, len(X), block_rows):
+        block = X[start:start + block_rows]
+        # |x - c|^2 without the |x|^2 term, which is the same for every centroid
+        labels[start:start + block_rows] = np.argmin(centroid_norms - 2 * block @ centroids.T, axis=1)
+    return labels
+
+
+class SimilarityIndex:
+    """
+    Tracks of the training corpus as vectors in the preprocessor's feature
+    space (standardized numeric features + one-hot key/mode/time_signature),
+    searchable by Euclidean distance.
+
+    - Exact mode scans every vector with one matrix-vector product.
+    - IVF mode splits the vectors into k-means lists, stored one after the
+      other, and only scans the n_probe lists whose centroids are closest.
+
+    Everything is plain NumPy arrays, so the "mmap" artifact format keeps
+    them on disk and shares them between worker processes. The index keeps
+    the scaler / one-hot parameters it was built with, so queries land in
+    the same space even after preprocessor.pkl is retrained.
+    """
+    def __init__(self, vectors, track_columns, preprocessor_params, centroids=None, list_offsets=None, n_probe=1):
+        self.vectors = vectors
+        self.norms = np.einsum("ij,ij->i", vectors, vectors)
+        self.track_columns = track_columns  # {name: (utf-8 bytes, offsets)}
+        self.preprocessor_params = preprocessor_params
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.n_probe = n_probe
+
+    @property
+    def n_tracks(self):
+        return len(self.vectors)
+
+    @property
+    def mode(self):
+        return "exact" if self.centroids is None else "ivf"
+
+    def build_preprocessor(self):
+        """
+        The FastPreprocessor that maps a raw record into this index's space.
+        """
+        return FastPreprocessor(**self.preprocessor_params)
+
+    def track(self, position):
+        details = {}
+        for name, (data, offsets) in self.track_columns.items():
+            details[name] = bytes(data[offsets[position]:offsets[position + 1]]).decode("utf-8")
+        return details
+
+    def _candidates(self, query):
+        """
+        (start, stop) ranges of the vectors to scan for this query.
+        """
+        if self.centroids is None:
+            return [(0, self.n_tracks)]
+        centroid_distances = np.einsum("ij,ij->i", self.centroids, self.centroids) - 2 * self.centroids @ query
+        n_probe = min(self.n_probe, len(self.centroids))
+        lists = np.argpartition(centroid_distances, n_probe - 1)[:n_probe]
+        return [(self.list_offsets[number], self.list_offsets[number + 1]) for number in lists]
+
+    def search(self, query, k=10):
+        """
+        query: one vector in the index space. Returns (positions, distances)
+        of the k nearest tracks, closest first.
+        """
+        query = np.asarray(query, dtype=self.vectors.dtype).ravel()
+        positions, distances = [], []
+        for start, stop in self._candidates(query):
+            if stop > start:
+                # |v - q|^2 = |v|^2 - 2 v.q + |q|^2
+                distances.append(self.norms[start:stop] - 2 * (self.vectors[start:stop] @ query))
+                positions.append(np.arange(start, stop))
+        positions, distances = np.concatenate(positions), np.concatenate(distances) + query @ query
+        k = min(k, len(positions))
+        best = np.argpartition(distances, k - 1)[:k]
+        best = best[np.argsort(distances[best], kind="stable")]
+        return positions[best], np.sqrt(np.maximum(distances[best], 0.0))
+
+    def similar_tracks(self, processed_row, k=10):
+        """
+        The k nearest tracks as dicts: track_id, track_name, artists, distance.
+        """
+        positions, distances = self.search(processed_row, k)
+        return [self.track(position) | {"distance": round(float(distance), 4)}
+                for position, distance in zip(positions, distances)]
+
+
+class SimilarityIndexBuilder:
+    def __init__(self, similarity_config: Optional[SimilarityIndexConfig] = None):
+        self.similarity_config = similarity_config or SimilarityIndexConfig()
+        logging.info("SimilarityIndexBuilder initialized.")
+
+    def build(self, tracks_df, preprocessor):
+        """
+        Builds a SimilarityIndex over tracks_df (one row per track, with the
+        12 feature columns and TRACK_COLUMNS).
+        """
+        config = self.similarity_config
+        fast_preprocessor = FastPreprocessor.from_column_transformer(preprocessor)
+        vectors = fast_preprocessor.transform_frame(tracks_df).astype(np.float32)
+        preprocessor_params = {
+            "numeric_columns": fast_preprocessor.numeric_columns,
+            "means": fast_preprocessor.means,
+            "scales": fast_preprocessor.scales,
+            "categorical_columns": fast_preprocessor.categorical_columns,
+            "categories": fast_preprocessor.categories,
+        }
+
+        centroids, list_offsets, n_probe = None, None, 1
+        order = np.arange(len(vectors))
+        if len(vectors) > config.exact_max_rows:
+            rng = np.random.default_rng(config.random_state)
+            n_lists = config.n_lists or int(4 * np.sqrt(len(vectors)))
+            sample = vectors[rng.choice(len(vectors), size=min(len(vectors), config.kmeans_sample_size), replace=False)]
+            centroids = kmeans(sample, n_lists, config.kmeans_iterations, rng)
+            labels = nearest_centroids(vectors, centroids)
+            # Store each list's vectors next to each other
+            order = np.argsort(labels, kind="stable")
+            list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+            np.cumsum(np.bincount(labels, minlength=n_lists), out=list_offsets[1:])
+            n_probe = config.n_probe
+            logging.info(f"IVF index: {n_lists} lists, {n_probe} scanned per query.")
+
+        track_columns = {name: pack_strings(tracks_df[name].to_numpy()[order]) for name in TRACK_COLUMNS}
+        return SimilarityIndex(np.ascontiguousarray(vectors[order]), track_columns, preprocessor_params,
+                               centroids, list_offsets, n_probe)
+
+    def initiate_index_build(self):
+        """
+        Builds the index from train.csv (one entry per track_id) and saves it.
+        Returns a short report including a recall@10 check against exact search.
+        """
+        logging.info("--- Starting Similarity Index Build ---")
+        try:
+            import pandas as pd
+
+            config = self.similarity_config
+            start = time.perf_counter()
+            preprocessor = load_object(config.preprocessor_obj_file_path)
+            feature_columns = FastPreprocessor.from_column_transformer(preprocessor).input_columns
+            tracks_df = pd.read_csv(config.train_data_path, usecols=TRACK_COLUMNS + feature_columns)
+            # The same track appears once per genre it is listed under
+            tracks_df = tracks_df.drop_duplicates(subset='track_id').dropna().reset_index(drop=True)
+
+            index = self.build(tracks_df, preprocessor)
+            save_object(config.index_file_path, index, file_format="mmap")
+
+            report = {
+                "tracks": index.n_tracks,
+                "mode": index.mode,
+                "build_seconds": round(time.perf_counter() - start, 3),
+                "size_mb": round(os.path.getsize(config.index_file_path) / (1024 * 1024), 2),
+            }
+            report.update(self.check(load_object(config.index_file_path)))
+            logging.info(f"--- Similarity Index Build Complete: {report} ---")
+            return report
+
+        except Exception as e:
+            logging.error(f"An error occurred while building the similarity index: {e}")
+            raise CustomException(e, sys)
+
+    def check(self, index, n_queries=200, k=10):
+        """
+        Query latency (p50/p99 ms) on random tracks, and for IVF the share of
+        the true 10 nearest neighbours it finds (recall@10).
+        """
+        rng = np.random.default_rng(self.similarity_config.random_state)
+        queries = index.vectors[rng.choice(index.n_tracks, size=min(n_queries, index.n_tracks), replace=False)]
+        timings, recalls = [], []
+        for query in queries:
+            begin = time.perf_counter()
+            positions, _ = index.search(query, k)
+            timings.append((time.perf_counter() - begin) * 1000)
+            if index.mode == "ivf":
+                exact = np.argsort(np.einsum("ij,ij->i", index.vectors - query, index.vectors - query))[:k]
+                recalls.append(len(np.intersect1d(positions, exact)) / k)
+        result = {
+            "query_p50_ms": round(float(np.percentile(timings, 50)), 3),
+            "query_p99_ms": round(float(np.percentile(timings, 99)), 3),
+        }
+        if recalls:
+            result["recall_at_10"] = round(float(np.mean(recalls)), 4)
+        return result
+
+
+if __name__ == "__main__":
+    logging.info("Running Similarity Index Builder as a standalone script...")
+    print(SimilarityIndexBuilder().initiate_index_build())
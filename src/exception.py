@@ -29,6 +29,18 @@ class CustomException(Exception):
         
         # Get the detailed error message
         self.detailed_error_message = get_error_details(error=error_message, error_detail=error_detail)
+
+        # The type of the original error, kept when a CustomException is
+        # wrapped again (e.g. FileNotFoundError from load_object, re-raised
+        # by the artifact registry and then by PredictPipeline)
+        if isinstance(error_message, CustomException):
+            self.error_type = error_message.error_type
+        elif isinstance(error_message, BaseException):
+            self.error_type = type(error_message).__name__
+        else:
+            self.error_type = type(self).__name__
+        # Set once the error has been counted in the metrics, so wrapping it again does not count it twice
+        self.counted = getattr(error_message, "counted", False)
         
         # Log the detailed error message
         logging.error(self.detailed_error_message)
@@ -1,31 +1,232 @@
 # src/logger.py
+#
+# Logging for the whole project. Other modules just do
+#     from src.logger import logging
+# and call logging.info(...) as usual.
+#
+# How it works:
+# - logging.info() only puts the record on an in-memory queue (QueueHandler).
+#   A background thread (QueueListener) formats it and writes it to the file,
+#   so requests never wait on disk I/O or the file lock.
+# - Records are written as one JSON object per line (LOG_FORMAT=text gives
+#   the old human-readable format).
+# - All runs append to ONE file, logs/spotify_genre_predictor.log, which is
+#   rotated by size (default) or by time instead of starting a new file on
+#   every process start.
+# - Forked children write each record straight to the file (pool workers
+#   exit without flushing a queue); serve_flask.py workers go back to the
+#   queue with start_worker_logging().
+# - The prediction hot path logs through predict_logger, which has its own
+#   level and samples messages per level (see PREDICT_LOG_SAMPLE_RATES).
+#
+# Settings (environment variables):
+#   LOG_DIR, LOG_LEVEL (INFO), LOG_FORMAT (json | text),
+#   LOG_ROTATION (size | time), LOG_MAX_BYTES (10 MB), LOG_BACKUP_COUNT (5),
+#   LOG_ROTATE_WHEN (midnight), PREDICT_LOG_LEVEL (INFO),
+#   PREDICT_LOG_SAMPLE_RATES ("DEBUG=0,INFO=0.1,WARNING=1,ERROR=1,CRITICAL=1")
 
-import logging
 import os
-from datetime import datetime
-
-# Define the log file name based on the current timestamp
-LOG_FILE_NAME = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+import json
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
 
 # Define the path to the 'logs' folder, which will be in the root directory
-LOGS_DIR = os.path.join(os.getcwd(), "logs")
+LOGS_DIR = os.environ.get("LOG_DIR", os.path.join(os.getcwd(), "logs"))
 
-# Create the 'logs' folder if it doesn't exist
-os.makedirs(LOGS_DIR, exist_ok=True)
-
-# Define the full path for the log file
+# One log file for every run; old content is rotated into .1, .2, ...
+LOG_FILE_NAME = "spotify_genre_predictor.log"
 LOG_FILE_PATH = os.path.join(LOGS_DIR, LOG_FILE_NAME)
 
-# --- Configure the logging ---
-# This is the core of the logger.
-# It sets the format for the log messages and the file to write to.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+LOG_ROTATION = os.environ.get("LOG_ROTATION", "size").lower()
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_WHEN = os.environ.get("LOG_ROTATE_WHEN", "midnight")
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    level=logging.INFO,
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+TEXT_FORMAT = "[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+# The prediction hot path (PredictPipeline, the predict routes)
+PREDICT_LOGGER_NAME = "spotify.predict"
+PREDICT_LOG_LEVEL = os.environ.get("PREDICT_LOG_LEVEL", "INFO").upper()
+PREDICT_LOG_SAMPLE_RATES = os.environ.get(
+    "PREDICT_LOG_SAMPLE_RATES", "DEBUG=0,INFO=0.1,WARNING=1,ERROR=1,CRITICAL=1"
 )
 
+# Attributes every LogRecord has; anything else came from extra={...}
+_STANDARD_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one line of JSON. Fields passed with
+    logging.info(..., extra={"genre": "Pop"}) are included as-is.
+    """
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _CreateLogsDirMixin:
+    # The handlers are created with delay=True, so the 'logs' folder and the
+    # file only appear when the first message is written, not on import.
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class LazyRotatingFileHandler(_CreateLogsDirMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class LazyTimedRotatingFileHandler(_CreateLogsDirMixin, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+
+class LazyWatchedFileHandler(_CreateLogsDirMixin, logging.handlers.WatchedFileHandler):
+    # Used by forked workers: they append to the parent's file and reopen it
+    # after the parent rotates it, so only one process ever rotates.
+    pass
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that puts the record on the queue untouched. The stock
+    QueueHandler formats the message in the calling thread; here all
+    formatting happens in the listener thread instead.
+    """
+    def prepare(self, record):
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps each record with the probability set for its level, e.g.
+    {"INFO": 0.1} keeps about one INFO message in ten.
+    """
+    def __init__(self, sample_rates):
+        super().__init__()
+        self.sample_rates = {logging.getLevelName(level): rate for level, rate in sample_rates.items()}
+
+    def filter(self, record):
+        rate = self.sample_rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def parse_sample_rates(text):
+    rates = {}
+    for item in text.split(","):
+        if "=" in item:
+            level, rate = item.split("=", 1)
+            rates[level.strip().upper()] = float(rate)
+    return rates
+
+
+def _build_file_handler(for_forked_worker=False):
+    if for_forked_worker:
+        handler = LazyWatchedFileHandler(LOG_FILE_PATH, delay=True)
+    elif LOG_ROTATION == "time":
+        handler = LazyTimedRotatingFileHandler(
+            LOG_FILE_PATH, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, delay=True
+        )
+    else:
+        handler = LazyRotatingFileHandler(
+            LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
+        )
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def _start_listener(for_forked_worker=False):
+    """
+    Creates the queue + background writer thread and points the root
+    logger's QueueHandler at it.
+    """
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(
+        log_queue, _build_file_handler(for_forked_worker), respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _log_directly_after_fork():
+    """
+    The writer thread does not survive os.fork(). Forked pool workers
+    (ProcessPoolExecutor) end with os._exit, which skips atexit, so records
+    left on a queue would be lost: the child writes each record straight
+    to the file instead. Long-lived workers switch back to the queue with
+    start_worker_logging().
+    """
+    global _listener, _direct_handler
+    _listener = None
+    root_logger.removeHandler(_queue_handler)
+    _direct_handler = _build_file_handler(for_forked_worker=True)
+    root_logger.addHandler(_direct_handler)
+
+
+def start_worker_logging():
+    """
+    For long-lived forked workers (serve_flask.py): log through the queue
+    again, with the worker's own writer thread. The worker must call
+    stop_logging() before it exits.
+    """
+    global _direct_handler
+    if _direct_handler is not None:
+        root_logger.removeHandler(_direct_handler)
+        _direct_handler.close()
+        _direct_handler = None
+        root_logger.addHandler(_queue_handler)
+    _start_listener(for_forked_worker=True)
+
+
+def stop_logging():
+    """
+    Writes out everything still in the queue. Called automatically at exit.
+    """
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+# --- Configure the logging ---
+_listener = None
+_direct_handler = None
+_queue_handler = LocalQueueHandler(queue.SimpleQueue())
+
+root_logger = logging.getLogger()
+root_logger.setLevel(LOG_LEVEL)
+root_logger.addHandler(_queue_handler)
+_start_listener()
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_log_directly_after_fork)
+
+# Logger for the prediction hot path. Use %-style arguments so the message
+# is only built if the record is kept:
+#     predict_logger.info("Decoded prediction: %s", genre)
+predict_logger = logging.getLogger(PREDICT_LOGGER_NAME)
+predict_logger.setLevel(PREDICT_LOG_LEVEL)
+predict_logger.addFilter(SamplingFilter(parse_sample_rates(PREDICT_LOG_SAMPLE_RATES)))
+
 # This is just for testing the logger
 if __name__ == "__main__":
-    logging.info("Logging has started.")
\ No newline at end of file
+    logging.info("Logging has started.")
+    predict_logger.warning("Predict-path logger is working.", extra={"genre": "Pop"})
@@ -0,0 +1,310 @@
+# src/pipeline/artifact_registry.py
+
+import os
+import sys
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+from src.logger import logging
+from src.exception import CustomException
+from src.utils import load_object, read_artifact_manifest, ARTIFACT_MANIFEST_FILE, ARTIFACT_VERSIONS_DIR
+
+
+class ArtifactRegistry:
+    """
+    Keeps every loaded artifact (model, preprocessor, label encoder) in memory
+    so each pickle file is read ONCE per process instead of on every predict().
+
+    Every entry remembers the file's size and modification time. When the
+    TrainPipeline writes a new file, the next get() notices the change and
+    reloads it (hot-reload). Set check_hash=True to also compare a SHA-256
+    of the file contents, which catches rewrites that keep the same mtime.
+
+    When a folder has an artifact_manifest.json (see utils.save_objects),
+    the files it lists are read from the published version instead. A new
+    manifest is only switched to after EVERY file of its version has been
+    loaded, so get_set() always returns one complete version; if loading
+    fails, the previous version stays in service.
+
+    Files are read without holding the registry-wide lock: a hot reload of
+    the model only makes the threads that need that same file wait, and
+    they get the copy already in memory until the new one is ready.
+    """
+    def __init__(self, check_interval_seconds: float = 1.0, check_hash: bool = False):
+        self.check_interval_seconds = check_interval_seconds
+        self.check_hash = check_hash
+        self._entries = {}
+        self._manifests = {}
+        # _lock only guards the dicts and counters and is never held while
+        # reading a file; loads take the per-path / per-folder _load_locks
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.load_seconds = {}
+
+    def _load_lock(self, key):
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def _file_signature(self, file_path):
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self.check_hash:
+            sha = hashlib.sha256()
+            with open(file_path, "rb") as file_obj:
+                for block in iter(lambda: file_obj.read(1024 * 1024), b""):
+                    sha.update(block)
+            signature = signature + (sha.hexdigest(),)
+        return signature
+
+    def _load(self, file_path, signature):
+        """
+        Reads file_path into a new entry. Call WITHOUT the lock held; the
+        caller publishes the entry with _publish.
+        """
+        start = time.perf_counter()
+        obj = load_object(file_path)
+        elapsed = time.perf_counter() - start
+        logging.info(f"Artifact loaded from {file_path} in {elapsed:.3f}s")
+        return {"obj": obj, "signature": signature, "checked_at": time.monotonic(), "derived": {}}, elapsed
+
+    def _publish(self, file_path, entry, elapsed):
+        # Call with the lock held
+        self._entries[file_path] = entry
+        self.load_seconds[file_path] = elapsed
+
+    def _manifest(self, directory):
+        """
+        The manifest of directory (None if it has none), looked at again at
+        most once per check interval. A new version is loaded without the
+        lock; until it is complete every other thread keeps getting the
+        current manifest.
+        """
+        with self._lock:
+            state = self._manifests.setdefault(directory, {"manifest": None, "signature": None, "checked_at": None})
+            now = time.monotonic()
+            if state["checked_at"] is not None and now - state["checked_at"] < self.check_interval_seconds:
+                return state["manifest"]
+            state["checked_at"] = now
+            current_signature = state["signature"]
+
+        manifest_path = os.path.join(directory, ARTIFACT_MANIFEST_FILE)
+        signature = self._file_signature(manifest_path) if os.path.exists(manifest_path) else None
+        if signature == current_signature:
+            return state["manifest"]
+
+        # One switch per folder at a time; a thread that waited here finds it done
+        with self._load_lock(directory):
+            with self._lock:
+                if state["signature"] == signature:
+                    return state["manifest"]
+                # Remembered even if the switch fails, so a broken version is not retried every second
+                state["signature"] = signature
+                loaded_paths = set(self._entries)
+
+            new_manifest, loaded = None, {}
+            if signature is not None:
+                try:
+                    new_manifest = read_artifact_manifest(directory)
+                    for relative_path in new_manifest["files"].values():
+                        file_path = os.path.join(directory, relative_path)
+                        if file_path not in loaded_paths:
+                            loaded[file_path] = self._load(file_path, self._file_signature(file_path))
+                except Exception as e:
+                    logging.error(f"Could not load the artifact set published in {directory}, "
+                                  f"keeping the current one: {e}")
+                    return state["manifest"]
+
+            with self._lock:
+                old_manifest = state["manifest"]
+                for file_path, (entry, elapsed) in loaded.items():
+                    self.misses += 1
+                    self._publish(file_path, entry, elapsed)
+
+                # Drop what the new version replaces: every older version's files
+                # and any copies loaded from the usual paths before it was published
+                keep = {os.path.join(directory, path) for path in (new_manifest or {}).get("files", {}).values()}
+                versions_dir = os.path.join(directory, ARTIFACT_VERSIONS_DIR) + os.sep
+                names = set()
+                for manifest in (old_manifest, new_manifest):
+                    names.update((manifest or {}).get("files", {}))
+                flat_paths = {os.path.join(directory, name) for name in names}
+                for file_path in list(self._entries):
+                    if file_path not in keep and (file_path.startswith(versions_dir) or file_path in flat_paths):
+                        self._entries.pop(file_path, None)
+                        self.load_seconds.pop(file_path, None)
+                if old_manifest is not None:
+                    self.reloads += 1
+                state["manifest"] = new_manifest
+            logging.info(f"Serving artifact version {new_manifest['version'] if new_manifest else None} from {directory}")
+            return new_manifest
+
+    @staticmethod
+    def _resolve(file_path, manifest):
+        directory, name = os.path.split(file_path)
+        if manifest is not None and name in manifest["files"]:
+            return os.path.join(directory, manifest["files"][name])
+        return file_path
+
+    def _entry(self, file_path):
+        """
+        The entry for file_path (already resolved), loading or reloading it
+        as needed. Call WITHOUT the lock held: a (re)load only blocks the
+        threads waiting for this same file. During a reload the others keep
+        getting the entry already in memory.
+        """
+        with self._lock:
+            entry = self._entries.get(file_path)
+            now = time.monotonic()
+            if entry is not None:
+                if now - entry["checked_at"] < self.check_interval_seconds:
+                    self.hits += 1
+                    return entry
+                # This thread does the check; the rest keep using entry meanwhile
+                entry["checked_at"] = now
+
+        if entry is not None:
+            signature = self._file_signature(file_path)
+            if signature == entry["signature"]:
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+        with self._load_lock(file_path):
+            with self._lock:
+                current = self._entries.get(file_path)
+            if current is not None and current is not entry:
+                # Another thread (re)loaded it while we waited
+                with self._lock:
+                    self.hits += 1
+                return current
+
+            signature = self._file_signature(file_path)
+            if entry is not None:
+                logging.info(f"Artifact changed on disk, reloading {file_path}")
+            new_entry, elapsed = self._load(file_path, signature)
+            with self._lock:
+                self.misses += 1
+                if entry is not None:
+                    self.reloads += 1
+                self._publish(file_path, new_entry, elapsed)
+            return new_entry
+
+    def get(self, file_path):
+        """
+        Returns the object stored in file_path, loading it only on the first
+        call or when the file on disk has changed since it was loaded.
+        """
+        try:
+            file_path = os.path.abspath(file_path)
+            manifest = self._manifest(os.path.dirname(file_path))
+            return self._entry(self._resolve(file_path, manifest))["obj"]
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def get_set(self, file_paths, optional=()):
+        """
+        file_paths: {name: path} of artifacts that only work together.
+        Returns ({name: object}, version), every object from the same
+        published version. Names in optional whose file does not exist come
+        back as None. version changes whenever any of the files does.
+        """
+        try:
+            file_paths = {name: os.path.abspath(path) for name, path in file_paths.items()}
+            # Every manifest is looked at once, before anything is resolved.
+            # Resolved paths name one version's files, so the objects all
+            # come from that version even if a newer one is published meanwhile.
+            manifests = {directory: self._manifest(directory)
+                         for directory in {os.path.dirname(path) for path in file_paths.values()}}
+            objects, version = {}, []
+            for name, file_path in file_paths.items():
+                file_path = self._resolve(file_path, manifests[os.path.dirname(file_path)])
+                if name in optional and not os.path.exists(file_path):
+                    objects[name] = None
+                    version.append(None)
+                    continue
+                entry = self._entry(file_path)
+                objects[name] = entry["obj"]
+                version.append((file_path, entry["signature"]))
+            return objects, tuple(version)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def derived(self, obj, name, builder):
+        """
+        Returns builder(obj) for an artifact obj returned by get() or
+        get_set(), building it once and keeping it until that artifact is
+        reloaded from disk.
+        """
+        with self._lock:
+            entry = next((entry for entry in self._entries.values() if entry["obj"] is obj), None)
+            if entry is not None and name in entry["derived"]:
+                return entry["derived"][name]
+        # Built without the lock; if two threads race, the first result is kept
+        value = builder(obj)
+        if entry is None:
+            return value
+        with self._lock:
+            return entry["derived"].setdefault(name, value)
+
+    def get_derived(self, file_path, name, builder):
+        """
+        Returns builder(artifact) for the artifact in file_path, building it
+        once and keeping it until that artifact is reloaded from disk.
+        """
+        return self.derived(self.get(file_path), name, builder)
+
+    def signature(self, file_path):
+        """
+        The (mtime, size[, sha256]) of the copy of file_path currently in
+        memory, or None if it has not been loaded. Changes on every reload,
+        so callers can use it as a version tag for things built from it.
+        """
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            state = self._manifests.get(os.path.dirname(file_path))
+            entry = self._entries.get(self._resolve(file_path, state["manifest"] if state else None))
+            return None if entry is None else entry["signature"]
+
+    def clear(self):
+        """
+        Drops every cached artifact so the next get() reads from disk again.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._manifests.clear()
+
+    def stats(self):
+        """
+        Returns the hit/miss counters, the last load time (seconds) of each
+        artifact and the artifact version served from each folder.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "cached_artifacts": len(self._entries),
+                "load_seconds": dict(self.load_seconds),
+                "versions": {directory: state["manifest"]["version"]
+                             for directory, state in self._manifests.items() if state["manifest"]},
+            }
+
+
+# One registry for the whole process. Every PredictPipeline shares it.
+artifact_registry = ArtifactRegistry()
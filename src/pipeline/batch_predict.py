@@ -0,0 +1,125 @@
+# src/pipeline/batch_predict.py
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import pandas as pd
+
+from src.logger import logging
+from src.exception import CustomException
+from src.pipeline.predict_pipeline import PredictPipeline, FEATURE_COLUMNS
+
+
+def _is_parquet(file_path):
+    return str(file_path).lower().endswith((".parquet", ".pq"))
+
+
+def iter_input_chunks(input_path, chunk_size, keep_columns):
+    """
+    Yields DataFrames of at most chunk_size rows, reading only the feature
+    columns plus keep_columns, so memory stays bounded on huge files.
+    """
+    wanted_columns = set(FEATURE_COLUMNS) | set(keep_columns)
+
+    if _is_parquet(input_path):
+        import pyarrow.parquet as pq  # only needed for Parquet input
+
+        parquet_file = pq.ParquetFile(input_path)
+        columns = [name for name in parquet_file.schema_arrow.names if name in wanted_columns]
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield record_batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size, usecols=lambda col: col in wanted_columns)
+
+
+class BatchResultWriter:
+    """
+    Appends scored chunks to a CSV or Parquet output file.
+    """
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._parquet_writer = None
+        self._wrote_header = False
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    def write(self, chunk_df):
+        if _is_parquet(self.output_path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk_df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            chunk_df.to_csv(
+                self.output_path,
+                mode="a" if self._wrote_header else "w",
+                header=not self._wrote_header,
+                index=False,
+            )
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def run_batch_prediction(input_path, output_path, chunk_size=50000, top_k=3, keep_columns=("track_id",)):
+    """
+    Streams input_path through PredictPipeline.predict_batch chunk by chunk
+    and writes one output row per input row. Returns the number of rows scored.
+    """
+    try:
+        logging.info(f"--- Starting batch prediction: {input_path} -> {output_path} ---")
+        pipeline = PredictPipeline()
+        writer = BatchResultWriter(output_path)
+        total_rows = 0
+        start = time.perf_counter()
+
+        try:
+            for chunk in iter_input_chunks(input_path, chunk_size, keep_columns):
+                predictions = pipeline.predict_batch(chunk, top_k=top_k)
+                passthrough = chunk[[col for col in keep_columns if col in chunk.columns]]
+                writer.write(pd.concat([passthrough, predictions], axis=1))
+                total_rows += len(chunk)
+                logging.info(f"Scored {total_rows} rows so far.")
+        finally:
+            writer.close()
+
+        elapsed = time.perf_counter() - start
+        rows_per_second = total_rows / elapsed if elapsed > 0 else 0.0
+        logging.info(f"Batch prediction finished: {total_rows} rows in {elapsed:.2f}s ({rows_per_second:.0f} rows/s).")
+        return total_rows
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of songs with the genre model.")
+    parser.add_argument("input_path", help="CSV or Parquet file with the 12 audio feature columns.")
+    parser.add_argument("output_path", help="Where to write predictions (.csv or .parquet).")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows scored per chunk (default: 50000).")
+    parser.add_argument("--top-k", type=int, default=3, help="How many ranked genres to output per row (default: 3).")
+    parser.add_argument("--keep-columns", nargs="*", default=["track_id"],
+                        help="Input columns copied to the output when present (default: track_id).")
+    args = parser.parse_args()
+
+    rows = run_batch_prediction(
+        args.input_path, args.output_path,
+        chunk_size=args.chunk_size, top_k=args.top_k, keep_columns=args.keep_columns
+    )
+    print(f"Scored {rows} rows -> {args.output_path}")
@@ -0,0 +1,234 @@
+# src/pipeline/metrics.py
+
+import os
+import sys
+import time
+import bisect
+import threading
+from pathlib import Path
+from contextlib import nullcontext
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+# Latency buckets in seconds: 10us .. ~10s, doubling each time
+LATENCY_BUCKETS = [0.00001 * 2 ** power for power in range(21)]
+
+# The quantiles reported for every latency histogram
+REPORTED_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    A tiny fixed-bucket histogram (counts per upper bound, plus sum and count).
+    """
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimates the q-quantile (0..1) by linear interpolation inside the
+        bucket that holds it, like Prometheus' histogram_quantile().
+        """
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for position, bucket_count in enumerate(self.counts):
+                if seen + bucket_count >= rank and bucket_count > 0:
+                    if position == len(self.buckets):  # +Inf bucket
+                        return self.buckets[-1]
+                    lower = self.buckets[position - 1] if position > 0 else 0.0
+                    upper = self.buckets[position]
+                    return lower + (upper - lower) * (rank - seen) / bucket_count
+                seen += bucket_count
+            return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "sum": self.total,
+                "count": self.count,
+            }
+
+
+class PredictionMetrics:
+    """
+    Timing spans and counters for PredictPipeline.
+
+    - span(stage) times one stage (artifact_load, dataframe_build,
+      transform, predict_proba, inverse_transform, ...) into a latency
+      histogram per stage.
+    - count_prediction(genre) / count_error(error_type) count results.
+    - render_prometheus() returns everything in Prometheus text format.
+
+    With enabled=False (PREDICTION_METRICS=0) span() returns a shared
+    no-op context manager and the counters return at once.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stage_histograms = {}
+        self.request_histograms = {}
+        self.predictions_by_genre = {}
+        self.errors_by_type = {}
+        self._lock = threading.Lock()
+        self._noop_span = nullcontext()
+
+    def _histogram(self, histograms, name):
+        histogram = histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(name, Histogram(LATENCY_BUCKETS))
+        return histogram
+
+    def observe_stage(self, stage, seconds):
+        if self.enabled:
+            self._histogram(self.stage_histograms, stage).observe(seconds)
+
+    def observe_request(self, route, seconds):
+        if self.enabled:
+            self._histogram(self.request_histograms, route).observe(seconds)
+
+    def span(self, stage):
+        if not self.enabled:
+            return self._noop_span
+        return _Span(self, stage)
+
+    def count_prediction(self, genre, count=1):
+        if self.enabled:
+            with self._lock:
+                self.predictions_by_genre[genre] = self.predictions_by_genre.get(genre, 0) + count
+
+    def count_error(self, error_type):
+        if self.enabled:
+            with self._lock:
+                self.errors_by_type[error_type] = self.errors_by_type.get(error_type, 0) + 1
+
+    def stats(self):
+        """
+        The same numbers as a dict: p50/p95/p99 (ms) per stage and the counters.
+        """
+        def percentiles(histograms):
+            return {
+                name: {f"p{int(q * 100)}_ms": round(histogram.quantile(q) * 1000, 4) for q in REPORTED_QUANTILES}
+                | {"count": histogram.count}
+                for name, histogram in sorted(histograms.items())
+            }
+        with self._lock:
+            predictions, errors = dict(self.predictions_by_genre), dict(self.errors_by_type)
+        return {
+            "enabled": self.enabled,
+            "stages": percentiles(self.stage_histograms),
+            "requests": percentiles(self.request_histograms),
+            "predictions_by_genre": predictions,
+            "errors_by_type": errors,
+        }
+
+    def render_prometheus(self):
+        lines = []
+        render_latency(lines, "spotify_prediction_stage_seconds",
+                       "Time spent in each PredictPipeline stage.", "stage", self.stage_histograms)
+        render_latency(lines, "spotify_http_request_seconds",
+                       "Time spent serving each HTTP route.", "route", self.request_histograms)
+        with self._lock:
+            predictions, errors = dict(self.predictions_by_genre), dict(self.errors_by_type)
+        render_counter(lines, "spotify_predictions_total", "Predictions made, by predicted genre.",
+                       "genre", predictions)
+        render_counter(lines, "spotify_prediction_errors_total", "Prediction failures, by error type.",
+                       "error_type", errors)
+        return "\n".join(lines) + "\n"
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_histogram(lines, name, label, label_value, histogram):
+    """
+    Appends one histogram (cumulative _bucket lines, _sum, _count) to lines.
+    """
+    snapshot = histogram.snapshot()
+    prefix = f'{label}="{_label_value(label_value)}",' if label else ""
+    cumulative = 0
+    for bound, bucket_count in snapshot["buckets"].items():
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    labels = f'{{{prefix.rstrip(",")}}}' if prefix else ""
+    lines.append(f"{name}_sum{labels} {snapshot['sum']}")
+    lines.append(f"{name}_count{labels} {snapshot['count']}")
+
+
+def render_latency(lines, name, help_text, label, histograms):
+    """
+    A latency histogram per label value, followed by a summary with the
+    estimated p50/p95/p99 of each, so dashboards can read them directly.
+    """
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for label_value, histogram in sorted(histograms.items()):
+        render_histogram(lines, name, label, label_value, histogram)
+
+    quantile_name = f"{name}_quantile"
+    lines.append(f"# HELP {quantile_name} Estimated quantiles of {name}.")
+    lines.append(f"# TYPE {quantile_name} gauge")
+    for label_value, histogram in sorted(histograms.items()):
+        for q in REPORTED_QUANTILES:
+            lines.append(f'{quantile_name}{{{label}="{_label_value(label_value)}",quantile="{q}"}} '
+                         f"{histogram.quantile(q)}")
+
+
+def render_counter(lines, name, help_text, label, values):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for label_value, value in sorted(values.items()):
+        lines.append(f'{name}{{{label}="{_label_value(label_value)}"}} {value}')
+
+
+def render_gauges(lines, name, help_text, values):
+    """
+    Plain numbers such as cache or queue stats: one gauge per key.
+    """
+    for key, value in values.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"# HELP {name}_{key} {help_text} ({key}).")
+            lines.append(f"# TYPE {name}_{key} gauge")
+            lines.append(f"{name}_{key} {value}")
+
+
+# One metrics object for the whole process. PREDICTION_METRICS=0 turns it off.
+prediction_metrics = PredictionMetrics(enabled=os.environ.get("PREDICTION_METRICS", "1") != "0")
@@ -3,17 +3,112 @@
 import os
 import sys
 from pathlib import Path
-import pandas as pd
-import pickle
+import numpy as np
 
 # --- THIS IS THE FIX ---
-current_dir = Path(__file__).resolve().parent
-root_dir = current_dir.parent.parent
-sys.path.append(str(root_dir))
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
 # --- END OF FIX ---
 
-from src.logger import logging
+from src.logger import logging, predict_logger
 from src.exception import CustomException
+from src.pipeline.artifact_registry import artifact_registry
+from src.pipeline.prediction_cache import quantize_record
+from src.pipeline.metrics import prediction_metrics
+from src.components.fast_preprocessor import FastPreprocessor
+from src.components.similarity_index import SimilarityIndex
+
+# The 12 raw input columns the preprocessor was fitted on.
+NUMERIC_FEATURES = [
+    'danceability', 'energy', 'loudness', 'speechiness',
+    'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo'
+]
+CATEGORICAL_FEATURES = ['key', 'mode', 'time_signature']
+FEATURE_COLUMNS = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+def validate_feature_records(records):
+    """
+    Validates a list of feature dicts (the 12 CustomData fields) in one go.
+
+    Returns (features_df, errors). features_df holds only the valid rows,
+    with their original positions as the index. errors is a list of
+    {"index": i, "error": "..."} for every rejected record.
+    """
+    import pandas as pd  # imported on first use, to keep startup fast
+
+    if not isinstance(records, list):
+        raise ValueError("Expected a JSON array of feature records.")
+
+    errors = []
+    dict_positions = []
+    for position, record in enumerate(records):
+        if isinstance(record, dict):
+            dict_positions.append(position)
+        else:
+            errors.append({"index": position, "error": "Record must be a JSON object."})
+
+    df = pd.DataFrame([records[position] for position in dict_positions], index=dict_positions)
+    df = df.reindex(columns=FEATURE_COLUMNS)
+    is_valid = pd.Series(True, index=df.index)
+
+    for column in FEATURE_COLUMNS:
+        # JSON true/false would otherwise be coerced to 1/0
+        is_bool = df[column].map(lambda value: isinstance(value, (bool, np.bool_))).astype(bool)
+        values = pd.to_numeric(df[column].mask(is_bool), errors="coerce")
+        is_missing = values.isna() & ~is_bool
+        # "inf", "-inf", 1e999 ...
+        not_finite = ~is_missing & ~is_bool & ~np.isfinite(values)
+        bad_rows = is_bool | is_missing | not_finite
+        if column in CATEGORICAL_FEATURES:
+            bad_rows |= ~bad_rows & (values % 1 != 0)
+        for position in df.index[bad_rows & is_valid]:
+            if is_bool[position]:
+                message = f"'{column}' must be a number, not true/false."
+            elif not_finite[position]:
+                message = f"'{column}' must be a finite number."
+            else:
+                message = f"'{column}' is missing or not a valid number."
+            errors.append({"index": int(position), "error": message})
+        is_valid &= ~bad_rows
+        df[column] = values
+
+    df = df[is_valid]
+    df[CATEGORICAL_FEATURES] = df[CATEGORICAL_FEATURES].astype(int)
+    errors.sort(key=lambda item: item["index"])
+    return df, errors
+
+def parse_top_k(value, default=3):
+    """
+    The top_k query argument of /v1/predict, the same for every server:
+    missing or not an integer gives default, and values below 1 become 1.
+    """
+    try:
+        top_k = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, top_k)
+
+def predictions_to_records(predictions, top_k):
+    """
+    The /v1/predict response body for a predict_batch result: one dict per
+    row with genre, confidence and the top_k (genre, confidence) pairs.
+    """
+    results = []
+    for row in predictions.itertuples(index=False):
+        row = row._asdict()
+        results.append({
+            "genre": row["predicted_genre"],
+            "confidence": float(row["confidence"]),
+            "top_k": [
+                {"genre": row[f"top_{rank}_genre"], "confidence": float(row[f"top_{rank}_confidence"])}
+                for rank in range(1, top_k + 1) if f"top_{rank}_genre" in row
+            ],
+        })
+    return results
 
 class CustomData:
     """
@@ -38,11 +133,19 @@ class CustomData:
         self.mode = mode
         self.time_signature = time_signature
 
+    def get_data_as_dict(self):
+        """
+        Returns the slider data as one plain dict (no DataFrame needed).
+        """
+        return {column: getattr(self, column) for column in FEATURE_COLUMNS}
+
     def get_data_as_dataframe(self):
         """
         Converts the slider data into a single-row DataFrame
         """
         try:
+            import pandas as pd
+
             custom_data_input_dict = {
                 "danceability": [self.danceability], "energy": [self.energy],
                 "loudness": [self.loudness], "speechiness": [self.speechiness],
@@ -51,8 +154,9 @@ class CustomData:
                 "tempo": [self.tempo], "key": [self.key],
                 "mode": [self.mode], "time_signature": [self.time_signature],
             }
-            df = pd.DataFrame(custom_data_input_dict)
-            logging.info("CustomData (from sliders) converted to DataFrame.")
+            with prediction_metrics.span("dataframe_build"):
+                df = pd.DataFrame(custom_data_input_dict)
+            predict_logger.debug("CustomData (from sliders) converted to DataFrame.")
             return df
         
         except Exception as e:
@@ -61,38 +165,255 @@ class CustomData:
 class PredictPipeline:
     """
     This is the "brain" for the slider app.
-    It predicts for ONE song at a time.
+    predict() handles ONE song at a time, predict_batch() scores many rows at once.
+    Artifacts come from the shared artifact_registry, so they are unpickled
+    once per process and reloaded only when the files on disk change. Every
+    call takes its model, compiled model, preprocessor and label encoder
+    from one published version, never a mix of two.
+
+    When compiled_model.pkl exists (written by ModelTrainer), small batches
+    are scored with the NumPy-only CompiledForest, which is much faster than
+    sklearn for a handful of rows. Bigger batches still use the sklearn model.
+
+    Raw features go through a FastPreprocessor built from preprocessor.pkl
+    instead of the ColumnTransformer, so no per-request sklearn dispatch.
+
+    Pass a PredictionCache to remember single-song answers: repeated slider
+    positions are then answered from memory until the model files change.
+
+    Every stage is timed into prediction_metrics (see src/pipeline/metrics.py),
+    which also counts predictions by genre and failures by error type.
     """
-    def __init__(self):
+    # Batches up to this many rows use the compiled forest. Measured with
+    # benchmarks/compiled_forest_benchmark.py (100 trees, 1 CPU), sklearn vs
+    # compiled predict_proba: 1 row 6.6 vs 0.34 ms (19.6x), 32 rows 9.0 vs
+    # 2.7 ms (3.4x), 128 rows 18.1 vs 10.1 ms (1.8x), 1024 rows 31.6 vs
+    # 67.6 ms (0.5x). The crossover lies between 128 and 1024 rows; re-run
+    # the benchmark before moving this limit.
+    compiled_model_max_rows = 128
+
+    def __init__(self, prediction_cache=None):
         logging.info("PredictPipeline initialized.")
         self.model_path = os.path.join("artifacts", "spotify_genre_model.pkl")
         self.preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
         self.label_encoder_path = os.path.join("artifacts", "label_encoder.pkl")
+        self.compiled_model_path = os.path.join("artifacts", "compiled_model.pkl")
+        self.similarity_index_path = os.path.join("artifacts", "similarity_index.pkl")
+        self.prediction_cache = prediction_cache
+
+    def current_artifacts(self):
+        """
+        The model, compiled model (None if there is none), preprocessor,
+        label encoder and FastPreprocessor, all from ONE published version
+        (see ArtifactRegistry.get_set), plus "version", which changes
+        whenever any of them is reloaded.
+        """
+        artifacts, version = artifact_registry.get_set({
+            "model": self.model_path,
+            "preprocessor": self.preprocessor_path,
+            "label_encoder": self.label_encoder_path,
+            "compiled_model": self.compiled_model_path,
+        }, optional=("compiled_model",))
+        artifacts["fast_preprocessor"] = artifact_registry.derived(
+            artifacts["preprocessor"], "fast_preprocessor", FastPreprocessor.from_column_transformer
+        )
+        artifacts["version"] = version
+        return artifacts
+
+    def load_artifacts(self):
+        """
+        Returns (model, preprocessor, label_encoder) from the shared registry.
+        Also warms up the compiled model when it exists.
+        """
+        artifacts = self.current_artifacts()
+        return artifacts["model"], artifacts["preprocessor"], artifacts["label_encoder"]
+
+    def model_version(self):
+        """
+        Signatures of the artifacts currently in memory. Changes whenever
+        any of them is reloaded, which invalidates the prediction cache.
+        """
+        return self.current_artifacts()["version"]
+
+    def get_fast_preprocessor(self):
+        """
+        The FastPreprocessor for the current preprocessor.pkl (rebuilt when it changes).
+        """
+        return self.current_artifacts()["fast_preprocessor"]
+
+    def predict_proba(self, model, processed_data, compiled_model=None):
+        """
+        Class probabilities for already-preprocessed rows, using the compiled
+        forest (from the same artifact version as model) for small batches
+        when there is one.
+        """
+        if compiled_model is not None and processed_data.shape[0] <= self.compiled_model_max_rows:
+            return compiled_model.predict_proba(processed_data)
+        return model.predict_proba(processed_data)
+
+    @staticmethod
+    def _count_error(error):
+        # Counted once, under the type of the original failure: a
+        # CustomException from the registry or load_object carries it in
+        # error_type. One that went through here already (predict() ->
+        # predict_record()) is skipped.
+        if getattr(error, "counted", False):
+            return
+        prediction_metrics.count_error(getattr(error, "error_type", type(error).__name__))
+        error.counted = True
 
     def predict(self, features_df):
         """
         Takes one row of data and returns ONE genre and ONE confidence.
         """
         try:
-            logging.info("Starting single prediction...")
+            if self.prediction_cache is not None and len(features_df) == 1:
+                return self.predict_record(features_df[FEATURE_COLUMNS].iloc[0].to_dict())
+
+            predict_logger.debug("Starting single prediction...")
             
-            model = pickle.load(open(self.model_path, "rb"))
-            preprocessor = pickle.load(open(self.preprocessor_path, "rb"))
-            label_encoder = pickle.load(open(self.label_encoder_path, "rb"))
-            logging.info("All artifacts loaded.")
+            with prediction_metrics.span("artifact_load"):
+                artifacts = self.current_artifacts()
+            model, label_encoder = artifacts["model"], artifacts["label_encoder"]
+            predict_logger.debug("All artifacts loaded.")
 
-            processed_data = preprocessor.transform(features_df)
-            logging.info("Data transformed.")
+            with prediction_metrics.span("transform"):
+                processed_data = artifacts["fast_preprocessor"].transform_frame(features_df)
+            predict_logger.debug("Data transformed.")
 
-            probabilities = model.predict_proba(processed_data)
+            with prediction_metrics.span("predict_proba"):
+                probabilities = self.predict_proba(model, processed_data, artifacts["compiled_model"])
 
             confidence = probabilities.max() * 100 # This is a single number
             prediction_encoded = [probabilities.argmax()]
-            predicted_genre = label_encoder.inverse_transform(prediction_encoded)
-            logging.info(f"Decoded prediction: {predicted_genre[0]} with {confidence:.2f}% confidence.")
+            with prediction_metrics.span("inverse_transform"):
+                predicted_genre = label_encoder.inverse_transform(prediction_encoded)
+            prediction_metrics.count_prediction(predicted_genre[0])
+            predict_logger.info("Decoded prediction: %s with %.2f%% confidence.", predicted_genre[0], confidence)
 
             # Return single values, NOT lists. This fixes the error.
             return predicted_genre[0], confidence 
 
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            self._count_error(e)
+            raise CustomException(e, sys)
+
+    def predict_batch(self, features_df, top_k: int = 3):
+        """
+        Scores every row of features_df in ONE transform + predict_proba call.
+
+        Returns a DataFrame (same index as features_df) with:
+        - predicted_genre, confidence (in %)
+        - top_1_genre, top_1_confidence, ... up to top_k
+        """
+        try:
+            import pandas as pd
+
+            missing_columns = [col for col in FEATURE_COLUMNS if col not in features_df.columns]
+            if missing_columns:
+                raise ValueError(f"Input is missing required columns: {missing_columns}")
+
+            with prediction_metrics.span("artifact_load"):
+                artifacts = self.current_artifacts()
+            model, label_encoder = artifacts["model"], artifacts["label_encoder"]
+
+            with prediction_metrics.span("transform"):
+                processed_data = artifacts["fast_preprocessor"].transform_frame(features_df)
+            with prediction_metrics.span("predict_proba"):
+                probabilities = self.predict_proba(model, processed_data, artifacts["compiled_model"])
+
+            # model.classes_ holds the encoded label for each probability column
+            with prediction_metrics.span("inverse_transform"):
+                genres = label_encoder.inverse_transform(model.classes_)
+            top_k = max(1, min(top_k, probabilities.shape[1]))
+
+            # Column indices of the k highest probabilities per row, best first
+            top_indices = np.argsort(-probabilities, axis=1, kind="stable")[:, :top_k]
+            top_probabilities = np.take_along_axis(probabilities, top_indices, axis=1) * 100
+
+            result = {
+                "predicted_genre": genres[top_indices[:, 0]],
+                "confidence": top_probabilities[:, 0],
+            }
+            for rank in range(top_k):
+                result[f"top_{rank + 1}_genre"] = genres[top_indices[:, rank]]
+                result[f"top_{rank + 1}_confidence"] = top_probabilities[:, rank]
+
+            if prediction_metrics.enabled:
+                for genre, count in zip(*np.unique(result["predicted_genre"], return_counts=True)):
+                    prediction_metrics.count_prediction(genre, int(count))
+            predict_logger.info("Batch prediction complete for %d rows.", len(features_df))
+            return pd.DataFrame(result, index=features_df.index)
+
+        except Exception as e:
+            self._count_error(e)
+            raise CustomException(e, sys)
+
+    def predict_record(self, record, scorer=None):
+        """
+        Fast path for ONE song given as a dict of the 12 CustomData fields
+        (see CustomData.get_data_as_dict). No DataFrame is built.
+        Returns (genre, confidence) like predict().
+        On a cache miss, scorer(record) (e.g. the request coalescer) is used
+        instead of scoring here, and its answer is cached like any other.
+        """
+        try:
+            with prediction_metrics.span("artifact_load"):
+                artifacts = self.current_artifacts()
+            model, label_encoder = artifacts["model"], artifacts["label_encoder"]
+            if self.prediction_cache is not None:
+                with prediction_metrics.span("cache_lookup"):
+                    cache_key = quantize_record(record)
+                    version = artifacts["version"]
+                    cached = self.prediction_cache.get(cache_key, version)
+                if cached is not None:
+                    prediction_metrics.count_prediction(cached[0])
+                    return cached
+
+            if scorer is not None:
+                predicted_genre, confidence = scorer(record)
+                if self.prediction_cache is not None:
+                    self.prediction_cache.put(cache_key, version, (predicted_genre, confidence))
+                return predicted_genre, confidence
+
+            with prediction_metrics.span("transform"):
+                processed_row = artifacts["fast_preprocessor"].transform_record(record)
+            with prediction_metrics.span("predict_proba"):
+                probabilities = self.predict_proba(model, processed_row, artifacts["compiled_model"])[0]
+
+            best = probabilities.argmax()
+            with prediction_metrics.span("inverse_transform"):
+                predicted_genre = label_encoder.inverse_transform(model.classes_[best:best + 1])[0]
+            confidence = probabilities[best] * 100
+            prediction_metrics.count_prediction(predicted_genre)
+            predict_logger.info("Decoded prediction: %s with %.2f%% confidence.", predicted_genre, confidence)
+            if self.prediction_cache is not None:
+                self.prediction_cache.put(cache_key, version, (predicted_genre, confidence))
+            return predicted_genre, confidence
+
+        except Exception as e:
+            self._count_error(e)
+            raise CustomException(e, sys)
+
+    def similar_tracks(self, record, k: int = 10):
+        """
+        The k training-corpus tracks that sound most like one song (a dict of
+        the 12 CustomData fields), nearest first. Each is a dict with
+        track_id, track_name, artists and distance.
+        Needs artifacts/similarity_index.pkl (see SimilarityIndexBuilder).
+        """
+        try:
+            with prediction_metrics.span("artifact_load"):
+                index = artifact_registry.get(self.similarity_index_path)
+            with prediction_metrics.span("transform"):
+                processed_row = artifact_registry.get_derived(
+                    self.similarity_index_path, "fast_preprocessor", SimilarityIndex.build_preprocessor
+                ).transform_record(record)
+            with prediction_metrics.span("similarity_search"):
+                tracks = index.similar_tracks(processed_row, k)
+            predict_logger.debug("Found %d similar tracks.", len(tracks))
+            return tracks
+
+        except Exception as e:
+            self._count_error(e)
+            raise CustomException(e, sys)
@@ -0,0 +1,118 @@
+# src/pipeline/prediction_cache.py
+
+import sys
+import time
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+from src.logger import logging
+
+# Step size of each input, matching the sliders and selectboxes in app.py.
+# Two inputs that round to the same steps share one cache entry.
+FEATURE_STEPS = {
+    "danceability": 0.01, "energy": 0.01, "loudness": 0.1,
+    "speechiness": 0.01, "acousticness": 0.01, "instrumentalness": 0.01,
+    "liveness": 0.01, "valence": 0.01, "tempo": 0.1,
+    "key": 1, "mode": 1, "time_signature": 1,
+}
+
+
+def quantize_record(record):
+    """
+    Turns one feature dict (the 12 CustomData fields) into a hashable key:
+    every value expressed as a whole number of its FEATURE_STEPS step.
+    """
+    return tuple(int(round(float(record[column]) / step)) for column, step in FEATURE_STEPS.items())
+
+
+class PredictionCache:
+    """
+    A bounded LRU cache of single-song predictions, keyed on the quantized
+    feature values (see quantize_record).
+
+    Every lookup passes the current model version (the artifact signatures
+    from the artifact_registry). When the version changes, the whole cache
+    is dropped, so a retrained model never serves old answers.
+    Entries older than ttl_seconds (if set) are treated as misses.
+    """
+    def __init__(self, max_entries: int = 4096, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logging.info(f"Model changed, dropping {len(self._entries)} cached predictions.")
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """
+        Returns the cached value for key, or None on a miss.
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# One cache for the whole process, shared by every PredictPipeline that opts in.
+prediction_cache = PredictionCache()
@@ -0,0 +1,134 @@
+# src/pipeline/request_coalescer.py
+
+import sys
+import time
+import queue
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+from src.logger import logging
+from src.exception import CustomException
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS
+from src.pipeline.metrics import Histogram
+
+
+class PredictionCoalescer:
+    """
+    Sits in front of PredictPipeline and merges concurrent requests into one
+    predict_batch call.
+
+    A background thread waits for the first request, then keeps collecting
+    more for up to max_wait_ms or until max_batch_size rows are queued. The
+    whole batch is scored as one matrix and every caller gets back only its
+    own rows.
+    """
+    def __init__(self, pipeline, max_wait_ms: float = 5.0, max_batch_size: int = 64):
+        self.pipeline = pipeline
+        self.max_wait_seconds = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self.queue_depth_histogram = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.batch_size_histogram = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self._worker = threading.Thread(target=self._run, name="prediction-coalescer", daemon=True)
+        self._worker.start()
+        logging.info(f"PredictionCoalescer started (max_wait_ms={max_wait_ms}, max_batch_size={max_batch_size}).")
+
+    def submit(self, features, timeout: float = 10.0):
+        """
+        Queues features (a DataFrame, or a list of feature dicts) and blocks
+        until they have been scored. Returns the predict_batch result for
+        just these rows, indexed 0..n-1.
+        """
+        try:
+            import pandas as pd  # imported on first use, to keep startup fast
+
+            if isinstance(features, pd.DataFrame):
+                num_rows = len(features)
+            else:
+                features = list(features)
+                num_rows = len(features)
+            if num_rows == 0:
+                return pd.DataFrame()
+
+            future = Future()
+            self.queue_depth_histogram.observe(self._queue.qsize())
+            self._queue.put((features, num_rows, future))
+            return future.result(timeout=timeout)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _collect_batch(self):
+        first_item = self._queue.get()
+        batch = [first_item]
+        batch_rows = first_item[1]
+        deadline = time.monotonic() + self.max_wait_seconds
+
+        while batch_rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            batch_rows += item[1]
+        return batch, batch_rows
+
+    @staticmethod
+    def _build_frame(batch):
+        # Plain dict records go into ONE DataFrame for the whole batch,
+        # instead of one DataFrame per request.
+        import pandas as pd
+
+        frames = []
+        pending_records = []
+        for features, _, _ in batch:
+            if isinstance(features, pd.DataFrame):
+                if pending_records:
+                    frames.append(pd.DataFrame(pending_records, columns=FEATURE_COLUMNS))
+                    pending_records = []
+                frames.append(features[FEATURE_COLUMNS])
+            else:
+                pending_records.extend(features)
+        if pending_records:
+            frames.append(pd.DataFrame(pending_records, columns=FEATURE_COLUMNS))
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    def _run(self):
+        while True:
+            batch, batch_rows = self._collect_batch()
+            self.batch_size_histogram.observe(batch_rows)
+            try:
+                features_df = self._build_frame(batch).reset_index(drop=True)
+                predictions = self.pipeline.predict_batch(features_df)
+                offset = 0
+                for _, num_rows, future in batch:
+                    future.set_result(predictions.iloc[offset:offset + num_rows].reset_index(drop=True))
+                    offset += num_rows
+            except Exception as e:
+                logging.error(f"Coalesced batch of {batch_rows} rows failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self):
+        """
+        Returns the current queue depth and both histograms.
+        """
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_depth_histogram": self.queue_depth_histogram.snapshot(),
+            "batch_size_histogram": self.batch_size_histogram.snapshot(),
+        }
@@ -0,0 +1,127 @@
+# src/pipeline/scoring_pool.py
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+from src.logger import logging
+from src.pipeline.metrics import Histogram, LATENCY_BUCKETS
+
+
+class PoolFullError(Exception):
+    """
+    Raised by ScoringPool.run when it already holds its maximum number of
+    jobs. Servers answer it with 429 Too Many Requests.
+    """
+
+
+def _run_before_deadline(deadline, function, args):
+    # A job that waited in the queue past its deadline is not worth running:
+    # its caller has already been told it timed out
+    if time.time() > deadline:
+        raise TimeoutError("Deadline passed while the job was queued.")
+    return function(*args)
+
+
+class ScoringPool:
+    """
+    Runs CPU-bound scoring off the asyncio event loop, with bounded
+    admission and per-job deadlines.
+
+    - kind="thread": a ThreadPoolExecutor. Jobs share this process's
+      PredictPipeline; NumPy releases the GIL for the heavy parts.
+    - kind="process": a ProcessPoolExecutor created with fork AFTER the model
+      is loaded, so the workers share its pages copy-on-write (like
+      serve_flask.py) and pure-Python work runs truly in parallel.
+
+    At most workers + queue_size jobs are admitted at a time; run() raises
+    PoolFullError beyond that instead of letting the queue grow. A job that
+    misses its deadline raises TimeoutError in the caller and is cancelled if
+    it has not started yet.
+    """
+    def __init__(self, kind: str = "thread", workers: int = None, queue_size: int = 64):
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.max_pending = self.workers + queue_size
+        if kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scoring")
+        elif kind == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            raise ValueError(f"Unknown pool kind: {kind}")
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failed = 0
+        self.pending_histogram = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.job_seconds = Histogram(LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+        logging.info(f"ScoringPool started ({kind}, {self.workers} workers, queue_size={queue_size}).")
+
+    def _finished(self, future, start):
+        # Runs when the job ends, is cancelled or fails: only then is its slot free
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self.completed += 1
+                self.job_seconds.observe(time.perf_counter() - start)
+            elif not isinstance(future.exception(), TimeoutError):
+                self.failed += 1
+
+    async def run(self, function, *args, deadline_seconds: float):
+        """
+        Awaits function(*args) in the pool. function must be a module-level
+        function for the process pool.
+        """
+        with self._lock:
+            self.pending_histogram.observe(self.pending)
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolFullError(f"{self.pending} scoring jobs already pending.")
+            self.pending += 1
+
+        start = time.perf_counter()
+        future = self.executor.submit(_run_before_deadline, time.time() + deadline_seconds, function, args)
+        future.add_done_callback(lambda done: self._finished(done, start))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline_seconds)
+        except (asyncio.TimeoutError, TimeoutError):
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"Scoring did not finish within {deadline_seconds * 1000:.0f} ms.")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "failed": self.failed,
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,138 @@
+# src/pipeline/stage_cache.py
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import dataclasses
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+from src.logger import logging
+from src.exception import CustomException
+
+MANIFEST_FILE = "manifest.json"
+
+
+def hash_path(path):
+    """
+    SHA-256 of a file, or of every file inside a folder (names included).
+    A missing path hashes to a fixed marker so it still gives a stable key.
+    """
+    sha = hashlib.sha256()
+    if not os.path.exists(path):
+        sha.update(b"<missing>")
+        return sha.hexdigest()
+
+    files = [path] if os.path.isfile(path) else sorted(
+        os.path.join(folder, name) for folder, _, names in os.walk(path) for name in names
+    )
+    for file_path in files:
+        sha.update(os.path.relpath(file_path, path).encode())
+        with open(file_path, "rb") as file_obj:
+            for block in iter(lambda: file_obj.read(1024 * 1024), b""):
+                sha.update(block)
+    return sha.hexdigest()
+
+
+def fingerprint(config=None, files=(), code_files=(), upstream=()):
+    """
+    Cache key for one stage: its config dataclass values, the contents of its
+    input files, the source code that produces it and the keys of the stages
+    it depends on. Any change in any of them gives a different key.
+    """
+    payload = {
+        "config": dataclasses.asdict(config) if config is not None else None,
+        "files": {str(path): hash_path(path) for path in files},
+        "code": {os.path.basename(str(path)): hash_path(path) for path in code_files},
+        "upstream": list(upstream),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class StageCache:
+    """
+    Stores the output files of a pipeline stage under
+    artifacts/cache/<stage>/<key>/ and copies them back on a cache hit.
+    """
+    def __init__(self, root=os.path.join("artifacts", "cache")):
+        self.root = root
+
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.root, stage, key)
+
+    def has(self, stage, key):
+        return os.path.isfile(os.path.join(self._entry_dir(stage, key), MANIFEST_FILE))
+
+    def entry_path(self, stage, key, name):
+        """
+        Path of an extra file kept only in the cache entry (e.g. processed arrays).
+        """
+        entry_dir = self._entry_dir(stage, key)
+        os.makedirs(entry_dir, exist_ok=True)
+        return os.path.join(entry_dir, name)
+
+    def store(self, stage, key, outputs):
+        """
+        outputs: {name: path} of the files/folders the stage just wrote.
+        Outputs the stage did not produce are recorded as absent.
+        """
+        try:
+            entry_dir = self._entry_dir(stage, key)
+            os.makedirs(entry_dir, exist_ok=True)
+            absent = {name: path for name, path in outputs.items() if not os.path.exists(path)}
+            outputs = {name: path for name, path in outputs.items() if name not in absent}
+            for name, path in outputs.items():
+                target = os.path.join(entry_dir, name)
+                shutil.rmtree(target, ignore_errors=True)
+                if os.path.isdir(path):
+                    shutil.copytree(path, target)
+                else:
+                    shutil.copy2(path, target)
+            with open(os.path.join(entry_dir, MANIFEST_FILE), "w") as file_obj:
+                json.dump({"stage": stage, "key": key, "outputs": outputs, "absent": absent}, file_obj, indent=2)
+            logging.info(f"Stage '{stage}' outputs cached under {entry_dir}")
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def restore(self, stage, key):
+        """
+        Copies the cached outputs back to where the stage normally writes them,
+        and removes outputs the stage did not produce. Returns the outputs map.
+        """
+        try:
+            entry_dir = self._entry_dir(stage, key)
+            with open(os.path.join(entry_dir, MANIFEST_FILE)) as file_obj:
+                manifest = json.load(file_obj)
+            outputs = manifest["outputs"]
+            for path in manifest.get("absent", {}).values():
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                elif os.path.exists(path):
+                    os.remove(path)
+            for name, path in outputs.items():
+                source = os.path.join(entry_dir, name)
+                if os.path.dirname(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.isdir(source):
+                    shutil.rmtree(path, ignore_errors=True)
+                    shutil.copytree(source, path)
+                else:
+                    # Copy then swap, so a running PredictPipeline never sees half a file
+                    shutil.copy2(source, f"{path}.tmp")
+                    os.replace(f"{path}.tmp", path)
+            logging.info(f"Stage '{stage}' restored from cache {entry_dir}")
+            return outputs
+
+        except Exception as e:
+            raise CustomException(e, sys)
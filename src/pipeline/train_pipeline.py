@@ -2,56 +2,279 @@
 
 import os
 import sys
+import json
+import time
+import argparse
 from pathlib import Path
 
 # --- THIS IS THE FIX ---
-current_dir = Path(__file__).resolve().parent
-root_dir = current_dir.parent.parent
-sys.path.append(str(root_dir))
+# Only needed when this file is run directly (python src/.../file.py).
+# Imported as part of the src package, the project root is already on the path.
+if not __package__:
+    current_dir = Path(__file__).resolve().parent
+    root_dir = current_dir.parent.parent
+    sys.path.append(str(root_dir))
 # --- END OF FIX ---
 
+import numpy as np
+
 from src.logger import logging
 from src.exception import CustomException
+from src import utils
+from src.utils import publish_artifact_files
+from src.components import (
+    data_ingestion, data_transformation, model_trainer, forest_compiler, model_selection, model_budget,
+)
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
-from src.components.model_trainer import ModelTrainer
+from src.components.model_trainer import ModelTrainer, ModelTrainerConfig
+from src.components.model_budget import ModelBudget
+from src.components.incremental_trainer import (
+    IncrementalTrainer, IncrementalTrainerConfig, complete_lines_end, write_watermark,
+)
+from src.components.cross_validation import CrossValidator, CrossValidationConfig
+from src.components.similarity_index import SimilarityIndexBuilder
+from src.components.out_of_core_trainer import OutOfCoreTrainer, OutOfCoreTrainerConfig
+from src.pipeline.stage_cache import StageCache, fingerprint
 
 class TrainPipeline:
     """
     This class manages the entire training process.
     It calls each component in the correct order.
+
+    Every stage is fingerprinted (input data hash, config values, source
+    code, upstream stage keys). If the same fingerprint ran before, its
+    outputs are copied back from artifacts/cache instead of recomputed.
+
+    A successful full run publishes the model, compiled model, preprocessor
+    and label encoder as one artifact version for serving, and moves the
+    training watermark to the end of the raw CSV, so run_incremental()
+    later only reads rows appended after it.
     """
-    def __init__(self):
+    def __init__(self, ingestion_config=None, model_trainer_config=None, selection_config=None,
+                 incremental_config=None, out_of_core_config=None, cv_config=None):
+        self.ingestion_config = ingestion_config
+        self.model_trainer_config = model_trainer_config
+        self.selection_config = selection_config
+        self.incremental_config = incremental_config or IncrementalTrainerConfig()
+        self.out_of_core_config = out_of_core_config or OutOfCoreTrainerConfig()
+        self.cv_config = cv_config or CrossValidationConfig()
+        self.stage_cache = StageCache()
+        self.report = []
         logging.info("Training Pipeline initialized.")
 
-    def run_pipeline(self):
+    def _record(self, stage, key, cache_status, start):
+        seconds = time.perf_counter() - start
+        self.report.append({"stage": stage, "key": key, "cache": cache_status, "seconds": round(seconds, 3)})
+        logging.info(f"Stage '{stage}' ({cache_status}, key {key}) took {seconds:.2f}s")
+
+    def _use_cache(self, stage, key, force, use_cache):
+        return use_cache and not force and self.stage_cache.has(stage, key)
+
+    def run_pipeline(self, force=False, use_cache=True):
+        """
+        force=True recomputes every stage (and refreshes the cache).
+        use_cache=False neither reads nor writes the cache.
+        Returns the per-stage report: stage, key, cache hit/miss, seconds.
+        """
         logging.info("--- Starting Training Pipeline ---")
         try:
+            self.report = []
+
             # Step 1: Data Ingestion
             logging.info("Running Data Ingestion...")
-            ingestor = DataIngestion()
-            train_data_path, test_data_path = ingestor.initiate_data_ingestion()
+            start = time.perf_counter()
+            ingestor = DataIngestion(self.ingestion_config)
+            ingestion_config = ingestor.ingestion_config
+            # Everything up to here is what this run trains on. A run on cached
+            # stages may not have the raw CSV at all (hash_path keys it as
+            # "<missing>"), and then there is no watermark to move.
+            raw_data_end = None
+            if os.path.exists(ingestion_config.raw_data_path):
+                raw_data_end = complete_lines_end(ingestion_config.raw_data_path)
+            ingestion_key = fingerprint(
+                config=ingestion_config,
+                files=[ingestion_config.raw_data_path],
+                code_files=[data_ingestion.__file__, utils.__file__],
+            )
+            if self._use_cache("ingestion", ingestion_key, force, use_cache):
+                self.stage_cache.restore("ingestion", ingestion_key)
+                train_data_path, test_data_path = ingestor._handoff_paths()
+                self._record("ingestion", ingestion_key, "hit", start)
+            else:
+                train_data_path, test_data_path = ingestor.initiate_data_ingestion()
+                if use_cache:
+                    self.stage_cache.store("ingestion", ingestion_key, ingestor.output_paths())
+                self._record("ingestion", ingestion_key, "miss", start)
 
             # Step 2: Data Transformation
             logging.info("Running Data Transformation...")
+            start = time.perf_counter()
             transformer = DataTransformation()
-            X_train_resampled, y_train_resampled, X_test, y_test, le = \
-                transformer.initiate_data_transformation(train_data_path, test_data_path)
+            transformation_config = transformer.transformation_config
+            # utils.load_columnar reads the columnar handoff
+            transformation_key = fingerprint(
+                config=transformation_config,
+                code_files=[data_transformation.__file__, utils.__file__],
+                upstream=[ingestion_key],
+            )
+            transformation_outputs = {
+                "preprocessor.pkl": transformation_config.preprocessor_obj_file_path,
+                "label_encoder.pkl": transformation_config.label_encoder_obj_file_path,
+            }
+            if self._use_cache("transformation", transformation_key, force, use_cache):
+                self.stage_cache.restore("transformation", transformation_key)
+                processed = np.load(self.stage_cache.entry_path("transformation", transformation_key, "processed.npz"))
+                X_train, y_train, X_test, y_test = (processed[name] for name in ("X_train", "y_train", "X_test", "y_test"))
+                le = utils.load_object(transformation_config.label_encoder_obj_file_path)
+                self._record("transformation", transformation_key, "hit", start)
+            else:
+                X_train, y_train, X_test, y_test, le = \
+                    transformer.initiate_data_transformation(train_data_path, test_data_path)
+                if use_cache:
+                    np.savez(
+                        self.stage_cache.entry_path("transformation", transformation_key, "processed.npz"),
+                        X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                    )
+                    self.stage_cache.store("transformation", transformation_key, transformation_outputs)
+                self._record("transformation", transformation_key, "miss", start)
 
             # Step 3: Model Trainer
             logging.info("Running Model Trainer...")
-            trainer = ModelTrainer()
-            trainer.initiate_model_training(
-                X_train_resampled, y_train_resampled, X_test, y_test, le
+            start = time.perf_counter()
+            trainer = ModelTrainer(self.model_trainer_config, self.selection_config)
+            trainer_config = trainer.model_trainer_config
+            selection_key = fingerprint(config=trainer.selection_config) if trainer_config.model_selection else None
+            trainer_key = fingerprint(
+                config=trainer_config,
+                code_files=[model_trainer.__file__, forest_compiler.__file__, model_selection.__file__,
+                            model_budget.__file__],
+                upstream=[transformation_key, selection_key],
             )
+            if self._use_cache("model_trainer", trainer_key, force, use_cache):
+                self.stage_cache.restore("model_trainer", trainer_key)
+                self._record("model_trainer", trainer_key, "hit", start)
+            else:
+                trainer.initiate_model_training(X_train, y_train, X_test, y_test, le)
+                if use_cache:
+                    trainer_outputs = {
+                        "spotify_genre_model.pkl": trainer_config.trained_model_file_path,
+                        "compiled_model.pkl": trainer_config.compiled_model_file_path,
+                    }
+                    if trainer_config.model_selection:
+                        trainer_outputs["model_leaderboard.json"] = trainer.selection_config.leaderboard_file_path
+                    if trainer_config.budget.is_active():
+                        trainer_outputs["model_budget_report.json"] = trainer_config.budget_report_file_path
+                    self.stage_cache.store("model_trainer", trainer_key, trainer_outputs)
+                self._record("model_trainer", trainer_key, "miss", start)
+
+            # Serving switches to the new model, compiled model, preprocessor
+            # and label encoder together (see ArtifactRegistry)
+            publish_artifact_files([
+                trainer_config.trained_model_file_path,
+                trainer_config.compiled_model_file_path,
+                transformation_config.preprocessor_obj_file_path,
+                transformation_config.label_encoder_obj_file_path,
+            ], metadata={"compact_compiled_model": trainer.compiled_model_is_compact()})
+            if raw_data_end is not None:
+                write_watermark(self.incremental_config.watermark_file_path,
+                                ingestion_config.raw_data_path, raw_data_end)
             
             logging.info("--- Training Pipeline Finished Successfully ---")
+            return self.report
 
         except Exception as e:
             logging.error(f"An error occurred in the training pipeline: {e}")
             raise CustomException(e, sys)
 
+    def run_incremental(self):
+        """
+        Adds trees for the rows appended to the raw CSV since the last run
+        (see IncrementalTrainer) instead of running the full pipeline.
+        """
+        return IncrementalTrainer(self.incremental_config).initiate_incremental_training()
+
+    def run_out_of_core(self):
+        """
+        Trains on the whole raw CSV with bounded memory (see OutOfCoreTrainer)
+        instead of the in-memory ingestion / transformation / trainer stages.
+        """
+        raw_data_path = self.out_of_core_config.raw_data_path
+        raw_data_end = complete_lines_end(raw_data_path)
+        report = OutOfCoreTrainer(self.out_of_core_config).initiate_out_of_core_training()
+        write_watermark(self.incremental_config.watermark_file_path, raw_data_path, raw_data_end)
+        return report
+
+    def run_cross_validation(self):
+        """
+        Stratified k-fold evaluation (see CrossValidator) on the ingested
+        train + test rows. Runs ingestion first if its outputs are missing.
+        """
+        ingestor = DataIngestion(self.ingestion_config)
+        data_paths = ingestor._handoff_paths()
+        if not all(os.path.exists(path) for path in data_paths):
+            data_paths = ingestor.initiate_data_ingestion()
+        return CrossValidator(self.cv_config).evaluate(data_paths)
+
+    def build_similarity_index(self):
+        """
+        Rebuilds artifacts/similarity_index.pkl from train.csv and the current
+        preprocessor (see SimilarityIndexBuilder).
+        """
+        return SimilarityIndexBuilder().initiate_index_build()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the full training pipeline.")
+    parser.add_argument("--force", action="store_true", help="Recompute every stage even if it is cached.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the stage cache.")
+    parser.add_argument("--select-model", action="store_true",
+                        help="Search several model families instead of training the fixed RandomForest.")
+    parser.add_argument("--max-model-bytes", type=int, default=None, help="Budget: max pickled model bytes.")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Budget: max p99 single-row latency (ms).")
+    parser.add_argument("--min-rows-per-second", type=float, default=None, help="Budget: min batch throughput.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only train new trees on the rows appended since the last run.")
+    parser.add_argument("--new-trees", type=int, default=20, help="Incremental: trees added per run.")
+    parser.add_argument("--max-trees", type=int, default=None, help="Incremental: drop the oldest trees beyond this.")
+    parser.add_argument("--min-new-rows", type=int, default=500, help="Incremental: wait for at least this many rows.")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Train on the full raw CSV through memory-mapped blocks, for data larger than RAM.")
+    parser.add_argument("--memory-limit-mb", type=int, default=2048, help="Out-of-core: peak memory cap (MB).")
+    parser.add_argument("--workers", type=int, default=None, help="Out-of-core: worker processes (default: CPUs).")
+    parser.add_argument("--cross-validate", action="store_true",
+                        help="Only evaluate candidates with stratified k-fold cross-validation.")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation: number of folds.")
+    parser.add_argument("--similarity-index", action="store_true",
+                        help="Also rebuild the similar-tracks index after training.")
+    args = parser.parse_args()
+
     logging.info("Running Training Pipeline as a standalone script...")
-    pipeline = TrainPipeline()
-    pipeline.run_pipeline()
\ No newline at end of file
+    if args.cross_validate:
+        report = TrainPipeline(cv_config=CrossValidationConfig(n_splits=args.folds)).run_cross_validation()
+        for candidate in report["candidates"]:
+            print(f"{candidate['family']:<22} accuracy {candidate['accuracy']:.4f} {candidate['accuracy_ci']}  "
+                  f"fold std {candidate['fold_accuracy_std']:.4f}")
+        sys.exit(0)
+    if args.out_of_core:
+        out_of_core_config = OutOfCoreTrainerConfig(memory_limit_mb=args.memory_limit_mb, n_workers=args.workers)
+        report = TrainPipeline(out_of_core_config=out_of_core_config).run_out_of_core()
+        report.pop("tasks")
+        print(json.dumps(report, indent=2))
+        sys.exit(0)
+    if args.incremental:
+        incremental_config = IncrementalTrainerConfig(
+            n_new_trees=args.new_trees, max_estimators=args.max_trees, min_new_rows=args.min_new_rows,
+        )
+        print(json.dumps(TrainPipeline(incremental_config=incremental_config).run_incremental(), indent=2))
+        sys.exit(0)
+    budget = ModelBudget(
+        max_artifact_bytes=args.max_model_bytes,
+        max_p99_latency_ms=args.max_p99_ms,
+        min_batch_rows_per_second=args.min_rows_per_second,
+    )
+    pipeline = TrainPipeline(model_trainer_config=ModelTrainerConfig(model_selection=args.select_model, budget=budget))
+    report = pipeline.run_pipeline(force=args.force, use_cache=not args.no_cache)
+    for row in report:
+        print(f"{row['stage']:<15} {row['cache']:<5} {row['seconds']:>8.2f}s  key={row['key']}")
+    if args.similarity_index:
+        print(pipeline.build_similarity_index())
@@ -1,24 +1,357 @@
 # src/utils.py
 
 import os
-import pickle
 import sys
+import bz2
+import gzip
+import json
+import lzma
+import mmap
+import time
+import pickle
+import shutil
+import struct
+from datetime import datetime
+import numpy as np
 from src.logger import logging  # <-- Import the logger
 from src.exception import CustomException # <-- Import the custom exception
 
-def save_object(file_path, obj):
+# --- Model artifact formats ---
+# "pickle": plain pickle (the default)
+# "mmap":   pickle protocol 5 with large NumPy buffers stored out-of-band in the
+#           same file. load_object() memory-maps them read-only, so several
+#           worker processes share the same pages instead of each holding a copy.
+# "gzip" / "bz2" / "lzma": compressed pickle, for shipping artifacts around.
+
+MMAP_MAGIC = b"SGMMAP01"
+MMAP_ALIGNMENT = 64
+# Buffers smaller than this stay inside the pickle itself
+MMAP_MIN_BUFFER_BYTES = 64 * 1024
+
+COMPRESSORS = {"gzip": gzip, "bz2": bz2, "lzma": lzma}
+COMPRESSED_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "lzma"}
+
+def _write_mmap_format(file_obj, obj):
+    buffers = []
+    def keep_out_of_band(buffer):
+        if buffer.raw().nbytes < MMAP_MIN_BUFFER_BYTES:
+            return True  # True = serialize in-band
+        buffers.append(buffer)
+        return False
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=keep_out_of_band)
+
+    # Layout: magic | pickle | 64-byte aligned buffers | JSON footer | footer length
+    file_obj.write(MMAP_MAGIC)
+    layout = []
+    for block in [payload] + [buffer.raw() for buffer in buffers]:
+        file_obj.write(b"\0" * (-file_obj.tell() % MMAP_ALIGNMENT))
+        layout.append([file_obj.tell(), memoryview(block).nbytes])
+        file_obj.write(block)
+    footer = json.dumps({"blocks": layout}).encode()
+    file_obj.write(footer)
+    file_obj.write(struct.pack("<Q", len(footer)))
+
+def save_object(file_path, obj, file_format="pickle"):
     """
     Saves a Python object as a pickle file, with logging and exceptions.
+    file_format: "pickle" (default), "mmap", "gzip", "bz2" or "lzma".
     """
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
+        start = time.perf_counter()
         
-        with open(file_path, "wb") as file_obj:
-            pickle.dump(obj, file_obj)
+        # Write to a temp file first and then swap it in, so a running
+        # PredictPipeline never reads a half-written artifact.
+        tmp_file_path = f"{file_path}.tmp"
+        if file_format == "pickle":
+            with open(tmp_file_path, "wb") as file_obj:
+                pickle.dump(obj, file_obj, protocol=pickle.HIGHEST_PROTOCOL)
+        elif file_format == "mmap":
+            with open(tmp_file_path, "wb") as file_obj:
+                _write_mmap_format(file_obj, obj)
+        elif file_format in COMPRESSORS:
+            with COMPRESSORS[file_format].open(tmp_file_path, "wb") as file_obj:
+                pickle.dump(obj, file_obj, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            raise ValueError(f"Unknown file_format: {file_format}")
+        os.replace(tmp_file_path, file_path)
             
-        logging.info(f"Object saved to {file_path}") # <-- Use logger
+        logging.info(f"Object saved to {file_path} ({file_format}, {os.path.getsize(file_path)} bytes) "
+                     f"in {time.perf_counter() - start:.3f}s") # <-- Use logger
 
     except Exception as e:
         # Raise our custom exception
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
+
+# --- Versioned artifact sets ---
+# Artifacts that only work together (model, compiled model, preprocessor,
+# label encoder) are published as one version: every file goes to
+# <folder>/versions/<version>/ first, and then <folder>/artifact_manifest.json
+# is pointed at that version with a single os.replace. ArtifactRegistry reads
+# the set through the manifest, so serving moves from one complete set to the
+# next and never pairs files of two versions.
+
+ARTIFACT_MANIFEST_FILE = "artifact_manifest.json"
+ARTIFACT_VERSIONS_DIR = "versions"
+# Older versions are deleted once this many newer ones exist
+KEEP_ARTIFACT_VERSIONS = 3
+
+def _artifact_set_dir(file_paths):
+    directories = {os.path.dirname(os.path.abspath(file_path)) for file_path in file_paths}
+    if len(directories) != 1:
+        raise ValueError(f"The files of one artifact set must share a folder: {sorted(directories)}")
+    return directories.pop()
+
+def _new_version_dir(artifacts_dir):
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    version_dir = os.path.join(artifacts_dir, ARTIFACT_VERSIONS_DIR, version)
+    os.makedirs(version_dir)
+    return version, version_dir
+
+def _link_or_copy(source, target):
+    # Version files are never changed in place, so a hard link is as good as a copy
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def _swap_manifest(artifacts_dir, version, names, metadata=None):
+    manifest = {
+        "version": version,
+        "files": {name: os.path.join(ARTIFACT_VERSIONS_DIR, version, name) for name in names},
+        "metadata": metadata or {},
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    manifest_path = os.path.join(artifacts_dir, ARTIFACT_MANIFEST_FILE)
+    with open(f"{manifest_path}.tmp", "w") as file_obj:
+        json.dump(manifest, file_obj, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    logging.info(f"Published artifact version {version} ({', '.join(names)}) in {artifacts_dir}")
+
+    # Processes still holding an old version keep their memory-mapped pages
+    # after the files are deleted, so removing old folders is safe
+    versions_dir = os.path.join(artifacts_dir, ARTIFACT_VERSIONS_DIR)
+    for old_version in sorted(os.listdir(versions_dir))[:-KEEP_ARTIFACT_VERSIONS]:
+        shutil.rmtree(os.path.join(versions_dir, old_version), ignore_errors=True)
+
+def read_artifact_manifest(artifacts_dir):
+    """
+    The manifest of the artifact set published in artifacts_dir, or None.
+    """
+    manifest_path = os.path.join(artifacts_dir, ARTIFACT_MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as file_obj:
+        return json.load(file_obj)
+
+def save_objects(objects, metadata=None):
+    """
+    Saves several artifacts that only work together (e.g. a model and the
+    preprocessor it was trained with) as ONE new version. objects: list of
+    (file_path, obj, file_format), all in the same folder. metadata: small
+    JSON-able facts about the set, kept in the manifest (read them back
+    with read_artifact_manifest instead of loading the artifacts).
+
+    1. Every object is written to <folder>/versions/<version>/<file name>.
+    2. artifact_manifest.json is switched to that version with one
+       os.replace, so the ArtifactRegistry moves to the whole set at once.
+    3. The usual paths (e.g. artifacts/preprocessor.pkl) are updated too,
+       for the training code that reads them directly.
+
+    A failure before step 2 leaves the published set untouched.
+    Returns the new version name.
+    """
+    version_dir, published = None, False
+    try:
+        artifacts_dir = _artifact_set_dir([file_path for file_path, _, _ in objects])
+        version, version_dir = _new_version_dir(artifacts_dir)
+        names = [os.path.basename(file_path) for file_path, _, _ in objects]
+        for (_, obj, file_format), name in zip(objects, names):
+            save_object(os.path.join(version_dir, name), obj, file_format=file_format)
+        _swap_manifest(artifacts_dir, version, names, metadata)
+        published = True
+
+        for (file_path, _, _), name in zip(objects, names):
+            _link_or_copy(os.path.join(version_dir, name), f"{file_path}.staged")
+            os.replace(f"{file_path}.staged", file_path)
+        return version
+
+    except Exception as e:
+        if version_dir is not None and not published:
+            shutil.rmtree(version_dir, ignore_errors=True)
+        raise CustomException(e, sys)
+
+def publish_artifact_files(file_paths, metadata=None):
+    """
+    Publishes artifacts that were already saved at their usual paths (e.g.
+    by the TrainPipeline stages) as ONE new version, like save_objects.
+    Paths that do not exist are left out of the set.
+    Returns the new version name.
+    """
+    version_dir, published = None, False
+    try:
+        artifacts_dir = _artifact_set_dir(file_paths)
+        version, version_dir = _new_version_dir(artifacts_dir)
+        names = []
+        for file_path in file_paths:
+            if os.path.exists(file_path):
+                names.append(os.path.basename(file_path))
+                _link_or_copy(file_path, os.path.join(version_dir, names[-1]))
+        _swap_manifest(artifacts_dir, version, names, metadata)
+        published = True
+        return version
+
+    except Exception as e:
+        if version_dir is not None and not published:
+            shutil.rmtree(version_dir, ignore_errors=True)
+        raise CustomException(e, sys)
+
+def load_object(file_path):
+    """
+    Loads an object written by save_object. The format is detected from the
+    file itself; "mmap" files come back with their big arrays memory-mapped
+    read-only.
+    """
+    try:
+        start = time.perf_counter()
+        with open(file_path, "rb") as file_obj:
+            magic = file_obj.read(len(MMAP_MAGIC))
+
+            if magic == MMAP_MAGIC:
+                file_format = "mmap"
+                mapped = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+                footer_size = struct.unpack("<Q", mapped[-8:])[0]
+                footer = json.loads(mapped[-8 - footer_size:-8])
+                view = memoryview(mapped)
+                blocks = [view[offset:offset + size] for offset, size in footer["blocks"]]
+                obj = pickle.loads(blocks[0], buffers=blocks[1:])
+            else:
+                file_format = next(
+                    (name for prefix, name in COMPRESSED_MAGIC.items() if magic.startswith(prefix)), "pickle"
+                )
+                file_obj.seek(0)
+                if file_format == "pickle":
+                    obj = pickle.load(file_obj)
+                else:
+                    with COMPRESSORS[file_format].open(file_obj, "rb") as compressed_obj:
+                        obj = pickle.load(compressed_obj)
+
+        logging.info(f"Object loaded from {file_path} ({file_format}) in {time.perf_counter() - start:.3f}s")
+        return obj
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+# --- Columnar (.npy per column) storage for the ingestion -> transformation handoff ---
+
+COLUMNAR_META_FILE = "meta.json"
+
+class ColumnarWriter:
+    """
+    Appends DataFrame chunks to a folder with one .npy file per column.
+    Categorical columns (dtype "category") are stored as integer codes,
+    with the list of categories kept in meta.json.
+
+    The .npy files can be memory-mapped back with load_columnar().
+    """
+    def __init__(self, dir_path, dtypes):
+        self.dir_path = dir_path
+        self.tmp_dir_path = f"{dir_path}.tmp"
+        self.dtypes = dict(dtypes)
+        self.num_rows = 0
+        self.category_codes = {col: {} for col, dtype in self.dtypes.items() if dtype == "category"}
+        shutil.rmtree(self.tmp_dir_path, ignore_errors=True)
+        os.makedirs(self.tmp_dir_path)
+        self._raw_files = {
+            col: open(os.path.join(self.tmp_dir_path, f"{col}.raw"), "wb") for col in self.dtypes
+        }
+
+    def _storage_dtype(self, col):
+        return np.int32 if col in self.category_codes else np.dtype(self.dtypes[col])
+
+    def append(self, df):
+        import pandas as pd  # only the training side needs pandas
+
+        for col, raw_file in self._raw_files.items():
+            if col in self.category_codes:
+                codes = self.category_codes[col]
+                values = df[col].astype(str).to_numpy()
+                for value in pd.unique(values):
+                    codes.setdefault(value, len(codes))
+                column = pd.Series(values).map(codes).to_numpy(dtype=np.int32)
+            else:
+                column = df[col].to_numpy(dtype=self._storage_dtype(col))
+            raw_file.write(np.ascontiguousarray(column).tobytes())
+        self.num_rows += len(df)
+
+    def close(self):
+        try:
+            for col, raw_file in self._raw_files.items():
+                raw_file.close()
+                raw_path = raw_file.name
+                dtype = self._storage_dtype(col)
+                target = np.lib.format.open_memmap(
+                    os.path.join(self.tmp_dir_path, f"{col}.npy"), mode="w+", dtype=dtype, shape=(self.num_rows,)
+                )
+                if self.num_rows:
+                    target[:] = np.memmap(raw_path, dtype=dtype, mode="r", shape=(self.num_rows,))
+                target.flush()
+                del target
+                os.remove(raw_path)
+
+            meta = {
+                "columns": list(self.dtypes),
+                "num_rows": self.num_rows,
+                "categories": {col: list(codes) for col, codes in self.category_codes.items()},
+            }
+            with open(os.path.join(self.tmp_dir_path, COLUMNAR_META_FILE), "w") as file_obj:
+                json.dump(meta, file_obj)
+
+            # Swap the finished folder in place of any older one
+            shutil.rmtree(self.dir_path, ignore_errors=True)
+            os.replace(self.tmp_dir_path, self.dir_path)
+            logging.info(f"Columnar data ({self.num_rows} rows) saved to {self.dir_path}")
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+def save_columnar(dir_path, df, dtypes):
+    """
+    Saves the columns listed in dtypes (column -> dtype) of df as a columnar folder.
+    """
+    try:
+        writer = ColumnarWriter(dir_path, dtypes)
+        writer.append(df)
+        writer.close()
+    except Exception as e:
+        raise CustomException(e, sys)
+
+def is_columnar(path):
+    return os.path.isfile(os.path.join(path, COLUMNAR_META_FILE))
+
+def load_columnar(dir_path, columns=None, mmap=True):
+    """
+    Loads a folder written by ColumnarWriter into a DataFrame.
+    With mmap=True the numeric columns are read through memory-mapped .npy files.
+    """
+    try:
+        import pandas as pd
+
+        with open(os.path.join(dir_path, COLUMNAR_META_FILE)) as file_obj:
+            meta = json.load(file_obj)
+
+        data = {}
+        for col in columns or meta["columns"]:
+            values = np.load(os.path.join(dir_path, f"{col}.npy"), mmap_mode="r" if mmap else None)
+            if col in meta["categories"]:
+                values = pd.Categorical.from_codes(values, categories=meta["categories"][col])
+            data[col] = values
+        df = pd.DataFrame(data, copy=False)
+        logging.info(f"Columnar data ({meta['num_rows']} rows) loaded from {dir_path}")
+        return df
+
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,27 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+# --- THIS IS THE FIX ---
+# Puts the project root on the path so the tests can import 'src'
+# (run from the project root with: python -m pytest -q)
+current_dir = Path(__file__).resolve().parent
+root_dir = current_dir.parent
+sys.path.append(str(root_dir))
+# --- END OF FIX ---
+
+import pandas as pd
+import pytest
+
+ARTIFACTS_DIR = root_dir / "artifacts"
+
+
+@pytest.fixture(scope="session")
+def train_df():
+    return pd.read_csv(ARTIFACTS_DIR / "train.csv")
+
+
+@pytest.fixture(scope="session")
+def test_df():
+    return pd.read_csv(ARTIFACTS_DIR / "test.csv")
@@ -0,0 +1,35 @@
+# tests/test_fast_preprocessor.py
+
+import numpy as np
+import pytest
+
+from src.components.data_transformation import DataTransformation
+from src.components.fast_preprocessor import FastPreprocessor, check_parity
+
+
+@pytest.fixture(scope="module")
+def preprocessor(train_df):
+    # Fitted here rather than loaded from artifacts/, so the test does not
+    # depend on the sklearn version that pickled the committed preprocessor
+    return DataTransformation().get_data_transformer_object().fit(train_df)
+
+
+def test_matches_column_transformer_on_test_split(preprocessor, test_df):
+    assert check_parity(preprocessor, test_df) <= 1e-9
+
+
+def test_unseen_categories_match_column_transformer(preprocessor, test_df):
+    features_df = test_df.head(50).copy()
+    features_df.loc[features_df.index[:10], "key"] = 12
+    features_df.loc[features_df.index[10:20], "time_signature"] = 9
+    features_df.loc[features_df.index[20:30], "mode"] = -1
+
+    assert check_parity(preprocessor, features_df) <= 1e-9
+
+    # Unknown values leave their whole one-hot block at zero
+    fast_preprocessor = FastPreprocessor.from_column_transformer(preprocessor)
+    key_block = slice(fast_preprocessor.category_offsets[0],
+                      fast_preprocessor.category_offsets[0] + len(fast_preprocessor.categories[0]))
+    output = fast_preprocessor.transform_frame(features_df)
+    assert not output[:10, key_block].any()
+    assert np.array_equal(output[10:, key_block].sum(axis=1), np.ones(40))
@@ -0,0 +1,41 @@
+# tests/test_forest_compiler.py
+
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.components.data_transformation import DataTransformation, consolidate_genre_series
+from src.components.forest_compiler import compile_forest
+
+
+@pytest.fixture(scope="module")
+def forest_and_test_rows(train_df, test_df):
+    preprocessor = DataTransformation().get_data_transformer_object().fit(train_df)
+    model = RandomForestClassifier(n_estimators=20, random_state=42, class_weight="balanced", n_jobs=1)
+    model.fit(preprocessor.transform(train_df), consolidate_genre_series(train_df["track_genre"]))
+    return model, preprocessor.transform(test_df)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_predict_proba_matches_random_forest(forest_and_test_rows, compact):
+    model, X_test = forest_and_test_rows
+    compiled = compile_forest(model, compact=compact)
+    assert compiled.compact == compact
+
+    expected = model.predict_proba(X_test)
+    # Leaf probabilities are stored as float32
+    np.testing.assert_allclose(compiled.predict_proba(X_test), expected, rtol=0, atol=1e-6)
+    assert np.array_equal(compiled.predict(X_test), model.predict(X_test))
+
+    # Small batches take a single block, large ones are split into blocks
+    np.testing.assert_allclose(compiled.predict_proba(X_test[:1]), expected[:1], rtol=0, atol=1e-6)
+    np.testing.assert_allclose(compiled.predict_proba(X_test, block_size=300), expected, rtol=0, atol=1e-6)
+
+
+def test_compact_forest_survives_pickling(forest_and_test_rows):
+    model, X_test = forest_and_test_rows
+    compiled = pickle.loads(pickle.dumps(compile_forest(model, compact=True)))
+
+    np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-6)
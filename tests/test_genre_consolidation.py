@@ -0,0 +1,47 @@
+# tests/test_genre_consolidation.py
+
+import numpy as np
+import pandas as pd
+
+from src.components.data_transformation import consolidate_genre_improved, consolidate_genre_series
+
+# Every track_genre value in the Spotify tracks dataset
+SPOTIFY_GENRES = [
+    "acoustic", "afrobeat", "alt-rock", "alternative", "ambient", "anime", "black-metal", "bluegrass",
+    "blues", "brazil", "breakbeat", "british", "cantopop", "chicago-house", "children", "chill",
+    "classical", "club", "comedy", "country", "dance", "dancehall", "death-metal", "deep-house",
+    "detroit-techno", "disco", "disney", "drum-and-bass", "dub", "dubstep", "edm", "electro",
+    "electronic", "emo", "folk", "forro", "french", "funk", "garage", "german", "gospel", "goth",
+    "grindcore", "groove", "grunge", "guitar", "happy", "hard-rock", "hardcore", "hardstyle",
+    "heavy-metal", "hip-hop", "honky-tonk", "house", "idm", "indian", "indie", "indie-pop",
+    "industrial", "iranian", "j-dance", "j-idol", "j-pop", "j-rock", "jazz", "k-pop", "kids", "latin",
+    "latino", "malay", "mandopop", "metal", "metalcore", "minimal-techno", "mpb", "new-age", "opera",
+    "pagode", "party", "piano", "pop", "pop-film", "power-pop", "progressive-house", "psych-rock",
+    "punk", "punk-rock", "r-n-b", "reggae", "reggaeton", "rock", "rock-n-roll", "rockabilly",
+    "romance", "sad", "salsa", "samba", "sertanejo", "show-tunes", "singer-songwriter", "ska", "sleep",
+    "songwriter", "soul", "spanish", "study", "swedish", "synth-pop", "tango", "techno", "trance",
+    "trip-hop", "turkish", "world-music",
+]
+
+
+def test_all_genres_match_row_wise_mapping():
+    assert len(set(SPOTIFY_GENRES)) == 114
+    genres = pd.Series(SPOTIFY_GENRES, name="track_genre")
+
+    assert consolidate_genre_series(genres).equals(genres.apply(consolidate_genre_improved))
+
+
+def test_missing_and_unknown_values_match_row_wise_mapping():
+    genres = pd.Series([None, np.nan, "", "POP", "Hip-Hop", "not-a-genre", 42, "rock"] * 3, name="track_genre")
+
+    consolidated = consolidate_genre_series(genres)
+    assert consolidated.equals(genres.apply(consolidate_genre_improved))
+    assert consolidated.iloc[0] == consolidated.iloc[1] == consolidated.iloc[2] == "Other"
+
+
+def test_keeps_index_of_input(train_df):
+    genres = train_df["track_genre"].iloc[::-1]
+
+    consolidated = consolidate_genre_series(genres)
+    assert consolidated.index.equals(genres.index)
+    assert consolidated.equals(genres.apply(consolidate_genre_improved))
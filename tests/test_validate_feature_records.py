@@ -0,0 +1,36 @@
+# tests/test_validate_feature_records.py
+
+import pytest
+
+from src.pipeline.predict_pipeline import validate_feature_records
+
+RECORD = {
+    "danceability": 0.5, "energy": 0.6, "loudness": -6.0, "speechiness": 0.05,
+    "acousticness": 0.1, "instrumentalness": 0.0, "liveness": 0.1, "valence": 0.5,
+    "tempo": 120.0, "key": 5, "mode": 1, "time_signature": 4,
+}
+
+
+def test_valid_records_pass():
+    features_df, errors = validate_feature_records([RECORD, dict(RECORD, energy="0.7")])
+
+    assert errors == []
+    assert features_df.index.tolist() == [0, 1]
+    assert features_df.loc[1, "energy"] == 0.7
+
+
+@pytest.mark.parametrize("column, value, message", [
+    ("key", True, "'key' must be a number, not true/false."),
+    ("mode", False, "'mode' must be a number, not true/false."),
+    ("tempo", "inf", "'tempo' must be a finite number."),
+    ("tempo", float("-inf"), "'tempo' must be a finite number."),
+    ("loudness", "NaN", "'loudness' is missing or not a valid number."),
+    ("tempo", None, "'tempo' is missing or not a valid number."),
+    ("tempo", "fast", "'tempo' is missing or not a valid number."),
+    ("key", 1.5, "'key' is missing or not a valid number."),
+])
+def test_bad_values_are_rejected_per_field(column, value, message):
+    features_df, errors = validate_feature_records([RECORD, dict(RECORD, **{column: value})])
+
+    assert features_df.index.tolist() == [0]
+    assert errors == [{"index": 1, "error": message}]